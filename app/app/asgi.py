@@ -13,5 +13,6 @@ from django.core.asgi import get_asgi_application
 
 
 _ = environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
+_ = environ.setdefault("ASYNC_VIEWS", "1")
 
 application = get_asgi_application()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.0/ref/settings/
 """
 
+from os import cpu_count
 from os import getenv
 from pathlib import Path
 
@@ -42,6 +43,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework.authtoken",
     "core",
@@ -50,6 +52,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # first, so that its total covers the other middleware
+    "core.timing.RequestTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -85,13 +89,41 @@ WSGI_APPLICATION = "app.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        # Django's, with health checks, a pool size and metrics
+        "ENGINE": "core.backends.postgresql",
         "HOST": getenv("DB_HOST"),
         "NAME": getenv("DB_NAME"),
         "USER": getenv("DB_USER"),
         "PASSWORD": getenv("DB_PASSWORD"),
+        # bounds each attempt of `wait_for_db` and of readiness checks
+        "OPTIONS": {"connect_timeout": 5},
+        # seconds a connection is kept for later requests, 0 to close it
+        # with each request
+        "CONN_MAX_AGE": int(getenv("DB_CONN_MAX_AGE", "60")),
+        "CONN_HEALTH_CHECKS": True,
+        # connections kept per process; more may be open while requests run
+        "CONN_POOL_SIZE": int(getenv("DB_CONN_POOL_SIZE", "20")),
     }
 }
+# read replicas of "default", as a comma-separated list of hosts; a database
+# name of their own lets a second database on the same server stand in for
+# one locally. Tests read them from the test database
+_REPLICA_HOSTS = [
+    host for host in getenv("DB_REPLICA_HOSTS", "").split(",") if host
+]
+REPLICA_DATABASES = [f"replica_{index}" for index in range(len(_REPLICA_HOSTS))]
+DATABASES.update(
+    {
+        alias: {
+            **DATABASES["default"],
+            "HOST": host,
+            "NAME": getenv("DB_REPLICA_NAME", DATABASES["default"]["NAME"]),
+            "TEST": {"MIRROR": "default"},
+        }
+        for alias, host in zip(REPLICA_DATABASES, _REPLICA_HOSTS)
+    }
+)
+DATABASE_ROUTERS = ["core.replicas.ReplicaRouter"]
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -107,6 +139,21 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# `PBKDF2PasswordHasher` run in a bounded pool, which answers 503 when full;
+# it takes over the `pbkdf2_sha256` algorithm, so it replaces, rather than
+# precedes, Django's
+PASSWORD_HASHERS = [
+    "core.hashers.PooledPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+# each takes a core while hashing
+PASSWORD_HASHING_WORKERS = max((cpu_count() or 1) // 2, 1)
+PASSWORD_HASHING_QUEUE = 16  # callers waiting for a worker
+PASSWORD_HASHING_RETRY_AFTER = 1  # seconds
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.0/topics/i18n/
@@ -137,6 +184,130 @@ STATIC_ROOT = "/vol/web/static"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 
+# rest framework
+
+
+REST_FRAMEWORK = {
+    "DEFAULT_PAGINATION_CLASS": "recipe.pagination.KeysetPagination",
+    "PAGE_SIZE": 100,
+    # orjson-backed, with output identical to `rest_framework.renderers.
+    # JSONRenderer` and `rest_framework.parsers.JSONParser`, which they can
+    # be swapped back for
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.parsers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    "EXCEPTION_HANDLER": "core.exceptions.exception_handler",
+}
+MAX_PAGE_SIZE = 1000
+RECIPE_BULK_MAX_ITEMS = 1000
+RECIPE_BATCH_MAX_IDS = 200
+# lines of an imported library, which is otherwise unbounded
+LIBRARY_MAX_LINE_BYTES = 1024 * 1024
+# exports spooled under ASGI are kept in memory up to this size, on disk beyond
+LIBRARY_EXPORT_SPOOL_BYTES = 8 * 1024 * 1024
+
+
+# recipe images
+
+
+RECIPE_IMAGE_WORKERS = 2
+RECIPE_IMAGE_VARIANTS = {"thumbnail": 150, "medium": 600, "full": 1600}
+RECIPE_IMAGE_QUALITY = 85
+# after which `sweep_recipe_images` takes a pending image's job for lost
+RECIPE_IMAGE_PENDING_SECONDS = 15 * 60
+
+
+# recipe search
+
+
+SEARCH_CONFIG = "english"
+
+
+# async views
+
+
+ASYNC_VIEWS = bool(int(getenv("ASYNC_VIEWS", "0")))  # on under `app.asgi`
+ASYNC_VIEW_WORKERS = 16  # each holds a database connection while busy
+
+
+# caches
+
+
+# processes serving the app, from the variable gunicorn also reads as its
+# number of workers
+WORKER_PROCESSES = int(getenv("WEB_CONCURRENCY", "1"))
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+# one every process sees, such as `django.core.cache.backends.redis.
+# RedisCache`, for the caches below whose entries must agree across them
+if _SHARED_CACHE_BACKEND := getenv("SHARED_CACHE_BACKEND"):
+    CACHES["shared"] = {
+        "BACKEND": _SHARED_CACHE_BACKEND,
+        "LOCATION": getenv("SHARED_CACHE_LOCATION", ""),
+    }
+SHARED_CACHE_ALIAS = "shared" if "shared" in CACHES else None
+
+
+# recipe response cache
+
+
+# a `CACHES` alias, else in-process. Writes invalidate the entries of the
+# cache of the process serving them only, so an in-process cache is only
+# precise with a single process, and is refused with several
+RESPONSE_CACHE_ALIAS = SHARED_CACHE_ALIAS
+RESPONSE_CACHE_MAX_SIZE = 10_000
+RESPONSE_CACHE_TIMEOUT = 60.0
+
+
+# token authentication cache
+
+
+# a `CACHES` alias, else in-process. Revoking a token, or deactivating its
+# user, only evicts it from the cache of the process making the change; the
+# others keep accepting it for up to `TOKEN_CACHE_TIMEOUT` seconds unless
+# the cache is shared, which is required with several processes
+TOKEN_CACHE_ALIAS = SHARED_CACHE_ALIAS
+TOKEN_CACHE_MAX_SIZE = 10_000
+TOKEN_CACHE_TIMEOUT = 300.0
+
+
+# read replicas
+
+
+# seconds reads stay on the primary after a user writes; longer than the
+# replicas lag
+REPLICA_STICKY_SECONDS = float(getenv("DB_REPLICA_STICKY_SECONDS", "5"))
+# a `CACHES` alias, else in-process; required once there are replicas, as a
+# write served by one process must send the reads of all to the primary
+REPLICA_STICKY_ALIAS = SHARED_CACHE_ALIAS
+REPLICA_STICKY_MAX_SIZE = 10_000
+
+
+# request timing
+
+
+# share of requests sampled, off at 0
+REQUEST_TIMING_SAMPLE_RATE = float(getenv("REQUEST_TIMING_SAMPLE_RATE", "0"))
+
+
+# health checks
+
+
+READINESS_MAX_DB_LATENCY = 0.5  # seconds
+# in `app.wsgi`; off for servers importing it before forking workers, such as
+# gunicorn with `--preload`, which would share a connection. Not under ASGI,
+# where it would only open a connection on the event loop's thread, which
+# views never query from
+WARM_UP = bool(int(getenv("WARM_UP", "1")))
+
+
 # auth user model
 
 
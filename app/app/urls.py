@@ -11,6 +11,7 @@ urlpatterns: list[URLResolver | URLPattern] = [
     path("admin/", site.urls),
     path("api/user/", include("user.urls")),
     path("api/recipe/", include("recipe.urls")),
+    path("health/", include("core.urls")),
 ]
 urlpatterns.extend(
     static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -9,9 +9,13 @@ https://docs.djangoproject.com/en/4.0/howto/deployment/wsgi/
 
 from os import environ
 
+from core.health import warm_up
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 
 _ = environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
 
 application = get_wsgi_application()
+if settings.WARM_UP:
+    warm_up()
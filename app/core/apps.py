@@ -1,6 +1,11 @@
+from beartype import beartype
 from django.apps import AppConfig
 
 
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    @beartype
+    def ready(self) -> None:
+        from core import checks  # noqa: F401
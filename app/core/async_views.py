@@ -0,0 +1,120 @@
+from collections.abc import Awaitable
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from threading import Barrier
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from beartype import beartype
+from django.conf import settings
+from django.db import close_old_connections
+from django.db import connections
+from django.http import HttpRequest
+from django.http.response import HttpResponseBase
+from django.urls import URLPattern
+from django.urls import URLResolver
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.routers import DefaultRouter
+
+
+View = Callable[..., HttpResponseBase]
+AsyncView = Callable[..., Awaitable[HttpResponseBase]]
+
+
+@cache
+@beartype
+def get_executor(max_workers: int) -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="async-view"
+    )
+
+
+@beartype
+def async_read_view(view: View) -> AsyncView:
+    # under ASGI, Django runs each sync view on a thread created for its
+    # request, so concurrency (and with it, database connections) is
+    # unbounded and no connection outlives its request. This serves safe
+    # methods from a bounded pool of threads instead. psycopg2 and Django <
+    # 4.1 have no async query interface, so the view itself (with its
+    # authentication, permissions and queries) runs unchanged in the pool.
+    # It is a thread-pool shim rather than async I/O: requests are no faster
+    # than with sync views, only their threads and connections are bounded
+
+    @beartype
+    async def async_view(
+        request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponseBase:
+        if request.method in SAFE_METHODS:
+            executor = get_executor(settings.ASYNC_VIEW_WORKERS)
+            run = sync_to_async(
+                _run_in_worker, thread_sensitive=False, executor=executor
+            )
+        else:
+            run = sync_to_async(_render)
+        return await run(view, request, *args, **kwargs)
+
+    async_view.csrf_exempt = True  # type: ignore
+    return async_view
+
+
+@beartype
+def _render(
+    view: View, request: HttpRequest, *args: Any, **kwargs: Any
+) -> HttpResponseBase:
+    response = view(request, *args, **kwargs)
+    # render on this thread rather than the handler's shared one
+    if callable(render := getattr(response, "render", None)):
+        response = render()
+    return response
+
+
+@beartype
+def _run_in_worker(
+    view: View, request: HttpRequest, *args: Any, **kwargs: Any
+) -> HttpResponseBase:
+    # the handler only manages the connection of its own thread
+    close_old_connections()
+    try:
+        return _render(view, request, *args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+@beartype
+def close_worker_connections(timeout: float = 10.0) -> None:
+    # with `CONN_MAX_AGE`, workers keep their connections between requests;
+    # this closes them, say before the database is dropped. Each task waits
+    # for the others, so that every worker runs exactly one
+    workers = settings.ASYNC_VIEW_WORKERS
+    barrier = Barrier(workers, timeout=timeout)
+
+    @beartype
+    def close() -> None:
+        _ = barrier.wait()
+        connections.close_all()
+
+    executor = get_executor(workers)
+    for future in [executor.submit(close) for _ in range(workers)]:
+        future.result()
+
+
+class AsyncReadRouter(DefaultRouter):
+    # routes list and retrieve through `async_read_view`
+
+    @beartype
+    def get_urls(self) -> list[URLPattern | URLResolver]:
+        urls = super().get_urls()
+        return [_async_reads(url) for url in urls]
+
+
+@beartype
+def _async_reads(url: URLPattern | URLResolver) -> URLPattern | URLResolver:
+    if isinstance(url, URLResolver):
+        return url
+    actions = getattr(url.callback, "actions", None) or {}
+    if not {"list", "retrieve"} & set(actions.values()):
+        return url
+    return URLPattern(
+        url.pattern, async_read_view(url.callback), url.default_args, url.name
+    )
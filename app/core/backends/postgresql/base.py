@@ -0,0 +1,106 @@
+from dataclasses import dataclass
+from dataclasses import field
+from threading import Lock
+from typing import Any
+from typing import Literal
+from weakref import WeakSet
+
+from beartype import beartype
+from django.db.backends.postgresql.base import (
+    DatabaseWrapper as PostgreSQLDatabaseWrapper,
+)
+
+
+Event = Literal["opened", "reused", "discarded"]
+
+
+@dataclass
+class ConnectionStats:
+    opened: int = 0
+    reused: int = 0
+    discarded: int = 0
+    _lock: Lock = field(default_factory=Lock, repr=False)
+
+    @beartype
+    def record(self, event: Event) -> None:
+        with self._lock:
+            setattr(self, event, getattr(self, event) + 1)
+
+    @beartype
+    def reset(self) -> None:
+        with self._lock:
+            self.opened = self.reused = self.discarded = 0
+
+
+# per process, as the pool is
+CONNECTION_STATS = ConnectionStats()
+# a wrapper per thread and alias, each with at most one connection
+_WRAPPERS: WeakSet["DatabaseWrapper"] = WeakSet()
+_WRAPPERS_LOCK = Lock()
+
+
+@beartype
+def open_connections() -> int:
+    with _WRAPPERS_LOCK:
+        return sum(1 for wrapper in _WRAPPERS if wrapper.connection is not None)
+
+
+class DatabaseWrapper(PostgreSQLDatabaseWrapper):
+    # keeps connections across requests for `CONN_MAX_AGE`, as Django does,
+    # and adds what Django 4.1's `CONN_HEALTH_CHECKS` does: a connection kept
+    # from an earlier request is checked before its first use in the next
+    # one, and replaced if it no longer works. Connections beyond
+    # `CONN_POOL_SIZE` per process are closed once their request ends,
+    # rather than kept
+
+    @beartype
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.health_check_done = False
+        with _WRAPPERS_LOCK:
+            _WRAPPERS.add(self)
+
+    @beartype
+    def connect(self) -> None:
+        # new connections need no check, and connecting ensures the
+        # connection itself
+        self.health_check_done = True
+        super().connect()
+        CONNECTION_STATS.record("opened")
+
+    @beartype
+    def ensure_connection(self) -> None:
+        if (
+            self.connection is not None
+            and not self.health_check_done
+            and not self.in_atomic_block
+        ):
+            self.health_check_done = True
+            if (
+                not self.settings_dict.get("CONN_HEALTH_CHECKS", True)
+                or self.is_usable()
+            ):
+                CONNECTION_STATS.record("reused")
+            else:
+                self._discard()
+        super().ensure_connection()
+
+    @beartype
+    def close_if_unusable_or_obsolete(self) -> None:
+        # called as requests start and finish
+        if self.connection is not None:
+            # which ensures the connection, without needing a check
+            self.health_check_done = True
+            super().close_if_unusable_or_obsolete()
+            if self.connection is None:
+                CONNECTION_STATS.record("discarded")
+            elif (
+                size := self.settings_dict.get("CONN_POOL_SIZE")
+            ) is not None and open_connections() > size:
+                self._discard()
+        self.health_check_done = False
+
+    @beartype
+    def _discard(self) -> None:
+        self.close()
+        CONNECTION_STATS.record("discarded")
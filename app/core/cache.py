@@ -0,0 +1,95 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Any
+
+from beartype import beartype
+from django.core.cache import caches
+
+
+class LocalCache:
+    # an in-process LRU whose entries also expire after `timeout` seconds
+
+    @beartype
+    def __init__(self, *, max_size: int, timeout: float) -> None:
+        super().__init__()
+        self.max_size = max_size
+        self.timeout = timeout
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = Lock()
+
+    @beartype
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @beartype
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                expires, value = self._data[key]
+            except KeyError:
+                return default
+            if expires <= monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    @beartype
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (monotonic() + self.timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                _ = self._data.popitem(last=False)
+
+    @beartype
+    def delete(self, key: str) -> None:
+        with self._lock:
+            _ = self._data.pop(key, None)
+
+    @beartype
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class SharedCache:
+    # a namespace within one of Django's `CACHES`, shared across processes
+
+    @beartype
+    def __init__(self, alias: str, *, timeout: float, key_prefix: str) -> None:
+        super().__init__()
+        self.alias = alias
+        self.timeout = timeout
+        self.key_prefix = key_prefix
+
+    @beartype
+    def get(self, key: str, default: Any = None) -> Any:
+        return caches[self.alias].get(self._key(key), default)
+
+    @beartype
+    def set(self, key: str, value: Any) -> None:
+        caches[self.alias].set(self._key(key), value, timeout=self.timeout)
+
+    @beartype
+    def delete(self, key: str) -> None:
+        _ = caches[self.alias].delete(self._key(key))
+
+    @beartype
+    def clear(self) -> None:
+        # Django caches have no per-prefix clear, so this empties the alias
+        caches[self.alias].clear()
+
+    @beartype
+    def _key(self, key: str) -> str:
+        return f"{self.key_prefix}:{key}"
+
+
+@beartype
+def build_cache(
+    alias: str | None, *, max_size: int, timeout: float, key_prefix: str
+) -> LocalCache | SharedCache:
+    if alias is None:
+        return LocalCache(max_size=max_size, timeout=timeout)
+    return SharedCache(alias, timeout=timeout, key_prefix=key_prefix)
@@ -0,0 +1,43 @@
+from typing import Any
+
+from beartype import beartype
+from django.conf import settings
+from django.core.checks import Error
+from django.core.checks import Tags
+from django.core.checks import register
+
+
+# Django's backends whose entries live in the memory of each process
+_PER_PROCESS_BACKENDS = {
+    "django.core.cache.backends.dummy.DummyCache",
+    "django.core.cache.backends.locmem.LocMemCache",
+}
+
+
+@beartype
+def is_shared_cache(alias: str | None) -> bool:
+    # whether `alias`, as passed to `core.cache.build_cache`, names a cache
+    # every process sees
+    return (
+        alias is not None
+        and alias in settings.CACHES
+        and settings.CACHES[alias]["BACKEND"] not in _PER_PROCESS_BACKENDS
+    )
+
+
+@register(Tags.caches)
+@beartype
+def check_replica_sticky_cache(**_kwargs: Any) -> list[Error]:
+    if not settings.REPLICA_DATABASES or is_shared_cache(
+        settings.REPLICA_STICKY_ALIAS
+    ):
+        return []
+    return [
+        Error(
+            "REPLICA_STICKY_ALIAS must name a cache shared between processes "
+            "when there are read replicas, or reads served by other "
+            "processes miss their users' own writes.",
+            hint="Set SHARED_CACHE_BACKEND and SHARED_CACHE_LOCATION.",
+            id="core.E001",
+        )
+    ]
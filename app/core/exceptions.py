@@ -0,0 +1,34 @@
+from typing import Any
+
+from beartype import beartype
+from core.hashers import PasswordHashingUnavailable
+from django.conf import settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+from rest_framework.status import HTTP_503_SERVICE_UNAVAILABLE
+from rest_framework.views import exception_handler as drf_exception_handler
+
+
+class PasswordHashingBusy(APIException):
+    status_code = HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = gettext_lazy(
+        "Too many sign-ups and logins at once, try again shortly"
+    )
+    default_code = "password_hashing_unavailable"
+
+    @beartype
+    def __init__(self) -> None:
+        super().__init__()
+        # sent as `Retry-After` by DRF's exception handler
+        self.wait = settings.PASSWORD_HASHING_RETRY_AFTER
+
+
+@beartype
+def exception_handler(
+    exc: Exception, context: dict[str, Any]
+) -> Response | None:
+    # DRF's, with the errors of the project's own layers mapped to responses
+    if isinstance(exc, PasswordHashingUnavailable):
+        exc = PasswordHashingBusy()
+    return drf_exception_handler(exc, context)
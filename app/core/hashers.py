@@ -0,0 +1,63 @@
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from threading import BoundedSemaphore
+from typing import Any
+from typing import TypeVar
+
+from beartype import beartype
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+T = TypeVar("T")
+
+
+class PasswordHashingUnavailable(Exception):
+    # raised wherever passwords are hashed, so API views answer it with a
+    # 503 through `core.exceptions.exception_handler`
+    pass
+
+
+class HashingPool:
+    # runs hashing on a fixed number of threads, so that a flood of sign-ups
+    # and logins cannot take more than that many cores from other requests.
+    # Callers beyond the workers and `queue` waiting are turned away at once
+
+    @beartype
+    def __init__(self, *, workers: int, queue: int) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hashing"
+        )
+        self._slots = BoundedSemaphore(workers + queue)
+
+    @beartype
+    def run(self, func: Callable[..., T], *args: Any) -> T:
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHashingUnavailable()
+        try:
+            return self._executor.submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+
+@cache
+@beartype
+def get_hashing_pool(workers: int, queue: int) -> HashingPool:
+    return HashingPool(workers=workers, queue=queue)
+
+
+class PooledPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    # `PBKDF2PasswordHasher`, with the same algorithm name and so the same
+    # hashes, computed in the hashing pool. Setting, checking and hardening
+    # passwords all go through `encode`. hashlib releases the GIL while
+    # deriving keys, so threads hash in parallel without a process pool
+
+    @beartype
+    def encode(
+        self, password: str, salt: str, iterations: int | None = None
+    ) -> str:
+        pool = get_hashing_pool(
+            settings.PASSWORD_HASHING_WORKERS, settings.PASSWORD_HASHING_QUEUE
+        )
+        return pool.run(super().encode, password, salt, iterations)
@@ -0,0 +1,35 @@
+from logging import getLogger
+from time import perf_counter
+
+from beartype import beartype
+from django.db import DEFAULT_DB_ALIAS
+from django.db import DatabaseError
+from django.db import connections
+from django.urls import get_resolver
+
+
+_LOGGER = getLogger(__name__)
+
+
+@beartype
+def database_latency(alias: str = DEFAULT_DB_ALIAS) -> float:
+    # seconds for a round trip, connecting first if need be; raises
+    # `OperationalError` when the database is unreachable
+    start = perf_counter()
+    with connections[alias].cursor() as cursor:
+        cursor.execute("SELECT 1")
+        _ = cursor.fetchone()
+    return perf_counter() - start
+
+
+@beartype
+def warm_up(alias: str = DEFAULT_DB_ALIAS) -> None:
+    # pays at startup for what the first requests otherwise would: the
+    # connection of this thread, and populating the URL resolvers
+    _ = get_resolver().reverse_dict
+    try:
+        latency = database_latency(alias)
+    except DatabaseError:
+        _LOGGER.warning("Database unavailable during warm-up", exc_info=True)
+    else:
+        _LOGGER.info("Warmed up, database latency %.1f ms", latency * 1000)
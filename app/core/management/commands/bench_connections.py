@@ -0,0 +1,142 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from http import HTTPStatus
+from http.client import HTTPConnection
+from statistics import quantiles
+from threading import Thread
+from time import perf_counter
+from typing import Any
+from wsgiref.simple_server import WSGIRequestHandler
+from wsgiref.simple_server import WSGIServer
+from wsgiref.simple_server import make_server
+
+from beartype import beartype
+from core.backends.postgresql.base import CONNECTION_STATS
+from core.models import User
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import BaseCommand
+from django.core.management import CommandError
+from django.core.management.base import CommandParser
+from django.db import connection
+from django.db import connections
+from django.test.utils import override_settings
+from django.urls import reverse
+from recipe.caching import invalidate_responses
+from recipe.synthetic import seed
+from rest_framework.authtoken.models import Token
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure request latency through a real WSGI server, whose request "
+        "signals open and close connections, with connections closed after "
+        "each request and kept for reuse. The dataset is committed, as the "
+        "server runs on a thread of its own, and deleted afterwards"
+    )
+
+    @beartype
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--requests", type=int, default=200, help="per endpoint and mode"
+        )
+        parser.add_argument("--recipes", type=int, default=100)
+        parser.add_argument(
+            "--max-age", type=int, default=60, help="seconds, when reusing"
+        )
+
+    @beartype
+    def handle(self, *_args: Any, **options: Any) -> None:
+        dataset = seed(
+            users=1, recipes=options["recipes"], tags=5, ingredients=5
+        )
+        user = dataset.user
+        try:
+            token = Token.objects.create(user=user).key
+            endpoints = {
+                "health ready": reverse("health:ready"),
+                "recipe list": reverse("recipe:recipe-list"),
+            }
+            self.stdout.write(
+                f"{'mode':<8} {'endpoint':<14} {'p50 ms':>8} {'p90 ms':>8} "
+                f"{'p99 ms':>8} {'opened':>7} {'reused':>7} {'discarded':>9}"
+            )
+            for mode, max_age in [("close", 0), ("reuse", options["max_age"])]:
+                for name, path in endpoints.items():
+                    CONNECTION_STATS.reset()
+                    with _server(max_age) as port:
+                        latencies = [
+                            _get(port, path, token, user.pk)
+                            for _ in range(options["requests"])
+                        ]
+                    percentiles = quantiles(
+                        latencies, n=100, method="inclusive"
+                    )
+                    self.stdout.write(
+                        f"{mode:<8} {name:<14} "
+                        f"{percentiles[49] * 1000:>8.2f} "
+                        f"{percentiles[89] * 1000:>8.2f} "
+                        f"{percentiles[98] * 1000:>8.2f} "
+                        f"{CONNECTION_STATS.opened:>7} "
+                        f"{CONNECTION_STATS.reused:>7} "
+                        f"{CONNECTION_STATS.discarded:>9}"
+                    )
+        finally:
+            # cascades to everything the user owns
+            _ = User.objects.filter(pk=user.pk).delete()
+
+
+class _QuietHandler(WSGIRequestHandler):
+    @beartype
+    def log_message(self, *_args: Any) -> None:
+        ...
+
+
+@contextmanager
+@beartype
+def _server(max_age: int) -> Iterator[int]:
+    # all threads share the settings of an alias
+    settings_dict = connection.settings_dict
+    previous = settings_dict["CONN_MAX_AGE"]
+    settings_dict["CONN_MAX_AGE"] = max_age
+    server: WSGIServer = make_server(
+        "127.0.0.1", 0, WSGIHandler(), handler_class=_QuietHandler
+    )
+
+    @beartype
+    def serve() -> None:
+        try:
+            server.serve_forever(poll_interval=0.01)
+        finally:
+            connections.close_all()
+
+    thread = Thread(target=serve)
+    try:
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "127.0.0.1"]
+        ):
+            thread.start()
+            yield server.server_port
+    finally:
+        server.shutdown()
+        thread.join()
+        server.server_close()
+        settings_dict["CONN_MAX_AGE"] = previous
+
+
+@beartype
+def _get(port: int, path: str, token: str, user_id: int) -> float:
+    # cached responses would not touch the database
+    invalidate_responses([user_id])
+    client = HTTPConnection("127.0.0.1", port)
+    try:
+        start = perf_counter()
+        client.request("GET", path, headers={"Authorization": f"Token {token}"})
+        response = client.getresponse()
+        _ = response.read()
+        latency = perf_counter() - start
+    finally:
+        client.close()
+    if response.status != HTTPStatus.OK:
+        raise CommandError(f"GET {path} answered {response.status}")
+    return latency
@@ -0,0 +1,158 @@
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass
+from dataclasses import field
+from statistics import quantiles
+from threading import Event
+from threading import Lock
+from threading import Thread
+from time import perf_counter
+from time import sleep
+from typing import Any
+
+from beartype import beartype
+from core.models import User
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.core.management.base import CommandParser
+from django.db import connections
+from django.test.utils import override_settings
+from django.urls import reverse
+from recipe.synthetic import seed
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+
+PASSWORD = "benchmark"  # noqa: S105
+# Django's own hasher, hashing on the request threads
+UNBOUNDED_HASHERS = ["django.contrib.auth.hashers.PBKDF2PasswordHasher"]
+
+
+@dataclass
+class Load:
+    # what each kind of client saw during one phase
+    seconds: float = 0.0
+    reads: list[float] = field(default_factory=list)
+    logins: Counter[int] = field(default_factory=Counter)
+    lock: Lock = field(default_factory=Lock)
+
+    @beartype
+    def row(self, name: str) -> str:
+        percentiles = quantiles(self.reads, n=100, method="inclusive")
+        logins = sum(self.logins.values())
+        return (
+            f"{name:<16} {len(self.reads) / self.seconds:>8.1f} "
+            f"{percentiles[49] * 1000:>8.1f} {percentiles[98] * 1000:>8.1f} "
+            f"{self.logins[200] / self.seconds:>9.1f} "
+            f"{self.logins[503] / max(logins, 1):>8.0%}"
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure recipe list throughput alone, then during a flood of "
+        "logins, with passwords hashed in the bounded pool and, for "
+        "comparison, on the request threads. The dataset is committed, as "
+        "clients run on threads of their own, and deleted afterwards"
+    )
+
+    @beartype
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--duration", type=float, default=5.0, help="seconds per phase"
+        )
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--flooders", type=int, default=32)
+        parser.add_argument("--recipes", type=int, default=100)
+
+    @beartype
+    def handle(self, *_args: Any, **options: Any) -> None:
+        dataset = seed(
+            users=1, recipes=options["recipes"], tags=5, ingredients=5
+        )
+        user = dataset.user
+        try:
+            user.set_password(PASSWORD)
+            user.save()
+            token = Token.objects.create(user=user).key
+            # the test client's host is only allowed under the test runner
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+            ):
+                phases = [("alone", settings.PASSWORD_HASHERS, 0)]
+                for name, hashers in [
+                    ("pooled flood", settings.PASSWORD_HASHERS),
+                    ("unbounded flood", UNBOUNDED_HASHERS),
+                ]:
+                    phases.append((name, hashers, options["flooders"]))
+                self.stdout.write(
+                    f"{'phase':<16} {'reads/s':>8} {'p50 ms':>8} "
+                    f"{'p99 ms':>8} {'logins/s':>9} {'503s':>8}"
+                )
+                for name, hashers, flooders in phases:
+                    with override_settings(PASSWORD_HASHERS=hashers):
+                        load = _run(
+                            user, token, flooders=flooders, options=options
+                        )
+                    self.stdout.write(load.row(name))
+        finally:
+            # cascades to everything the user owns
+            _ = User.objects.filter(pk=user.pk).delete()
+
+
+@beartype
+def _run(
+    user: User, token: str, *, flooders: int, options: dict[str, Any]
+) -> Load:
+    load, stop = Load(), Event()
+
+    @beartype
+    def read() -> None:
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+        while not stop.is_set():
+            start = perf_counter()
+            _ = client.get(reverse("recipe:recipe-list"))
+            with load.lock:
+                load.reads.append(perf_counter() - start)
+
+    @beartype
+    def login() -> None:
+        client = APIClient()
+        while not stop.is_set():
+            res = client.post(
+                reverse("user:token"),
+                {"email": user.email, "password": PASSWORD},
+            )
+            with load.lock:
+                load.logins[res.status_code] += 1
+            # as well-behaved clients would
+            if (retry_after := res.get("Retry-After")) is not None:
+                _ = stop.wait(int(retry_after))
+
+    threads = [
+        Thread(target=_closing(run))
+        for run in [*[read] * options["readers"], *[login] * flooders]
+    ]
+    start = perf_counter()
+    for thread in threads:
+        thread.start()
+    sleep(options["duration"])
+    stop.set()
+    for thread in threads:
+        thread.join()
+    load.seconds = perf_counter() - start
+    return load
+
+
+@beartype
+def _closing(run: Callable[[], None]) -> Callable[[], None]:
+    @beartype
+    def closing() -> None:
+        try:
+            run()
+        finally:
+            # each thread has connections of its own
+            connections.close_all()
+
+    return closing
@@ -1,20 +1,58 @@
 import time  # to be mocked
 from typing import Any
 
+from beartype import beartype
+from core.health import database_latency
 from django.core.management import BaseCommand
-from django.db import connections
-from django.db.backends.base.base import BaseDatabaseWrapper
+from django.core.management import CommandError
+from django.core.management.base import CommandParser
+from django.db import DEFAULT_DB_ALIAS
 from django.db.utils import OperationalError
 
 
 class Command(BaseCommand):
-    def handle(self, *_args: Any, **_kwargs: Any) -> None:
+    help = (
+        "Wait until the database answers a query, retrying with exponential "
+        "backoff until a deadline"
+    )
+
+    @beartype
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument(
+            "--deadline", type=float, default=60.0, help="seconds"
+        )
+        parser.add_argument(
+            "--initial-delay", type=float, default=0.1, help="seconds"
+        )
+        parser.add_argument(
+            "--max-delay", type=float, default=5.0, help="seconds"
+        )
+
+    @beartype
+    def handle(self, *_args: Any, **options: Any) -> None:
         self.stdout.write("Waiting for database...")
-        db_conn: BaseDatabaseWrapper | None = None
-        while db_conn is None:
+        deadline = time.monotonic() + options["deadline"]
+        delay = options["initial_delay"]
+        while True:
             try:
-                db_conn = connections["default"]
-            except OperationalError:
-                self.stdout.write("Database unavailable, waiting 1 second...")
-                time.sleep(1)
-        self.stdout.write(self.style.SUCCESS("Database available"))
+                latency = database_latency(options["database"])
+            except OperationalError as error:
+                if (remaining := deadline - time.monotonic()) <= 0:
+                    raise CommandError(
+                        f"Database unavailable after {options['deadline']} "
+                        f"seconds: {error}"
+                    ) from error
+                wait = min(delay, remaining)
+                self.stdout.write(
+                    f"Database unavailable, waiting {wait:.1f} seconds..."
+                )
+                time.sleep(wait)
+                delay = min(delay * 2, options["max_delay"])
+            else:
+                break
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Database available, latency {latency * 1000:.1f} ms"
+            )
+        )
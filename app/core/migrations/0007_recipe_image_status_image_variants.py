@@ -0,0 +1,31 @@
+# Generated by Django 4.0.4 on 2026-10-18 09:36
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("core", "0006_recipe_image")]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="image_status",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("", "None"),
+                    ("pending", "Pending"),
+                    ("ready", "Ready"),
+                    ("failed", "Failed"),
+                ],
+                max_length=16,
+            ),
+        ),
+        migrations.AddField(
+            model_name="recipe",
+            name="image_variants",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
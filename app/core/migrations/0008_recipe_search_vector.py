@@ -0,0 +1,55 @@
+# Generated by Django 4.0.4 on 2026-10-18 09:38
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef
+from django.db.models import Subquery
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+
+
+def populate_search_vector(apps, schema_editor):
+    Recipe = apps.get_model("core", "Recipe")
+
+    def names(model_name):
+        model = apps.get_model("core", model_name)
+        names = (
+            model.objects.filter(recipe=OuterRef("pk"))
+            .values("recipe")
+            .annotate(names=StringAgg("name", " "))
+            .values("names")
+        )
+        return Coalesce(Subquery(names), Value(""))
+
+    config = settings.SEARCH_CONFIG
+    Recipe.objects.update(
+        search_vector=SearchVector("title", weight="A", config=config)
+        + SearchVector(names("Tag"), weight="B", config=config)
+        + SearchVector(names("Ingredient"), weight="B", config=config)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("core", "0007_recipe_image_status_image_variants")]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recipe",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="core_recipe_search_gin"
+            ),
+        ),
+        migrations.RunPython(populate_search_vector, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,109 @@
+# Generated by Django 4.0.4 on 2026-10-18 09:47
+
+from copy import copy
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations
+from django.db import models
+
+
+# (relation, target field, reverse index) of the recipe many-to-many fields
+THROUGH_FIELDS = [
+    ("tags", "tag", "core_recipe_tags_reverse_idx"),
+    ("ingredients", "ingredient", "core_recipe_ingredients_reverse_idx"),
+]
+
+
+def _through_indexes(apps):
+    # the through models keep their foreign key indexes in the migration
+    # state, so each field comes with a copy of it without the index
+    recipe = apps.get_model("core", "Recipe")
+    for relation, target, name in THROUGH_FIELDS:
+        through = recipe._meta.get_field(relation).remote_field.through
+        fields = []
+        for field_name in [target, "recipe"]:
+            indexed = through._meta.get_field(field_name)
+            unindexed = copy(indexed)
+            unindexed.db_index = False
+            fields.append((indexed, unindexed))
+        index = models.Index(fields=[target, "recipe"], name=name)
+        yield through, index, fields
+
+
+def create_reverse_indexes(apps, schema_editor):
+    for through, index, fields in _through_indexes(apps):
+        schema_editor.add_index(through, index)
+        # (recipe, target) is already covered by the unique constraint
+        for indexed, unindexed in fields:
+            schema_editor.alter_field(through, indexed, unindexed)
+
+
+def drop_reverse_indexes(apps, schema_editor):
+    for through, index, fields in _through_indexes(apps):
+        for indexed, unindexed in fields:
+            schema_editor.alter_field(through, unindexed, indexed)
+        schema_editor.remove_index(through, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("core", "0008_recipe_search_vector")]
+
+    operations = [
+        # create the composite indexes before dropping the single-column ones
+        # they supersede
+        migrations.AddIndex(
+            model_name="ingredient",
+            index=models.Index(
+                fields=["user", "name", "id"],
+                name="core_ingredient_user_name_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recipe",
+            index=models.Index(
+                fields=["user", "id"], name="core_recipe_user_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tag",
+            index=models.Index(
+                fields=["user", "name", "id"], name="core_tag_user_name_idx"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="ingredient",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="recipe",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="tag",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        # the through tables are auto-created, so their indexes are managed
+        # through the schema editor on their historical models; (target, recipe) covers `tags=`, `ingredients=`
+        # and `assigned_only=` as index-only scans and supersedes the
+        # single-column indexes Django adds for each foreign key
+        migrations.RunPython(
+            create_reverse_indexes, drop_reverse_indexes, elidable=False
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.0.4 on 2026-10-18 09:56
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations
+from django.db import models
+
+
+def create_versions(apps, schema_editor):
+    User = apps.get_model("core", "User")
+    CollectionVersion = apps.get_model("core", "CollectionVersion")
+    CollectionVersion.objects.bulk_create(
+        [
+            CollectionVersion(user_id=pk)
+            for pk in User.objects.values_list("pk", flat=True)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("core", "0009_composite_indexes")]
+
+    operations = [
+        migrations.CreateModel(
+            name="CollectionVersion",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("version", models.BigIntegerField(default=0)),
+                (
+                    "modified",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+        ),
+        migrations.RunPython(create_versions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,93 @@
+# Generated by Django 4.0.4 on 2026-10-18 11:29
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations
+from django.db import models
+
+
+COUNTED = [
+    ("core_tag", "core_recipe_tags", "tag_id"),
+    ("core_ingredient", "core_recipe_ingredients", "ingredient_id"),
+]
+
+
+def count_existing(apps, schema_editor):
+    for table, through, column in COUNTED:
+        schema_editor.execute(
+            f"UPDATE {table} SET recipe_count = "
+            f"(SELECT count(*) FROM {through} WHERE {column} = {table}.id)"
+        )
+    schema_editor.execute(
+        """
+        INSERT INTO core_recipestats
+            (user_id, recipe_count, price_total, time_total, time_counts)
+        SELECT
+            u.id,
+            COALESCE(totals.recipe_count, 0),
+            COALESCE(totals.price_total, 0),
+            COALESCE(totals.time_total, 0),
+            COALESCE(times.time_counts, '{}')
+        FROM core_user u
+        LEFT JOIN (
+            SELECT
+                user_id,
+                count(*) AS recipe_count,
+                sum(price) AS price_total,
+                sum(time_minutes) AS time_total
+            FROM core_recipe
+            GROUP BY user_id
+        ) totals ON totals.user_id = u.id
+        LEFT JOIN (
+            SELECT user_id, jsonb_object_agg(time_minutes, n) AS time_counts
+            FROM (
+                SELECT user_id, time_minutes, count(*) AS n
+                FROM core_recipe
+                GROUP BY user_id, time_minutes
+            ) counts
+            GROUP BY user_id
+        ) times ON times.user_id = u.id
+        """
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("core", "0010_collectionversion")]
+
+    operations = [
+        migrations.CreateModel(
+            name="RecipeStats",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("recipe_count", models.BigIntegerField(default=0)),
+                (
+                    "price_total",
+                    models.DecimalField(
+                        decimal_places=2, default=0, max_digits=15
+                    ),
+                ),
+                ("time_total", models.BigIntegerField(default=0)),
+                ("time_counts", models.JSONField(default=dict)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="ingredient",
+            name="recipe_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="tag",
+            name="recipe_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_existing, migrations.RunPython.noop),
+    ]
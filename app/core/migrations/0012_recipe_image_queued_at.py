@@ -0,0 +1,17 @@
+# Generated by Django 4.0.4 on 2026-10-18 12:07
+
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("core", "0011_recipe_stats")]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="image_queued_at",
+            field=models.DateTimeField(editable=False, null=True),
+        )
+    ]
@@ -0,0 +1,12 @@
+# Generated by Django 4.0.4 on 2026-10-18 12:47
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("core", "0012_recipe_image_queued_at")]
+
+    operations = [
+        migrations.RemoveField(model_name="collectionversion", name="modified")
+    ]
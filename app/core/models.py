@@ -7,16 +7,24 @@ from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser
 from django.contrib.auth.models import BaseUserManager
 from django.contrib.auth.models import PermissionsMixin
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db.models import CASCADE
+from django.db.models import BigIntegerField
 from django.db.models import BooleanField
 from django.db.models import CharField
+from django.db.models import DateTimeField
 from django.db.models import DecimalField
 from django.db.models import EmailField
 from django.db.models import ForeignKey
 from django.db.models import ImageField
+from django.db.models import Index
 from django.db.models import IntegerField
+from django.db.models import JSONField
 from django.db.models import ManyToManyField
 from django.db.models import Model
+from django.db.models import OneToOneField
+from django.db.models import TextChoices
 
 
 @beartype
@@ -59,7 +67,18 @@ class User(AbstractBaseUser, PermissionsMixin):
 
 class Tag(Model):
     name = CharField(max_length=255)
-    user = ForeignKey(settings.AUTH_USER_MODEL, on_delete=CASCADE)
+    # covered by the leading column of the composite index
+    user = ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=CASCADE, db_index=False
+    )
+    # maintained by `recipe.stats`
+    recipe_count = IntegerField(default=0, editable=False)
+
+    class Meta:
+        # lists filter by user and page over (name, id)
+        indexes = [
+            Index(fields=["user", "name", "id"], name="core_tag_user_name_idx")
+        ]
 
     @beartype
     def __str__(self) -> str:
@@ -68,15 +87,39 @@ class Tag(Model):
 
 class Ingredient(Model):
     name = CharField(max_length=255)
-    user = ForeignKey(settings.AUTH_USER_MODEL, on_delete=CASCADE)
+    # covered by the leading column of the composite index
+    user = ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=CASCADE, db_index=False
+    )
+    # maintained by `recipe.stats`
+    recipe_count = IntegerField(default=0, editable=False)
+
+    class Meta:
+        # lists filter by user and page over (name, id)
+        indexes = [
+            Index(
+                fields=["user", "name", "id"],
+                name="core_ingredient_user_name_idx",
+            )
+        ]
 
     @beartype
     def __str__(self) -> str:
         return self.name
 
 
+class ImageStatus(TextChoices):
+    NONE = ""
+    PENDING = "pending"
+    READY = "ready"
+    FAILED = "failed"
+
+
 class Recipe(Model):
-    user = ForeignKey(settings.AUTH_USER_MODEL, on_delete=CASCADE)
+    # covered by the leading column of the composite index
+    user = ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=CASCADE, db_index=False
+    )
     title = CharField(max_length=255)
     time_minutes = IntegerField()
     price = DecimalField(max_digits=5, decimal_places=2)
@@ -84,7 +127,46 @@ class Recipe(Model):
     ingredients = ManyToManyField("Ingredient")
     tags = ManyToManyField("Tag")
     image = ImageField(null=True, upload_to=recipe_image_file_path)
+    image_status = CharField(
+        max_length=16, choices=ImageStatus.choices, blank=True
+    )
+    image_variants = JSONField(default=dict, blank=True)
+    # when processing of `image` was last scheduled, so that jobs lost with
+    # their process can be swept up
+    image_queued_at = DateTimeField(null=True, editable=False)
+    # maintained by `recipe.search` from the title, tag and ingredient names
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # lists filter by user and page over id
+            Index(fields=["user", "id"], name="core_recipe_user_id_idx"),
+            GinIndex(fields=["search_vector"], name="core_recipe_search_gin"),
+        ]
 
     @beartype
     def __str__(self) -> str:
         return self.title
+
+
+class CollectionVersion(Model):
+    # bumped by `recipe.versions` on every write to the user's recipes, tags
+    # or ingredients, so that list responses can be validated without
+    # querying them
+    user = OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=CASCADE, primary_key=True
+    )
+    version = BigIntegerField(default=0)
+
+
+class RecipeStats(Model):
+    # maintained by `recipe.stats` as the user's recipes change, so that
+    # their totals are read without aggregating the recipes
+    user = OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=CASCADE, primary_key=True
+    )
+    recipe_count = BigIntegerField(default=0)
+    price_total = DecimalField(max_digits=15, decimal_places=2, default=0)
+    time_total = BigIntegerField(default=0)
+    # recipes per `time_minutes`, for the median
+    time_counts = JSONField(default=dict)
@@ -0,0 +1,38 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import ClassVar
+
+from beartype import beartype
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    # maximum queries per action, excluding authentication; these must not
+    # depend on the number of rows being read or written
+    query_budgets: ClassVar[dict[str, int]] = {}
+
+    @classmethod
+    @beartype
+    def get_query_budget(cls, action: str) -> int:
+        return cls.query_budgets[action]
+
+
+class QueryBudgetExceeded(AssertionError):
+    ...
+
+
+@contextmanager
+@beartype
+def assert_query_budget(
+    viewset: type[QueryBudgetMixin], action: str
+) -> Iterator[CaptureQueriesContext]:
+    budget = viewset.get_query_budget(action)
+    with CaptureQueriesContext(connection) as context:
+        yield context
+    if (num_queries := len(context)) > budget:
+        queries = "\n".join(query["sql"] for query in context.captured_queries)
+        raise QueryBudgetExceeded(
+            f"{viewset.__name__}.{action} ran {num_queries} queries, "
+            f"exceeding its budget of {budget}:\n{queries}"
+        )
@@ -0,0 +1,83 @@
+from collections.abc import Mapping
+from math import isfinite
+from typing import Any
+
+import orjson
+from beartype import beartype
+from core.timing import timed
+from rest_framework.renderers import JSONRenderer
+
+
+# JSONEncoder writes some floats with an exponent, which orjson writes as
+# `1e16` rather than `1e+16`, or not at all for small ones (`0.00001`). Such
+# output is spotted by mapping digits to "0" and exponent markers to "e",
+# much faster than a regular expression would; matches within strings only
+# cost the fast path
+_DIGITS_AND_EXPONENTS = bytes(
+    ord("0") if byte in b"0123456789" else ord("e") if byte in b"eE" else byte
+    for byte in range(256)
+)
+# left to JSONEncoder's `default`, as orjson would format them differently
+_PASSTHROUGH = (
+    orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+)
+
+
+class ORJSONRenderer(JSONRenderer):
+    # renders what `JSONRenderer` does, byte for byte, with orjson; anything
+    # orjson rejects or would render differently (non-string keys, integers
+    # beyond 64 bits, floats with exponents, indentation, ASCII-only or
+    # non-compact output) is rendered by `JSONRenderer` itself, as is data
+    # with non-finite floats, which orjson renders as null and
+    # `JSONRenderer` refuses
+
+    @beartype
+    def render(
+        self,
+        data: Any,
+        accepted_media_type: str | None = None,
+        renderer_context: Mapping[str, Any] | None = None,
+    ) -> bytes:
+        if data is None:
+            return b""
+        with timed("render"):
+            indent = self.get_indent(
+                accepted_media_type, renderer_context or {}
+            )
+            if (
+                indent is None
+                and self.compact
+                and not self.ensure_ascii
+                and (ret := self._render_fast(data)) is not None
+            ):
+                return ret
+            return super().render(data, accepted_media_type, renderer_context)
+
+    @beartype
+    def _render_fast(self, data: Any) -> bytes | None:
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default, option=_PASSTHROUGH
+            )
+        except orjson.JSONEncodeError:
+            return None
+        if b"0e" in ret.translate(_DIGITS_AND_EXPONENTS) or b"0.0000" in ret:
+            return None
+        # only output with nulls is searched for the floats they may be
+        if b"null" in ret and _has_non_finite(data):
+            return None
+        # as `JSONRenderer`, keep the output a subset of JavaScript
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9", b"\\u2029"
+        )
+
+
+@beartype
+def _has_non_finite(data: Any) -> bool:
+    if isinstance(data, float):
+        return not isfinite(data)
+    if isinstance(data, Mapping):
+        return any(_has_non_finite(value) for value in data.values())
+    if isinstance(data, (list, tuple)):
+        return any(_has_non_finite(value) for value in data)
+    return False
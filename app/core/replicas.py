@@ -0,0 +1,136 @@
+from collections.abc import Iterable
+from contextvars import ContextVar
+from functools import cache
+from random import choice
+from typing import Any
+
+from beartype import beartype
+from core.cache import LocalCache
+from core.cache import SharedCache
+from core.cache import build_cache
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.db import transaction
+from django.db.models import Model
+from django.http.response import HttpResponseBase
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.request import Request
+
+
+# the alias reads go to, set by `ReplicaReadMixin` for the duration of a view
+_READ_ALIAS: ContextVar[str | None] = ContextVar("_READ_ALIAS", default=None)
+
+
+class ReplicaRouter:
+    # reads go to the replica chosen for the current view, if any, and
+    # everything else to the primary. Replicas hold the same data, so
+    # relations between their objects and the primary's are allowed
+
+    @beartype
+    def db_for_read(
+        self, model: type[Model], **hints: Any  # noqa: U100
+    ) -> str | None:
+        return _READ_ALIAS.get()
+
+    @beartype
+    def db_for_write(
+        self, model: type[Model], **hints: Any  # noqa: U100
+    ) -> str:
+        # not the alias of an instance read from a replica
+        return DEFAULT_DB_ALIAS
+
+    @beartype
+    def allow_relation(
+        self, obj1: Model, obj2: Model, **hints: Any  # noqa: U100
+    ) -> bool | None:
+        aliases = {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
+        if {obj1._state.db, obj2._state.db} <= aliases:
+            return True
+        return None
+
+
+class ReplicaReadMixin:
+    # reads of safe requests go to a replica, unless the user wrote within
+    # the last `REPLICA_STICKY_SECONDS`, in which case they stay on the
+    # primary so as to see their own writes despite replication lag. The
+    # replica is chosen once authenticated, so tokens are always read from
+    # the primary
+
+    @beartype
+    def initial(self, request: Request, *args: Any, **kwargs: Any) -> None:
+        super().initial(request, *args, **kwargs)  # type: ignore
+        if (
+            request.method in SAFE_METHODS
+            and settings.REPLICA_DATABASES
+            and not is_sticky(request.user.pk)
+        ):
+            # only spreads load, so needs no secure source
+            self._read_alias_token = _READ_ALIAS.set(
+                choice(settings.REPLICA_DATABASES)  # noqa: S311
+            )
+
+    @beartype
+    def finalize_response(
+        self,
+        request: Request,
+        response: HttpResponseBase,
+        *args: Any,
+        **kwargs: Any,
+    ) -> HttpResponseBase:
+        if (token := getattr(self, "_read_alias_token", None)) is not None:
+            _READ_ALIAS.reset(token)
+            del self._read_alias_token
+        elif (
+            request.method not in SAFE_METHODS and request.user.is_authenticated
+        ):
+            mark_written([request.user.pk])
+        return super().finalize_response(  # type: ignore
+            request, response, *args, **kwargs
+        )
+
+
+@beartype
+def mark_written(user_ids: Iterable[int]) -> None:
+    # from the commit on, as that is when replicas start to lag behind
+    user_ids = set(user_ids)
+    transaction.on_commit(lambda: _stick(user_ids))
+
+
+@beartype
+def is_sticky(user_id: int | None) -> bool:
+    return (
+        user_id is not None
+        and get_sticky_cache().get(_sticky_key(user_id)) is not None
+    )
+
+
+@beartype
+def _stick(user_ids: set[int]) -> None:
+    cache = get_sticky_cache()
+    for user_id in user_ids:
+        cache.set(_sticky_key(user_id), True)
+
+
+@beartype
+def get_sticky_cache() -> LocalCache | SharedCache:
+    return _build_sticky_cache(
+        settings.REPLICA_STICKY_ALIAS,
+        settings.REPLICA_STICKY_MAX_SIZE,
+        settings.REPLICA_STICKY_SECONDS,
+    )
+
+
+@cache
+@beartype
+def _build_sticky_cache(
+    alias: str | None, max_size: int, timeout: float
+) -> LocalCache | SharedCache:
+    # entries expire with the window
+    return build_cache(
+        alias, max_size=max_size, timeout=timeout, key_prefix="sticky"
+    )
+
+
+@beartype
+def _sticky_key(user_id: int) -> str:
+    return str(user_id)
@@ -0,0 +1,42 @@
+from unittest.mock import patch
+
+from beartype import beartype
+from core.cache import LocalCache
+from django.test import SimpleTestCase
+
+
+class TestLocalCache(SimpleTestCase):
+    @beartype
+    def test_get_and_set(self) -> None:
+        cache = LocalCache(max_size=2, timeout=60.0)
+        cache.set("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+
+    @beartype
+    def test_least_recently_used_evicted(self) -> None:
+        cache = LocalCache(max_size=2, timeout=60.0)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        _ = cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+
+    @beartype
+    def test_expired(self) -> None:
+        cache = LocalCache(max_size=2, timeout=60.0)
+        with patch("core.cache.monotonic", return_value=0.0):
+            cache.set("a", 1)
+        with patch("core.cache.monotonic", return_value=61.0):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+
+    @beartype
+    def test_delete(self) -> None:
+        cache = LocalCache(max_size=2, timeout=60.0)
+        cache.set("a", 1)
+        cache.delete("a")
+        cache.delete("b")
+        self.assertIsNone(cache.get("a"))
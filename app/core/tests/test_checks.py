@@ -0,0 +1,37 @@
+from beartype import beartype
+from core.checks import check_replica_sticky_cache
+from core.checks import is_shared_cache
+from django.test import SimpleTestCase
+from django.test.utils import override_settings
+
+
+LOCAL = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+SHARED = {"BACKEND": "django.core.cache.backends.db.DatabaseCache"}
+
+
+@override_settings(CACHES={"default": LOCAL, "shared": SHARED})
+class TestChecks(SimpleTestCase):
+    @beartype
+    def test_is_shared_cache(self) -> None:
+        for alias, expected in [
+            (None, False),
+            ("default", False),
+            ("missing", False),
+            ("shared", True),
+        ]:
+            self.assertEqual(is_shared_cache(alias), expected, alias)
+
+    @beartype
+    def test_replica_sticky_cache(self) -> None:
+        for replicas, alias, errors in [
+            ([], None, []),
+            (["replica_0"], None, ["core.E001"]),
+            (["replica_0"], "default", ["core.E001"]),
+            (["replica_0"], "shared", []),
+        ]:
+            with override_settings(
+                REPLICA_DATABASES=replicas, REPLICA_STICKY_ALIAS=alias
+            ):
+                self.assertEqual(
+                    [error.id for error in check_replica_sticky_cache()], errors
+                )
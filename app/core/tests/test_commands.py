@@ -1,7 +1,10 @@
+from io import StringIO
 from itertools import chain
+from unittest.mock import call
 from unittest.mock import patch
 
 from beartype import beartype
+from django.core.management import CommandError
 from django.core.management import call_command
 from django.db.utils import OperationalError
 from django.test import TestCase
@@ -10,17 +13,29 @@ from django.test import TestCase
 class TestCommand(TestCase):
     @beartype
     def test_wait_for_db_ready(self) -> None:
-        with patch(
-            "django.db.utils.ConnectionHandler.__getitem__", return_value=True
-        ) as gi:
-            _ = call_command("wait_for_db")
-            self.assertEqual(gi.call_count, 1)
+        out = StringIO()
+        _ = call_command("wait_for_db", stdout=out)
+        self.assertIn("Database available", out.getvalue())
 
     @beartype
     def test_wait_for_db_waiting(self) -> None:
-        with patch("time.sleep", return_value=True), patch(
-            "django.db.utils.ConnectionHandler.__getitem__",
-            side_effect=list(chain(5 * [OperationalError], [True])),
-        ) as gi:
-            _ = call_command("wait_for_db")
-            self.assertEqual(gi.call_count, 6)
+        with patch("time.sleep", return_value=True) as sleep, patch(
+            "core.management.commands.wait_for_db.database_latency",
+            side_effect=list(chain(5 * [OperationalError], [0.001])),
+        ) as latency:
+            _ = call_command("wait_for_db", max_delay=1.0, stdout=StringIO())
+            self.assertEqual(latency.call_count, 6)
+        # backing off exponentially, up to the maximum delay
+        self.assertEqual(
+            sleep.call_args_list,
+            [call(0.1), call(0.2), call(0.4), call(0.8), call(1.0)],
+        )
+
+    @beartype
+    def test_wait_for_db_deadline(self) -> None:
+        with patch("time.sleep", return_value=True) as sleep, patch(
+            "core.management.commands.wait_for_db.database_latency",
+            side_effect=OperationalError,
+        ), self.assertRaises(CommandError):
+            _ = call_command("wait_for_db", deadline=0, stdout=StringIO())
+        sleep.assert_not_called()
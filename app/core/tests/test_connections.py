@@ -0,0 +1,136 @@
+from collections.abc import Callable
+from io import StringIO
+from threading import Thread
+from typing import cast
+from unittest.mock import patch
+
+from beartype import beartype
+from core.backends.postgresql.base import CONNECTION_STATS
+from core.backends.postgresql.base import open_connections
+from core.models import User
+from core.models import UserManager
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import close_old_connections
+from django.db import connection
+from django.db import connections
+from django.test import TestCase
+from django.test import TransactionTestCase
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_403_FORBIDDEN
+from rest_framework.test import APIClient
+
+
+CONNECTIONS_URL = reverse("health:connections")
+
+
+@beartype
+def _request() -> None:
+    # what a server thread does per request
+    close_old_connections()
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    close_old_connections()
+
+
+@beartype
+def _on_thread(*steps: Callable[[], None]) -> None:
+    # on a connection of its own, outside the test's transaction
+    @beartype
+    def run() -> None:
+        try:
+            for step in steps:
+                step()
+        finally:
+            connections.close_all()
+
+    thread = Thread(target=run)
+    thread.start()
+    thread.join()
+
+
+@beartype
+def _break() -> None:
+    connection.connection.close()
+
+
+class TestDatabaseWrapper(TestCase):
+    @beartype
+    def setUp(self) -> None:
+        CONNECTION_STATS.reset()
+
+    @beartype
+    def _stats(self) -> tuple[int, int, int]:
+        return (
+            CONNECTION_STATS.opened,
+            CONNECTION_STATS.reused,
+            CONNECTION_STATS.discarded,
+        )
+
+    @beartype
+    def test_reused(self) -> None:
+        with patch.dict(connection.settings_dict, CONN_MAX_AGE=60):
+            _on_thread(_request, _request, _request)
+        self.assertEqual(self._stats(), (1, 2, 0))
+
+    @beartype
+    def test_closed_with_each_request_without_max_age(self) -> None:
+        with patch.dict(connection.settings_dict, CONN_MAX_AGE=0):
+            _on_thread(_request, _request)
+        self.assertEqual(self._stats(), (2, 0, 2))
+
+    @beartype
+    def test_broken_connection_replaced(self) -> None:
+        with patch.dict(connection.settings_dict, CONN_MAX_AGE=60):
+            _on_thread(_request, _break, _request)
+        self.assertEqual(self._stats(), (2, 0, 1))
+
+    @beartype
+    def test_connections_beyond_pool_size_discarded(self) -> None:
+        with patch.dict(
+            connection.settings_dict,
+            CONN_MAX_AGE=60,
+            CONN_POOL_SIZE=open_connections(),
+        ):
+            _on_thread(_request, _request)
+        self.assertEqual(self._stats(), (2, 0, 2))
+
+
+class TestConnectionStatsView(TestCase):
+    @beartype
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = cast(UserManager, get_user_model().objects).create_user(
+            email="test@example.com", password="password"
+        )
+        self.client.force_authenticate(self.user)
+
+    @beartype
+    def test_admins_only(self) -> None:
+        with self.assertLogs("django.request", "WARNING"):
+            res = self.client.get(CONNECTIONS_URL)
+        self.assertEqual(res.status_code, HTTP_403_FORBIDDEN)
+        self.user.is_staff = True
+        self.user.save()
+        res = self.client.get(CONNECTIONS_URL)
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual(
+            set(res.data),
+            {"opened", "reused", "discarded", "open", "pool_size", "max_age"},
+        )
+
+
+class TestBenchConnections(TransactionTestCase):
+    @beartype
+    def test_reports_both_modes_and_cleans_up(self) -> None:
+        out = StringIO()
+        call_command("bench_connections", requests=3, recipes=5, stdout=out)
+        rows = [line.split() for line in out.getvalue().splitlines()[1:]]
+        self.assertEqual(
+            [row[0] for row in rows], ["close", "close", "reuse", "reuse"]
+        )
+        # opened, reused, discarded
+        self.assertEqual(rows[0][-3:], ["3", "0", "3"])
+        self.assertEqual(rows[2][-3:], ["1", "2", "0"])
+        self.assertFalse(User.objects.exists())
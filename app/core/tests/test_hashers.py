@@ -0,0 +1,141 @@
+from io import StringIO
+from threading import Event
+from threading import Thread
+from threading import current_thread
+from typing import cast
+from unittest.mock import patch
+
+from beartype import beartype
+from core.hashers import PasswordHashingUnavailable
+from core.hashers import PooledPBKDF2PasswordHasher
+from core.models import User
+from core.models import UserManager
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.test import TestCase
+from django.test import TransactionTestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.exceptions import APIException
+from rest_framework.status import HTTP_503_SERVICE_UNAVAILABLE
+from rest_framework.test import APIClient
+
+
+CREATE_USER_URL = reverse("user:create")
+TOKEN_URL = reverse("user:token")
+
+
+class TestPooledPBKDF2PasswordHasher(TestCase):
+    @beartype
+    def test_same_hashes_on_pool_threads(self) -> None:
+        threads = []
+        encode = PBKDF2PasswordHasher.encode
+
+        @beartype
+        def spy(*args: object) -> str:
+            threads.append(current_thread().name)
+            return encode(*args)  # type: ignore
+
+        with patch.object(PBKDF2PasswordHasher, "encode", spy):
+            hashed = PooledPBKDF2PasswordHasher().encode("password", "salt")
+        self.assertEqual(
+            hashed, PBKDF2PasswordHasher().encode("password", "salt")
+        )
+        [thread] = threads
+        self.assertTrue(thread.startswith("password-hashing"))
+
+    @override_settings(PASSWORD_HASHING_WORKERS=1, PASSWORD_HASHING_QUEUE=0)
+    @beartype
+    def test_saturated_outside_api(self) -> None:
+        # a plain exception, as hashing also runs in the admin, forms and
+        # management commands
+        entered, release = Event(), Event()
+        encode = PBKDF2PasswordHasher.encode
+
+        @beartype
+        def blocking(*args: object) -> str:
+            entered.set()
+            _ = release.wait(10)
+            return encode(*args)  # type: ignore
+
+        with patch.object(PBKDF2PasswordHasher, "encode", blocking):
+            thread = Thread(target=make_password, args=["password"])
+            thread.start()
+            try:
+                self.assertTrue(entered.wait(10))
+                with self.assertRaises(PasswordHashingUnavailable) as context:
+                    _ = make_password("password")
+                self.assertNotIsInstance(context.exception, APIException)
+            finally:
+                release.set()
+                thread.join()
+
+    @override_settings(PASSWORD_HASHING_WORKERS=1, PASSWORD_HASHING_QUEUE=0)
+    @beartype
+    def test_saturated(self) -> None:
+        cast(UserManager, get_user_model().objects).create_user(
+            email="test@example.com", password="password"
+        )
+        entered, release = Event(), Event()
+        encode = PBKDF2PasswordHasher.encode
+
+        @beartype
+        def blocking(*args: object) -> str:
+            entered.set()
+            _ = release.wait(10)
+            return encode(*args)  # type: ignore
+
+        client = APIClient()
+        with patch.object(PBKDF2PasswordHasher, "encode", blocking):
+            # takes the only worker
+            thread = Thread(target=make_password, args=["password"])
+            thread.start()
+            try:
+                self.assertTrue(entered.wait(10))
+                for url, payload in [
+                    (
+                        TOKEN_URL,
+                        {"email": "test@example.com", "password": "password"},
+                    ),
+                    (
+                        CREATE_USER_URL,
+                        {
+                            "email": "new@example.com",
+                            "password": "password",
+                            "name": "New",
+                        },
+                    ),
+                ]:
+                    with self.assertLogs("django.request", "ERROR"):
+                        res = client.post(url, payload)
+                    self.assertEqual(
+                        res.status_code, HTTP_503_SERVICE_UNAVAILABLE
+                    )
+                    self.assertEqual(res["Retry-After"], "1")
+            finally:
+                release.set()
+                thread.join()
+        self.assertFalse(User.objects.filter(email="new@example.com").exists())
+        res = client.post(
+            TOKEN_URL, {"email": "test@example.com", "password": "password"}
+        )
+        self.assertIn("token", res.data)
+
+
+class TestBenchLoginFlood(TransactionTestCase):
+    @beartype
+    def test_reports_every_phase_and_cleans_up(self) -> None:
+        out = StringIO()
+        call_command(
+            "bench_login_flood",
+            duration=0.2,
+            readers=1,
+            flooders=2,
+            recipes=5,
+            stdout=out,
+        )
+        rows = [line.split()[0] for line in out.getvalue().splitlines()[1:]]
+        self.assertEqual(rows, ["alone", "pooled", "unbounded"])
+        self.assertFalse(User.objects.exists())
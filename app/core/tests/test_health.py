@@ -0,0 +1,66 @@
+from unittest.mock import patch
+
+from beartype import beartype
+from core.health import warm_up
+from django.db.utils import OperationalError
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_503_SERVICE_UNAVAILABLE
+from rest_framework.test import APIClient
+
+
+LIVE_URL = reverse("health:live")
+READY_URL = reverse("health:ready")
+
+
+class TestHealthEndpoints(TestCase):
+    @beartype
+    def setUp(self) -> None:
+        self.client = APIClient()
+
+    @beartype
+    def test_live(self) -> None:
+        res = self.client.get(LIVE_URL)
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual(res.data, {"status": "ok"})
+
+    @beartype
+    def test_ready(self) -> None:
+        res = self.client.get(READY_URL)
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual(res.data["status"], "ok")
+        self.assertGreater(res.data["database"]["latency_ms"], 0)
+
+    @override_settings(READINESS_MAX_DB_LATENCY=0.0)
+    @beartype
+    def test_not_ready_when_slow(self) -> None:
+        with self.assertLogs("django.request", "ERROR"):
+            res = self.client.get(READY_URL)
+        self.assertEqual(res.status_code, HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res.data["status"], "slow")
+
+    @beartype
+    def test_not_ready_when_unavailable(self) -> None:
+        with patch(
+            "core.views.database_latency", side_effect=OperationalError
+        ), self.assertLogs("django.request", "ERROR"):
+            res = self.client.get(READY_URL)
+        self.assertEqual(res.status_code, HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(
+            res.data,
+            {
+                "status": "unavailable",
+                "database": {"error": "OperationalError"},
+            },
+        )
+        # the database being down does not make the process unhealthy
+        self.assertEqual(self.client.get(LIVE_URL).status_code, HTTP_200_OK)
+
+    @beartype
+    def test_warm_up_tolerates_unavailable_database(self) -> None:
+        with patch(
+            "core.health.database_latency", side_effect=OperationalError
+        ), self.assertLogs("core.health", "WARNING"):
+            warm_up()
@@ -0,0 +1,131 @@
+from datetime import timedelta
+from datetime import timezone
+from io import BytesIO
+from typing import Any
+
+from beartype import beartype
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+from django.test import SimpleTestCase
+from django.utils.functional import lazystr
+from hypothesis import given
+from hypothesis.strategies import SearchStrategy
+from hypothesis.strategies import binary
+from hypothesis.strategies import booleans
+from hypothesis.strategies import builds
+from hypothesis.strategies import dates
+from hypothesis.strategies import datetimes
+from hypothesis.strategies import decimals
+from hypothesis.strategies import dictionaries
+from hypothesis.strategies import floats
+from hypothesis.strategies import integers
+from hypothesis.strategies import just
+from hypothesis.strategies import lists
+from hypothesis.strategies import none
+from hypothesis.strategies import recursive
+from hypothesis.strategies import text
+from hypothesis.strategies import timedeltas
+from hypothesis.strategies import times
+from hypothesis.strategies import uuids
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+
+@beartype
+def json_values(scalars: SearchStrategy) -> SearchStrategy:
+    return recursive(
+        scalars,
+        lambda children: lists(children, max_size=4)
+        | dictionaries(text(), children, max_size=4)
+        | dictionaries(integers(), children, max_size=2),
+        max_leaves=20,
+    )
+
+
+json_scalars = (
+    none()
+    | booleans()
+    | integers()
+    | floats(allow_nan=False, allow_infinity=False)
+    | text()
+)
+offsets = builds(
+    timezone,
+    timedeltas(min_value=-timedelta(hours=23), max_value=timedelta(hours=23)),
+)
+# what serializers hand renderers besides JSON's own types
+api_scalars = (
+    json_scalars
+    | decimals(allow_nan=False, allow_infinity=False)
+    | datetimes(timezones=none() | just(timezone.utc) | offsets)
+    | dates()
+    | times()
+    | timedeltas()
+    | uuids()
+    | text().map(lazystr)
+)
+
+
+class TestORJSONRenderer(SimpleTestCase):
+    @given(data=json_values(api_scalars))
+    def test_same_bytes(self, data: Any) -> None:
+        self.assertEqual(
+            ORJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    @given(data=json_values(api_scalars))
+    def test_same_bytes_indented(self, data: Any) -> None:
+        media_type = "application/json; indent=4"
+        self.assertEqual(
+            ORJSONRenderer().render(data, media_type),
+            JSONRenderer().render(data, media_type),
+        )
+
+    @beartype
+    def test_javascript_line_terminators_escaped(self) -> None:
+        self.assertEqual(
+            ORJSONRenderer().render(["\u2028\u2029"]), b'["\\u2028\\u2029"]'
+        )
+
+    @beartype
+    def test_non_finite_floats_refused(self) -> None:
+        for value in [float("nan"), float("inf"), -float("inf")]:
+            for renderer in [ORJSONRenderer(), JSONRenderer()]:
+                with self.assertRaises(ValueError):
+                    _ = renderer.render({"values": [None, value]})
+
+    @beartype
+    def test_unserializable(self) -> None:
+        with self.assertRaises(TypeError):
+            _ = ORJSONRenderer().render(object())
+
+
+class TestORJSONParser(SimpleTestCase):
+    @beartype
+    def _parse(self, parser: JSONParser, data: bytes) -> Any:
+        try:
+            return parser.parse(BytesIO(data))
+        except ParseError as error:
+            return ("error", str(error.detail))
+
+    @given(data=json_values(json_scalars))
+    def test_same_values(self, data: Any) -> None:
+        rendered = JSONRenderer().render([data])
+        self.assertEqual(
+            self._parse(ORJSONParser(), rendered),
+            self._parse(JSONParser(), rendered),
+        )
+
+    @given(data=binary())
+    def test_same_values_or_errors(self, data: bytes) -> None:
+        self.assertEqual(
+            self._parse(ORJSONParser(), data), self._parse(JSONParser(), data)
+        )
+
+    @beartype
+    def test_long_integers_exact(self) -> None:
+        self.assertEqual(
+            ORJSONParser().parse(BytesIO(b"[18446744073709551616]")),
+            [18446744073709551616],
+        )
@@ -0,0 +1,116 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import cast
+
+from beartype import beartype
+from core.models import Recipe
+from core.models import Tag
+from core.models import UserManager
+from core.replicas import ReplicaRouter
+from core.replicas import get_sticky_cache
+from core.replicas import is_sticky
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from django.db import connection
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.test import SimpleTestCase
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.test.utils import override_settings
+from django.urls import reverse
+from recipe.caching import get_response_cache
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_201_CREATED
+from rest_framework.test import APIClient
+
+
+RECIPES_URL = reverse("recipe:recipe-list")
+TAGS_URL = reverse("recipe:tag-list")
+HEALTH_URL = reverse("health:ready")
+ME_URL = reverse("user:me")
+
+
+@contextmanager
+@beartype
+def _replica() -> Iterator[BaseDatabaseWrapper]:
+    # a second connection to the test database stands in for a replica,
+    # which sees what the test commits
+    connections.settings["replica"] = {**connection.settings_dict}
+    try:
+        with override_settings(REPLICA_DATABASES=["replica"]):
+            yield connections["replica"]
+    finally:
+        connections["replica"].close()
+        del connections["replica"]
+        del connections.settings["replica"]
+
+
+class TestReplicaRouter(SimpleTestCase):
+    @beartype
+    def test_primary_without_replicas(self) -> None:
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Recipe))
+        self.assertEqual(router.db_for_write(Recipe), DEFAULT_DB_ALIAS)
+
+
+class TestReplicaReads(TransactionTestCase):
+    @beartype
+    def setUp(self) -> None:
+        get_sticky_cache().clear()
+        get_response_cache().clear()
+        self.client = APIClient()
+        self.user = cast(UserManager, get_user_model().objects).create_user(
+            email="test@example.com", password="password", name="Test"
+        )
+        self.client.force_authenticate(self.user)
+
+    @beartype
+    def test_reads_from_replica(self) -> None:
+        _ = Recipe.objects.create(
+            user=self.user, title="Soup", time_minutes=5, price=1
+        )
+        # written long enough ago
+        get_sticky_cache().clear()
+        with _replica() as replica, CaptureQueriesContext(replica) as reads:
+            res = self.client.get(RECIPES_URL)
+            self.assertEqual(res.status_code, HTTP_200_OK)
+            self.assertEqual(len(res.data["results"]), 1)
+            self.assertTrue(reads.captured_queries)
+            num_reads = len(reads)
+            # views without the mixin stay on the primary
+            res = self.client.get(HEALTH_URL)
+            self.assertEqual(res.status_code, HTTP_200_OK)
+            self.assertEqual(len(reads), num_reads)
+
+    @beartype
+    def test_writes_stick_to_primary(self) -> None:
+        with _replica() as replica, CaptureQueriesContext(replica) as reads:
+            res = self.client.post(TAGS_URL, {"name": "Vegan"})
+            self.assertEqual(res.status_code, HTTP_201_CREATED)
+            self.assertTrue(is_sticky(self.user.pk))
+            res = self.client.get(TAGS_URL)
+            self.assertEqual(len(res.data["results"]), 1)
+            self.assertFalse(reads.captured_queries)
+
+    @beartype
+    def test_profile_updates_stick_to_primary(self) -> None:
+        with _replica():
+            res = self.client.patch(ME_URL, {"name": "Renamed"})
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertTrue(is_sticky(self.user.pk))
+
+    @beartype
+    def test_writes_elsewhere_stick_to_primary(self) -> None:
+        # as imports do, through the signals rather than the views
+        _ = Tag.objects.create(user=self.user, name="Vegan")
+        self.assertTrue(is_sticky(self.user.pk))
+
+    @override_settings(REPLICA_STICKY_SECONDS=0.0)
+    @beartype
+    def test_back_on_replica_after_window(self) -> None:
+        with _replica() as replica, CaptureQueriesContext(replica) as reads:
+            _ = self.client.post(TAGS_URL, {"name": "Vegan"})
+            res = self.client.get(TAGS_URL)
+            self.assertEqual(len(res.data["results"]), 1)
+            self.assertTrue(reads.captured_queries)
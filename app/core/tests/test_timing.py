@@ -0,0 +1,93 @@
+from json import loads
+from typing import cast
+
+from beartype import beartype
+from core.models import Recipe
+from core.models import Tag
+from core.models import UserManager
+from core.timing import RequestTimingMiddleware
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpRequest
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+from recipe.caching import get_response_cache
+from rest_framework.test import APIClient
+
+
+RECIPES_URL = reverse("recipe:recipe-list")
+
+
+@beartype
+def _metrics(header: str) -> dict[str, str]:
+    return dict(
+        metric.strip().split(";", 1) if ";" in metric else (metric, "")
+        for metric in header.split(",")
+    )
+
+
+class TestRequestTimingMiddleware(TestCase):
+    @beartype
+    def setUp(self) -> None:
+        get_response_cache().clear()
+        self.client = APIClient()
+        manager = cast(UserManager, get_user_model().objects)
+        self.user = manager.create_user(
+            email="test@example.com", password="password"
+        )
+        self.client.force_authenticate(self.user)
+        _ = Recipe.objects.create(
+            user=self.user, title="Toast", time_minutes=2, price=1.00
+        )
+
+    @beartype
+    def test_off_by_default(self) -> None:
+        res = self.client.get(RECIPES_URL)
+        self.assertNotIn("Server-Timing", res)
+        with self.assertRaises(MiddlewareNotUsed):
+            _ = RequestTimingMiddleware(lambda _request: HttpResponse())
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=1.0)
+    @beartype
+    def test_reports_phases_and_queries(self) -> None:
+        with self.assertLogs("core.timing", "INFO") as logs:
+            res = self.client.get(RECIPES_URL)
+        metrics = _metrics(res["Server-Timing"])
+        self.assertEqual(
+            list(metrics), ["total", "db", "auth", "serialize", "render"]
+        )
+        self.assertIn('desc="2 queries"', metrics["db"])
+        record = loads(logs.records[0].getMessage())
+        self.assertEqual(record["path"], RECIPES_URL)
+        self.assertEqual(record["status"], 200)
+        self.assertEqual(record["queries"], 2)
+        self.assertGreater(record["total_ms"], record["db_ms"])
+        self.assertEqual(record["duplicates"], [])
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=1.0)
+    @beartype
+    def test_duplicates_located(self) -> None:
+        @beartype
+        def view(_request: HttpRequest) -> HttpResponse:
+            for _ in range(3):
+                _ = list(Tag.objects.all())
+            return HttpResponse()
+
+        middleware = RequestTimingMiddleware(view)
+        with self.assertLogs("core.timing", "INFO") as logs:
+            res = middleware(RequestFactory().get("/"))
+        self.assertIn('dup;desc="1 statements repeated"', res["Server-Timing"])
+        [duplicate] = loads(logs.records[0].getMessage())["duplicates"]
+        self.assertEqual(duplicate["count"], 3)
+        [origin] = duplicate["origins"]
+        self.assertTrue(origin.startswith("core/tests/test_timing.py:"))
+        self.assertTrue(origin.endswith(" in view"))
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=1e-9)
+    @beartype
+    def test_unsampled(self) -> None:
+        res = self.client.get(RECIPES_URL)
+        self.assertNotIn("Server-Timing", res)
@@ -0,0 +1,221 @@
+import sys
+from collections import Counter
+from collections.abc import Callable
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from dataclasses import field
+from logging import getLogger
+from pathlib import Path
+from random import random
+from time import perf_counter
+from typing import Any
+
+import orjson
+from beartype import beartype
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest
+from django.http.response import HttpResponseBase
+from rest_framework.request import Request
+
+
+_LOGGER = getLogger(__name__)
+# phases reported besides the database and the total, in order
+PHASES = ["auth", "serialize", "render"]
+
+
+@dataclass
+class RequestTiming:
+    start: float = field(default_factory=perf_counter)
+    # seconds spent per phase
+    phases: Counter[str] = field(default_factory=Counter)
+    queries: int = 0
+    db: float = 0.0
+    # where each statement ran from, with its placeholders unfilled
+    origins: dict[str, Counter[str]] = field(default_factory=dict)
+
+    @beartype
+    def duplicates(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "sql": sql,
+                "count": sum(origins.values()),
+                "origins": dict(origins),
+            }
+            for sql, origins in self.origins.items()
+            if sum(origins.values()) > 1
+        ]
+
+
+_CURRENT: ContextVar[RequestTiming | None] = ContextVar(
+    "request_timing", default=None
+)
+
+
+@contextmanager
+@beartype
+def timed(phase: str) -> Iterator[None]:
+    # adds the time spent within the block to the sampled request, if any
+    if (timing := _CURRENT.get()) is None:
+        yield
+        return
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        timing.phases[phase] += perf_counter() - start
+
+
+class RequestTimingMiddleware:
+    # records the queries (count, time and duplicates, with where they ran
+    # from) and the time spent authenticating, serializing, rendering and in
+    # total of a `REQUEST_TIMING_SAMPLE_RATE` share of requests, reported in
+    # a `Server-Timing` header and a JSON log line. Unsampled requests only
+    # pay for a context variable lookup per query and phase
+
+    @beartype
+    def __init__(self, get_response: Callable[..., Any]) -> None:
+        if settings.REQUEST_TIMING_SAMPLE_RATE <= 0:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        # under ASGI, views may query on connections of other threads
+        connection_created.connect(
+            _install_recorder, dispatch_uid="request_timing"
+        )
+
+    @beartype
+    def __call__(self, request: HttpRequest) -> HttpResponseBase:
+        # sampling only decides what gets measured, so needs no secure source
+        if random() >= settings.REQUEST_TIMING_SAMPLE_RATE:  # noqa: S311
+            return self.get_response(request)
+        for alias in connections:
+            _install_recorder(connection=connections[alias])
+        timing = RequestTiming()
+        token = _CURRENT.set(timing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _CURRENT.reset(token)
+        total = perf_counter() - timing.start
+        metrics = [
+            f"total;dur={total * 1000:.2f}",
+            f'db;dur={timing.db * 1000:.2f};desc="{timing.queries} queries"',
+        ]
+        if duplicates := timing.duplicates():
+            metrics.append(f'dup;desc="{len(duplicates)} statements repeated"')
+        metrics.extend(
+            f"{phase};dur={timing.phases[phase] * 1000:.2f}"
+            for phase in PHASES
+            if phase in timing.phases
+        )
+        if existing := response.get("Server-Timing"):
+            metrics.insert(0, existing)
+        response["Server-Timing"] = ", ".join(metrics)
+        _LOGGER.info(
+            "%s",
+            orjson.dumps(
+                {
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                    "total_ms": total * 1000,
+                    "db_ms": timing.db * 1000,
+                    "queries": timing.queries,
+                    **{
+                        f"{phase}_ms": timing.phases[phase] * 1000
+                        for phase in PHASES
+                    },
+                    "duplicates": duplicates,
+                }
+            ).decode(),
+        )
+        return response
+
+
+@beartype
+def _install_recorder(
+    *, connection: BaseDatabaseWrapper, **_kwargs: Any
+) -> None:
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+@beartype
+def _record_query(
+    execute: Callable[..., Any],
+    sql: str,
+    params: Any,
+    many: bool,
+    context: dict[str, Any],
+) -> Any:
+    if (timing := _CURRENT.get()) is None:
+        return execute(sql, params, many, context)
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.db += perf_counter() - start
+        timing.queries += 1
+        timing.origins.setdefault(sql, Counter())[_origin()] += 1
+
+
+@beartype
+def _origin() -> str:
+    # the innermost frame of the project's own code, past this module
+    frame = sys._getframe(1)
+    base = str(settings.BASE_DIR)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(base)
+            and filename != __file__
+            and "site-packages" not in filename
+        ):
+            path = Path(filename).relative_to(base)
+            return f"{path}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+class RequestTimingMixin:
+    # attributes authentication and serialization time to sampled requests.
+    # The handler runs between `initial` and `finalize_response`; querysets
+    # being lazy, what it spends outside the database is serializer work:
+    # validating, saving and representing
+
+    _handler_start: tuple[float, float] | None = None
+
+    @beartype
+    def perform_authentication(self, request: Request) -> None:
+        with timed("auth"):
+            super().perform_authentication(request)  # type: ignore
+
+    @beartype
+    def initial(self, request: Request, *args: Any, **kwargs: Any) -> None:
+        super().initial(request, *args, **kwargs)  # type: ignore
+        if (timing := _CURRENT.get()) is not None:
+            self._handler_start = (perf_counter(), timing.db)
+
+    @beartype
+    def finalize_response(
+        self,
+        request: Request,
+        response: HttpResponseBase,
+        *args: Any,
+        **kwargs: Any,
+    ) -> HttpResponseBase:
+        timing = _CURRENT.get()
+        if timing is not None and self._handler_start is not None:
+            start, db = self._handler_start
+            self._handler_start = None
+            timing.phases["serialize"] += (
+                perf_counter() - start - (timing.db - db)
+            )
+        return super().finalize_response(  # type: ignore
+            request, response, *args, **kwargs
+        )
@@ -0,0 +1,21 @@
+from typing import Any
+from typing import cast
+
+from core.views import ConnectionStatsView
+from core.views import LivenessView
+from core.views import ReadinessView
+from django.urls import path
+
+
+app_name = "health"
+
+
+urlpatterns = [
+    path("live/", cast(Any, LivenessView.as_view()), name="live"),
+    path("ready/", cast(Any, ReadinessView.as_view()), name="ready"),
+    path(
+        "connections/",
+        cast(Any, ConnectionStatsView.as_view()),
+        name="connections",
+    ),
+]
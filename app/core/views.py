@@ -0,0 +1,75 @@
+from beartype import beartype
+from core.backends.postgresql.base import CONNECTION_STATS
+from core.backends.postgresql.base import open_connections
+from core.health import database_latency
+from django.conf import settings
+from django.db import DatabaseError
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+from rest_framework.permissions import IsAdminUser
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from user.authentication import CachedTokenAuthentication
+
+
+class LivenessView(APIView):
+    # the process serves requests; restarting it will not fix the database,
+    # so that is left to readiness
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    @beartype
+    def get(self, request: Request) -> Response:  # noqa: U100
+        return Response({"status": "ok"})
+
+
+class ReadinessView(APIView):
+    # the database answers, within `READINESS_MAX_DB_LATENCY`
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    @beartype
+    def get(self, request: Request) -> Response:  # noqa: U100
+        try:
+            latency = database_latency()
+        except DatabaseError as error:
+            return Response(
+                {
+                    "status": "unavailable",
+                    "database": {"error": type(error).__name__},
+                },
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        ready = latency <= settings.READINESS_MAX_DB_LATENCY
+        return Response(
+            {
+                "status": "ok" if ready else "slow",
+                "database": {"latency_ms": latency * 1000},
+            },
+            status=(
+                status.HTTP_200_OK
+                if ready
+                else status.HTTP_503_SERVICE_UNAVAILABLE
+            ),
+        )
+
+
+class ConnectionStatsView(APIView):
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAdminUser]
+
+    @beartype
+    def get(self, request: Request) -> Response:  # noqa: U100
+        return Response(
+            {
+                "opened": CONNECTION_STATS.opened,
+                "reused": CONNECTION_STATS.reused,
+                "discarded": CONNECTION_STATS.discarded,
+                "open": open_connections(),
+                "pool_size": settings.DATABASES["default"].get(
+                    "CONN_POOL_SIZE"
+                ),
+                "max_age": settings.DATABASES["default"]["CONN_MAX_AGE"],
+            }
+        )
@@ -1,6 +1,12 @@
+from beartype import beartype
 from django.apps import AppConfig
 
 
 class RecipeConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "recipe"
+
+    @beartype
+    def ready(self) -> None:
+        from recipe import checks  # noqa: F401
+        from recipe import signals  # noqa: F401
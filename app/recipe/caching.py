@@ -0,0 +1,204 @@
+from collections.abc import Callable
+from collections.abc import Iterable
+from dataclasses import dataclass
+from dataclasses import field
+from functools import cache
+from functools import partial
+from hashlib import sha256
+from json import dumps
+from threading import Lock
+from typing import Any
+from uuid import uuid4
+
+from beartype import beartype
+from core.cache import LocalCache
+from core.cache import SharedCache
+from core.cache import build_cache
+from django.conf import settings
+from django.db import transaction
+from django.http.response import HttpResponseBase
+from django.utils.cache import get_conditional_response
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.status import HTTP_200_OK
+
+
+# response headers kept along with the data
+CACHED_HEADERS = ["ETag", "Cache-Control"]
+# query parameters holding comma-separated ids, whose order does not matter
+ID_LIST_PARAMS = {"tags", "ingredients"}
+# query parameters holding comma-separated field names, likewise
+FIELD_LIST_PARAMS = {"fields", "omit", "expand"}
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    data: Any
+    headers: dict[str, str]
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    _lock: Lock = field(default_factory=Lock, repr=False)
+
+    @beartype
+    def record(self, *, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    @beartype
+    def reset(self) -> None:
+        with self._lock:
+            self.hits = self.misses = 0
+
+
+# per process, as sizing is
+RESPONSE_CACHE_STATS = CacheStats()
+
+
+class ResponseCacheMixin:
+    # caches successful `list` (and, via `cached_response`, other read)
+    # responses per user, action and normalized query; `recipe.signals`
+    # invalidates all of a user's entries whenever their collections change
+
+    @beartype
+    def list(
+        self, request: Request, *args: Any, **kwargs: Any
+    ) -> HttpResponseBase:
+        return self.cached_response(
+            request,
+            partial(super().list, request, *args, **kwargs),  # type: ignore
+        )
+
+    @beartype
+    def cached_response(
+        self, request: Request, compute: Callable[[], HttpResponseBase]
+    ) -> HttpResponseBase:
+        cache = get_response_cache()
+        key = response_cache_key(
+            request,
+            type(self).__name__,
+            self.action,  # type: ignore
+            self.kwargs,  # type: ignore
+        )
+        if (cached := cache.get(key)) is not None:
+            RESPONSE_CACHE_STATS.record(hit=True)
+            return _replay(request, cached)
+        RESPONSE_CACHE_STATS.record(hit=False)
+        response = compute()
+        if response.status_code == HTTP_200_OK and isinstance(
+            response, Response
+        ):
+            cache.set(
+                key,
+                CachedResponse(
+                    _detach(response.data),
+                    {h: response[h] for h in CACHED_HEADERS if h in response},
+                ),
+            )
+        return response
+
+
+@beartype
+def get_response_cache() -> LocalCache | SharedCache:
+    return _build_response_cache(
+        settings.RESPONSE_CACHE_ALIAS,
+        settings.RESPONSE_CACHE_MAX_SIZE,
+        settings.RESPONSE_CACHE_TIMEOUT,
+    )
+
+
+@cache
+@beartype
+def _build_response_cache(
+    alias: str | None, max_size: int, timeout: float
+) -> LocalCache | SharedCache:
+    return build_cache(
+        alias, max_size=max_size, timeout=timeout, key_prefix="response"
+    )
+
+
+@beartype
+def response_cache_key(
+    request: Request, view: str, action: str, kwargs: dict[str, Any]
+) -> str:
+    query = {
+        key: _normalize(key, request.query_params.getlist(key))
+        for key in sorted(request.query_params)
+    }
+    # pagination links are absolute, so the host is part of the response
+    scope = dumps(
+        [request.get_host(), view, action, sorted(kwargs.items()), query]
+    )
+    digest = sha256(scope.encode()).hexdigest()
+    return f"{request.user.pk}:{_generation(request.user.pk)}:{digest}"
+
+
+@beartype
+def invalidate_responses(user_ids: Iterable[int]) -> None:
+    # entries are keyed by a per-user generation, so dropping it orphans them
+    # all; they age out of the cache on their own
+    cache = get_response_cache()
+    for user_id in user_ids:
+        cache.delete(_generation_key(user_id))
+
+
+@beartype
+def _generation(user_id: int) -> str:
+    # random rather than counted, so that a generation evicted from the cache
+    # can never be recreated with the same value
+    cache = get_response_cache()
+    if (generation := cache.get(_generation_key(user_id))) is None:
+        generation = uuid4().hex
+        cache.set(_generation_key(user_id), generation)
+    return generation
+
+
+@beartype
+def _generation_key(user_id: int) -> str:
+    return f"generation:{user_id}"
+
+
+@beartype
+def _normalize(key: str, values: list[str]) -> list[str]:
+    if key in ID_LIST_PARAMS | FIELD_LIST_PARAMS and values:
+        # the view reads the last value only
+        parts = {part.strip() for part in values[-1].split(",")}
+        return [",".join(sorted(parts))]
+    return values
+
+
+@beartype
+def _detach(data: Any) -> Any:
+    # serializer return types keep their serializer (and its instances) alive
+    if isinstance(data, dict):
+        return {key: _detach(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_detach(value) for value in data]
+    return data
+
+
+@beartype
+def _replay(request: Request, cached: CachedResponse) -> HttpResponseBase:
+    response = get_conditional_response(
+        request._request, etag=cached.headers.get("ETag")
+    )
+    if response is None:
+        response = Response(cached.data)
+    for header, value in cached.headers.items():
+        response[header] = value
+    return response
+
+
+@beartype
+def schedule_invalidation(user_ids: Iterable[int]) -> None:
+    # invalidate now, for reads later in this transaction, and again on
+    # commit, for entries filled from concurrent reads of the old data
+    user_ids = set(user_ids)
+    invalidate_responses(user_ids)
+    transaction.on_commit(lambda: invalidate_responses(user_ids))
@@ -0,0 +1,26 @@
+from typing import Any
+
+from beartype import beartype
+from core.checks import is_shared_cache
+from django.conf import settings
+from django.core.checks import Error
+from django.core.checks import Tags
+from django.core.checks import register
+
+
+@register(Tags.caches)
+@beartype
+def check_response_cache(**_kwargs: Any) -> list[Error]:
+    if settings.WORKER_PROCESSES <= 1 or is_shared_cache(
+        settings.RESPONSE_CACHE_ALIAS
+    ):
+        return []
+    return [
+        Error(
+            "RESPONSE_CACHE_ALIAS must name a cache shared between processes "
+            "when there are several, or the others serve stale responses "
+            "for up to RESPONSE_CACHE_TIMEOUT seconds after a write.",
+            hint="Set SHARED_CACHE_BACKEND and SHARED_CACHE_LOCATION.",
+            id="recipe.E001",
+        )
+    ]
@@ -0,0 +1,66 @@
+from collections.abc import Iterable
+
+from beartype import beartype
+from core.models import Recipe
+from django.db.models import Count
+from django.db.models import Exists
+from django.db.models import ManyToManyField
+from django.db.models import Model
+from django.db.models import OuterRef
+from django.db.models.query import QuerySet
+
+
+MATCH_MODES = ["any", "all"]
+
+
+@beartype
+def filter_related(
+    queryset: QuerySet, field: str, ids: Iterable[int], *, match_all: bool
+) -> QuerySet:
+    # keeps recipes linked to any (or all) of `ids` through the `field` many
+    # to many relation, as semi-joins on the through table, so results are
+    # never duplicated. Any is an EXISTS; all counts the links to `ids` per
+    # recipe, read through the target's index, which the unique
+    # (recipe_id, target_id) constraint keeps exact
+    relation = Recipe._meta.get_field(field)
+    target = relation.m2m_reverse_name()
+    links = relation.remote_field.through.objects.filter(
+        **{relation.m2m_column_name(): OuterRef("pk")}
+    )
+    ids = sorted(set(ids))
+    if match_all:
+        recipe = relation.m2m_column_name()
+        return queryset.filter(
+            pk__in=relation.remote_field.through.objects.filter(
+                **{f"{target}__in": ids}
+            )
+            .values(recipe)
+            .annotate(matched=Count(target))
+            .filter(matched=len(ids))
+            .values(recipe)
+        )
+    return queryset.filter(Exists(links.filter(**{f"{target}__in": ids})))
+
+
+@beartype
+def filter_assigned(queryset: QuerySet) -> QuerySet:
+    # keeps tags (or ingredients) used by at least one recipe, as an EXISTS
+    # on the through table rather than a join that needs deduplicating
+    relation = _recipe_relation(queryset.model)
+    through = relation.remote_field.through
+    return queryset.filter(
+        Exists(
+            through.objects.filter(
+                **{relation.m2m_reverse_name(): OuterRef("pk")}
+            )
+        )
+    )
+
+
+@beartype
+def _recipe_relation(model: type[Model]) -> ManyToManyField:
+    return next(
+        field
+        for field in Recipe._meta.many_to_many
+        if field.related_model is model
+    )
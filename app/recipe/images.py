@@ -0,0 +1,126 @@
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from io import BytesIO
+from logging import getLogger
+from pathlib import Path
+
+from PIL import Image
+from PIL import ImageOps
+from beartype import beartype
+from core.models import ImageStatus
+from core.models import Recipe
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import Storage
+from django.db import close_old_connections
+from django.db import transaction
+from recipe.versions import bump_versions
+
+
+_LOGGER = getLogger(__name__)
+
+
+@cache
+@beartype
+def get_executor(max_workers: int) -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="recipe-image"
+    )
+
+
+@beartype
+def get_storage() -> Storage:
+    return Recipe._meta.get_field("image").storage  # type: ignore
+
+
+@beartype
+def schedule_image_processing(
+    recipe: Recipe, *, stale: Iterable[str] = ()
+) -> None:
+    name, stale = recipe.image.name, list(stale)
+
+    @beartype
+    def submit() -> None:
+        executor = get_executor(settings.RECIPE_IMAGE_WORKERS)
+        _ = executor.submit(_process_in_worker, recipe.pk, name, stale)
+
+    transaction.on_commit(submit)
+
+
+@beartype
+def _process_in_worker(pk: int, name: str, stale: list[str]) -> None:
+    try:
+        process_image(pk, name, stale=stale)
+    finally:
+        close_old_connections()
+
+
+@beartype
+def process_image(pk: int, name: str, *, stale: Iterable[str] = ()) -> None:
+    storage = get_storage()
+    for path in stale:
+        storage.delete(path)
+    variants: dict[str, str] = {}
+    try:
+        for variant, data in render_variants(name).items():
+            variants[variant] = storage.save(
+                _variant_name(name, variant), ContentFile(data)
+            )
+    except (OSError, ValueError, Image.DecompressionBombError):
+        _LOGGER.exception("Failed to process image %s of recipe %d", name, pk)
+        # those saved before the failure
+        for path in variants.values():
+            storage.delete(path)
+        fail_image(pk, name)
+        return
+    # the image may have been replaced while this one was processing
+    if Recipe.objects.filter(pk=pk, image=name).update(
+        image_status=ImageStatus.READY, image_variants=variants
+    ):
+        _bump_owner_version(pk)
+    else:
+        for path in variants.values():
+            storage.delete(path)
+
+
+@beartype
+def fail_image(pk: int, name: str) -> None:
+    if Recipe.objects.filter(pk=pk, image=name).update(
+        image_status=ImageStatus.FAILED
+    ):
+        _bump_owner_version(pk)
+
+
+@beartype
+def _bump_owner_version(pk: int) -> None:
+    # updates bypass the signals that bump it
+    bump_versions(
+        Recipe.objects.filter(pk=pk).values_list("user_id", flat=True)
+    )
+
+
+@beartype
+def render_variants(name: str) -> dict[str, bytes]:
+    with get_storage().open(name) as file, Image.open(file) as image:
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        variants = {}
+        for variant, size in settings.RECIPE_IMAGE_VARIANTS.items():
+            resized = image.copy()
+            resized.thumbnail((size, size), Image.Resampling.LANCZOS)
+            buffer = BytesIO()
+            resized.save(
+                buffer,
+                format="JPEG",
+                quality=settings.RECIPE_IMAGE_QUALITY,
+                optimize=True,
+                progressive=True,
+            )
+            variants[variant] = buffer.getvalue()
+        return variants
+
+
+@beartype
+def _variant_name(name: str, variant: str) -> str:
+    path = Path(name)
+    return path.with_name(f"{path.stem}_{variant}.jpg").as_posix()
@@ -0,0 +1,255 @@
+from collections import Counter
+from collections.abc import Callable
+from collections.abc import Iterable
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import partial
+from tempfile import SpooledTemporaryFile
+from typing import Any
+
+import orjson
+from beartype import beartype
+from core.models import Ingredient
+from core.models import Recipe
+from core.models import Tag
+from core.models import User
+from django.conf import settings
+from django.db import connection
+from django.db import transaction
+from django.db.models import Model
+from recipe.search import update_search_vectors
+from recipe.serializers import BULK_BATCH_SIZE
+from recipe.serializers import IngredientSerializer
+from recipe.serializers import LibraryRecipeSerializer
+from recipe.serializers import RecipeRowSerializer
+from recipe.serializers import TagSerializer
+from recipe.serializers import recipe_rows
+from recipe.stats import count_created_recipes
+from recipe.versions import bump_versions
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import ModelSerializer
+
+
+LIBRARY_MEDIA_TYPE = "application/x-ndjson"
+
+# each line of a library is an object of one of these types, tags and
+# ingredients before the recipes referring to them by id
+_SERIALIZERS: dict[str, type[ModelSerializer]] = {
+    "tag": TagSerializer,
+    "ingredient": IngredientSerializer,
+    "recipe": LibraryRecipeSerializer,
+}
+# the recipe fields holding ids of each type
+_RELATIONS = {"tags": "tag", "ingredients": "ingredient"}
+
+
+@beartype
+def export_library(user: User) -> Iterator[bytes]:
+    # the user's tags, ingredients and recipes as lines of JSON, read through
+    # server-side cursors and yielded a batch of lines at a time
+    with _snapshot():
+        for kind, model in [("tag", Tag), ("ingredient", Ingredient)]:
+            yield from _lines(
+                kind,
+                model.objects.filter(user=user)
+                .order_by("id")
+                .values(*_SERIALIZERS[kind].Meta.fields),
+            )
+        yield from _lines(
+            "recipe",
+            recipe_rows(Recipe.objects.filter(user=user).order_by("id")),
+            RecipeRowSerializer().to_representation,
+        )
+
+
+@beartype
+def spool_library(user: User) -> SpooledTemporaryFile:
+    # the export written out ahead, for ASGI: Django 4.0's handler iterates
+    # streaming responses on the event loop, where queries are refused, but
+    # can read a file there. Same snapshot and lines, only not streamed
+    spool = SpooledTemporaryFile(max_size=settings.LIBRARY_EXPORT_SPOOL_BYTES)
+    spool.writelines(export_library(user))
+    _ = spool.seek(0)
+    return spool
+
+
+@contextmanager
+@beartype
+def _snapshot() -> Iterator[None]:
+    # a single snapshot, so that recipes only refer to tags and ingredients
+    # exported before them. Within a transaction already, that one's is used
+    if connection.in_atomic_block:
+        yield
+        return
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        yield
+
+
+@beartype
+def _lines(
+    kind: str,
+    rows: Iterable[dict[str, Any]],
+    convert: Callable[[dict[str, Any]], dict[str, Any]] | None = None,
+) -> Iterator[bytes]:
+    batch = []
+    for row in rows.iterator(chunk_size=BULK_BATCH_SIZE):  # type: ignore
+        if convert is not None:
+            row = convert(row)
+        batch.append(orjson.dumps({"type": kind, **row}))
+        if len(batch) == BULK_BATCH_SIZE:
+            yield b"\n".join(batch) + b"\n"
+            batch = []
+    if batch:
+        yield b"\n".join(batch) + b"\n"
+
+
+@beartype
+def import_library(user: User, stream: Any) -> dict[str, int]:
+    # creates the tags, ingredients and recipes of an exported library for
+    # `user`, reading `stream` (anything with `readline`) a line at a time.
+    # Either all of it is imported or, on the first invalid line, none
+    importer = _Importer(user)
+    max_bytes = settings.LIBRARY_MAX_LINE_BYTES
+    with transaction.atomic():
+        for number, line in enumerate(
+            iter(partial(stream.readline, max_bytes + 1), b""), 1
+        ):
+            if len(line) > max_bytes:
+                raise _line_error(
+                    number, f"Longer than {max_bytes} bytes.", field="line"
+                )
+            importer.add(number, line)
+        importer.flush()
+        # the bulk path bypasses the signals that bump it
+        bump_versions([user.pk])
+    return {kind: importer.counts[kind] for kind in _SERIALIZERS}
+
+
+class _Importer:
+    # rows are buffered by type and created in batches. Only the ids of the
+    # tags and ingredients created are kept, keyed by their ids in the
+    # library, for the recipes referring to them
+
+    @beartype
+    def __init__(self, user: User) -> None:
+        self.user = user
+        # one per type, whose fields are built once rather than per line, as
+        # `ListSerializer` does with its child
+        self.serializers = {
+            kind: serializer() for kind, serializer in _SERIALIZERS.items()
+        }
+        self.counts: Counter[str] = Counter()
+        self.ids: dict[str, dict[int, int]] = {"tag": {}, "ingredient": {}}
+        self.pending_attrs: dict[str, dict[int, Model]] = {
+            "tag": {},
+            "ingredient": {},
+        }
+        self.pending_recipes: list[tuple[Recipe, dict[str, list[int]]]] = []
+
+    @beartype
+    def add(self, number: int, line: bytes) -> None:
+        if not line.strip():
+            return
+        try:
+            item = orjson.loads(line)
+        except orjson.JSONDecodeError as error:
+            raise _line_error(number, str(error), field="line")
+        if not isinstance(item, dict) or item.get("type") not in _SERIALIZERS:
+            raise _line_error(
+                number,
+                f"Must be one of: {', '.join(_SERIALIZERS)}.",
+                field="type",
+            )
+        kind = item.pop("type")
+        try:
+            data = dict(self.serializers[kind].run_validation(item))
+        except ValidationError as error:
+            raise ValidationError({f"line {number}": error.detail})
+        if kind == "recipe":
+            self._add_recipe(number, data)
+        else:
+            self._add_attr(number, kind, item.get("id"), data)
+
+    @beartype
+    def _add_attr(
+        self, number: int, kind: str, id_: Any, data: dict[str, Any]
+    ) -> None:
+        if not isinstance(id_, int) or isinstance(id_, bool):
+            raise _line_error(number, "A valid integer is required.")
+        pending = self.pending_attrs[kind]
+        if id_ in self.ids[kind] or id_ in pending:
+            raise _line_error(number, f"Duplicate {kind} {id_}.")
+        model = _SERIALIZERS[kind].Meta.model
+        pending[id_] = model(user=self.user, **data)
+        if len(pending) == BULK_BATCH_SIZE:
+            self._flush_attrs(kind)
+
+    @beartype
+    def _add_recipe(self, number: int, data: dict[str, Any]) -> None:
+        related = {}
+        for field, kind in _RELATIONS.items():
+            # the tags and ingredients referred to need ids of their own
+            self._flush_attrs(kind)
+            ids = self.ids[kind]
+            related[field] = []
+            for id_ in dict.fromkeys(data.pop(field)):
+                if id_ not in ids:
+                    raise _line_error(
+                        number, f"Unknown {kind} {id_}.", field=field
+                    )
+                related[field].append(ids[id_])
+        self.pending_recipes.append((Recipe(user=self.user, **data), related))
+        if len(self.pending_recipes) == BULK_BATCH_SIZE:
+            self._flush_recipes()
+
+    @beartype
+    def flush(self) -> None:
+        for kind in self.pending_attrs:
+            self._flush_attrs(kind)
+        self._flush_recipes()
+
+    @beartype
+    def _flush_attrs(self, kind: str) -> None:
+        if not (pending := self.pending_attrs[kind]):
+            return
+        model = _SERIALIZERS[kind].Meta.model
+        created = model.objects.bulk_create(pending.values())
+        self.ids[kind].update(
+            (id_, obj.pk) for id_, obj in zip(pending, created)
+        )
+        self.counts[kind] += len(created)
+        pending.clear()
+
+    @beartype
+    def _flush_recipes(self) -> None:
+        if not self.pending_recipes:
+            return
+        recipes = Recipe.objects.bulk_create(
+            [recipe for recipe, _ in self.pending_recipes]
+        )
+        for name in _RELATIONS:
+            field = Recipe._meta.get_field(name)
+            through = field.remote_field.through
+            source = f"{field.m2m_field_name()}_id"
+            target = f"{field.m2m_reverse_field_name()}_id"
+            _ = through.objects.bulk_create(
+                [
+                    through(**{source: recipe.pk, target: pk})
+                    for recipe, related in self.pending_recipes
+                    for pk in related[name]
+                ],
+                batch_size=BULK_BATCH_SIZE,
+            )
+        update_search_vectors([recipe.pk for recipe in recipes])
+        count_created_recipes(recipes)
+        self.counts["recipe"] += len(recipes)
+        self.pending_recipes.clear()
+
+
+@beartype
+def _line_error(
+    number: int, message: str, *, field: str = "id"
+) -> ValidationError:
+    return ValidationError({f"line {number}": {field: [message]}})
@@ -0,0 +1,476 @@
+import tracemalloc
+from collections.abc import Callable
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import datetime
+from datetime import timezone
+from io import BytesIO
+from itertools import count
+from json import dumps
+from json import loads
+from pathlib import Path
+from platform import python_version
+from statistics import mean
+from statistics import median
+from statistics import quantiles
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any
+
+from PIL import Image
+from beartype import beartype
+from core.models import Recipe
+from django import get_version
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.core.management import CommandError
+from django.core.management.base import CommandParser
+from django.db import connection
+from django.db import transaction
+from django.test.utils import CaptureQueriesContext
+from django.test.utils import override_settings
+from django.urls import reverse
+from recipe.caching import invalidate_responses
+from recipe.synthetic import Dataset
+from recipe.synthetic import seed
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+
+PASSWORD = "benchmark"  # noqa: S105
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    method: str
+    status: int
+    # untimed, before each request: the path and the payload
+    prepare: Callable[[], tuple[str, Any]]
+    format: str = "json"
+
+
+@dataclass
+class Result:
+    scale: int
+    endpoint: str
+    method: str
+    latencies: list[float] = field(default_factory=list)
+    queries: list[int] = field(default_factory=list)
+    memory: list[int] = field(default_factory=list)
+
+    @beartype
+    def summary(self) -> dict[str, Any]:
+        percentiles = quantiles(self.latencies, n=100, method="inclusive")
+        return {
+            "scale": self.scale,
+            "endpoint": self.endpoint,
+            "method": self.method,
+            "requests": len(self.latencies),
+            "latency_ms": {
+                "p50": percentiles[49] * 1000,
+                "p90": percentiles[89] * 1000,
+                "p99": percentiles[98] * 1000,
+                "max": max(self.latencies) * 1000,
+            },
+            "queries": {"mean": mean(self.queries), "max": max(self.queries)},
+            "memory_kb": {
+                "p50": median(self.memory) / 1024,
+                "max": max(self.memory) / 1024,
+            },
+        }
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every recipe and user API endpoint against throwaway "
+        "datasets of the given scales, reporting latency percentiles and "
+        "queries and memory per request, and flag regressions against a "
+        "baseline"
+    )
+
+    @beartype
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--scales",
+            type=int,
+            nargs="+",
+            default=[10, 1000],
+            help="recipes per user, one dataset each",
+        )
+        parser.add_argument("--users", type=int, default=3)
+        parser.add_argument("--tags", type=int, default=20)
+        parser.add_argument("--ingredients", type=int, default=20)
+        parser.add_argument("--tags-per-recipe", type=int, default=3)
+        parser.add_argument("--ingredients-per-recipe", type=int, default=5)
+        parser.add_argument(
+            "--requests", type=int, default=50, help="timed, per endpoint"
+        )
+        parser.add_argument(
+            "--warmup", type=int, default=2, help="untimed, per endpoint"
+        )
+        parser.add_argument(
+            "--memory-samples",
+            type=int,
+            default=5,
+            help="requests traced for memory, per endpoint",
+        )
+        parser.add_argument("--endpoints", nargs="+", help="names to run")
+        parser.add_argument("--output", type=Path, help="results, as JSON")
+        parser.add_argument(
+            "--baseline", type=Path, help="results to compare against"
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.25,
+            help="relative slack on latency and memory before flagging",
+        )
+
+    @beartype
+    def handle(self, *_args: Any, **options: Any) -> None:
+        results = []
+        for scale in options["scales"]:
+            results.extend(self._bench_scale(scale, options))
+        report = {
+            "environment": {
+                "created": datetime.now(timezone.utc).isoformat(),
+                "python": python_version(),
+                "django": get_version(),
+                "database": connection.vendor,
+            },
+            "parameters": {
+                key: options[key]
+                for key in [
+                    "users",
+                    "tags",
+                    "ingredients",
+                    "tags_per_recipe",
+                    "ingredients_per_recipe",
+                    "requests",
+                ]
+            },
+            "results": [result.summary() for result in results],
+        }
+        self._write_table(report["results"])
+        if options["output"] is not None:
+            _ = options["output"].write_text(dumps(report, indent=2))
+        if options["baseline"] is not None:
+            baseline = loads(options["baseline"].read_text())
+            regressions = compare(
+                report["results"],
+                baseline["results"],
+                tolerance=options["tolerance"],
+            )
+            for regression in regressions:
+                self.stdout.write(self.style.WARNING(regression))
+            if regressions:
+                raise CommandError(f"{len(regressions)} regression(s)")
+            self.stdout.write(self.style.SUCCESS("No regressions"))
+
+    @beartype
+    def _bench_scale(self, scale: int, options: dict[str, Any]) -> list[Result]:
+        with transaction.atomic(), TemporaryDirectory() as media:
+            dataset = seed(
+                users=options["users"],
+                recipes=scale,
+                tags=options["tags"],
+                ingredients=options["ingredients"],
+                tags_per_recipe=options["tags_per_recipe"],
+                ingredients_per_recipe=options["ingredients_per_recipe"],
+            )
+            client = _client(dataset)
+            selected = set(options["endpoints"] or [])
+            # the test client's host is only allowed under the test runner
+            with override_settings(
+                MEDIA_ROOT=media,
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+            ):
+                results = [
+                    _bench_case(client, case, scale, options)
+                    for case in endpoints(dataset, options)
+                    if not selected or case.name in selected
+                ]
+            # the dataset is throwaway; so are on-commit callbacks, such as
+            # image processing, which never run
+            transaction.set_rollback(True)
+        return results
+
+    @beartype
+    def _write_table(self, results: list[dict[str, Any]]) -> None:
+        self.stdout.write(
+            f"{'scale':>7} {'endpoint':<28} {'p50 ms':>8} {'p90 ms':>8} "
+            f"{'p99 ms':>8} {'queries':>7} {'mem kb':>8}"
+        )
+        for result in results:
+            latency = result["latency_ms"]
+            self.stdout.write(
+                f"{result['scale']:>7} {result['endpoint']:<28} "
+                f"{latency['p50']:>8.2f} {latency['p90']:>8.2f} "
+                f"{latency['p99']:>8.2f} {result['queries']['max']:>7} "
+                f"{result['memory_kb']['p50']:>8.0f}"
+            )
+
+
+@beartype
+def _client(dataset: Dataset) -> APIClient:
+    user = dataset.user
+    user.set_password(PASSWORD)
+    # for the cache statistics
+    user.is_staff = True
+    user.save()
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}"
+    )
+    return client
+
+
+@beartype
+def endpoints(dataset: Dataset, options: dict[str, Any]) -> list[Case]:
+    user, recipe = dataset.user, dataset.recipes[0]
+    unique = count()
+    tag_ids = [tag.pk for tag in dataset.tags]
+    ingredient_ids = [ingredient.pk for ingredient in dataset.ingredients]
+    recipes_url = reverse("recipe:recipe-list")
+    detail_url = reverse("recipe:recipe-detail", args=[recipe.pk])
+
+    @beartype
+    def read(
+        url: str, *, cached: bool = False
+    ) -> Callable[[], tuple[str, Any]]:
+        @beartype
+        def prepare() -> tuple[str, Any]:
+            if not cached:
+                invalidate_responses([user.pk])
+            return url, None
+
+        return prepare
+
+    @beartype
+    def recipe_payload() -> dict[str, Any]:
+        i = next(unique)
+        return {
+            "title": f"benchmark {i}",
+            "tags": _take(tag_ids, i, options["tags_per_recipe"]),
+            "ingredients": _take(
+                ingredient_ids, i, options["ingredients_per_recipe"]
+            ),
+            "time_minutes": 10,
+            "price": "5.00",
+        }
+
+    @beartype
+    def destroy() -> tuple[str, Any]:
+        victim = Recipe.objects.create(
+            user=user, title="benchmark", time_minutes=1, price=1
+        )
+        return reverse("recipe:recipe-detail", args=[victim.pk]), None
+
+    @beartype
+    def upload() -> tuple[str, Any]:
+        image = BytesIO()
+        Image.new("RGB", (600, 400)).save(image, format="JPEG")
+        image.name = "benchmark.jpg"
+        _ = image.seek(0)
+        url = reverse("recipe:recipe-upload-image", args=[recipe.pk])
+        return url, {"image": image}
+
+    return [
+        Case(
+            "user create",
+            "POST",
+            201,
+            lambda: (
+                reverse("user:create"),
+                {
+                    "email": f"benchmark-{next(unique)}@example.com",
+                    "password": PASSWORD,
+                    "name": "Benchmark",
+                },
+            ),
+        ),
+        Case(
+            "user token",
+            "POST",
+            200,
+            lambda: (
+                reverse("user:token"),
+                {"email": user.email, "password": PASSWORD},
+            ),
+        ),
+        Case("user me", "GET", 200, read(reverse("user:me"))),
+        Case(
+            "user me update",
+            "PATCH",
+            200,
+            lambda: (reverse("user:me"), {"name": f"name {next(unique)}"}),
+        ),
+        Case("recipe api root", "GET", 200, read(reverse("recipe:api-root"))),
+        Case("tag list", "GET", 200, read(reverse("recipe:tag-list"))),
+        Case(
+            "tag create",
+            "POST",
+            201,
+            lambda: (
+                reverse("recipe:tag-list"),
+                {"name": f"benchmark {next(unique)}"},
+            ),
+        ),
+        Case(
+            "ingredient list",
+            "GET",
+            200,
+            read(reverse("recipe:ingredient-list")),
+        ),
+        Case(
+            "ingredient create",
+            "POST",
+            201,
+            lambda: (
+                reverse("recipe:ingredient-list"),
+                {"name": f"benchmark {next(unique)}"},
+            ),
+        ),
+        Case("recipe list", "GET", 200, read(recipes_url)),
+        Case(
+            "recipe list (cached)", "GET", 200, read(recipes_url, cached=True)
+        ),
+        Case(
+            "recipe list (tags)",
+            "GET",
+            200,
+            read(f"{recipes_url}?tags={tag_ids[0]},{tag_ids[1]}"),
+        ),
+        Case(
+            "recipe list (ingredients)",
+            "GET",
+            200,
+            read(f"{recipes_url}?ingredients={ingredient_ids[0]}"),
+        ),
+        Case(
+            "recipe list (search)",
+            "GET",
+            200,
+            read(f"{recipes_url}?search=recipe"),
+        ),
+        Case("recipe retrieve", "GET", 200, read(detail_url)),
+        Case(
+            "recipe create",
+            "POST",
+            201,
+            lambda: (recipes_url, recipe_payload()),
+        ),
+        Case(
+            "recipe update", "PUT", 200, lambda: (detail_url, recipe_payload())
+        ),
+        Case(
+            "recipe partial update",
+            "PATCH",
+            200,
+            lambda: (detail_url, {"title": f"benchmark {next(unique)}"}),
+        ),
+        Case("recipe destroy", "DELETE", 204, destroy),
+        Case(
+            "recipe bulk create",
+            "POST",
+            201,
+            lambda: (
+                reverse("recipe:recipe-bulk-create"),
+                [recipe_payload() for _ in range(10)],
+            ),
+        ),
+        Case("recipe upload image", "POST", 202, upload, format="multipart"),
+        Case("cache stats", "GET", 200, read(reverse("recipe:cache-stats"))),
+    ]
+
+
+@beartype
+def _take(ids: list[int], offset: int, n: int) -> list[int]:
+    return [ids[(offset + k) % len(ids)] for k in range(min(n, len(ids)))]
+
+
+@beartype
+def _bench_case(
+    client: APIClient, case: Case, scale: int, options: dict[str, Any]
+) -> Result:
+    result = Result(scale=scale, endpoint=case.name, method=case.method)
+    send = getattr(client, case.method.lower())
+
+    @beartype
+    def request(*, traced: bool = False) -> None:
+        path, data = case.prepare()
+        kwargs = {} if data is None else {"data": data, "format": case.format}
+        if traced:
+            # tracing slows every allocation down, so these requests are
+            # not timed
+            with _traced() as peak:
+                response = send(path, **kwargs)
+            result.memory.extend(peak)
+        else:
+            with CaptureQueriesContext(connection) as context:
+                start = perf_counter()
+                response = send(path, **kwargs)
+                result.latencies.append(perf_counter() - start)
+            result.queries.append(len(context))
+        if response.status_code != case.status:
+            raise CommandError(
+                f"{case.method} {path} answered {response.status_code}, "
+                f"expected {case.status}"
+            )
+
+    for _ in range(options["warmup"]):
+        request()
+    result.latencies.clear()
+    result.queries.clear()
+    for _ in range(max(options["requests"], 2)):
+        request()
+    for _ in range(max(options["memory_samples"], 1)):
+        request(traced=True)
+    return result
+
+
+@contextmanager
+@beartype
+def _traced() -> Iterator[list[int]]:
+    # collects the peak bytes allocated within the block
+    peak: list[int] = []
+    tracemalloc.start()
+    try:
+        yield peak
+    finally:
+        peak.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+
+@beartype
+def compare(
+    results: list[dict[str, Any]],
+    baseline: list[dict[str, Any]],
+    *,
+    tolerance: float,
+) -> list[str]:
+    # queries per request are deterministic, so any increase is flagged;
+    # latency and memory are noisy, so only increases beyond `tolerance`
+    previous = {(b["scale"], b["endpoint"]): b for b in baseline}
+    regressions = []
+    for result in results:
+        if (
+            base := previous.get((result["scale"], result["endpoint"]))
+        ) is None:
+            continue
+        label = f"{result['endpoint']} at {result['scale']} recipes"
+        for metric, key, strict in [
+            ("queries", "max", True),
+            ("latency_ms", "p50", False),
+            ("memory_kb", "p50", False),
+        ]:
+            now, then = result[metric][key], base[metric][key]
+            limit = then if strict else then * (1 + tolerance)
+            if now > limit:
+                regressions.append(
+                    f"{label}: {metric} {key} {now:.2f}, was {then:.2f}"
+                )
+    return regressions
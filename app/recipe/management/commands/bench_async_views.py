@@ -0,0 +1,295 @@
+from asyncio import gather
+from asyncio import run
+from collections.abc import Callable
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from io import BytesIO
+from statistics import quantiles
+from threading import Event
+from threading import Thread
+from time import perf_counter
+from time import sleep
+from types import ModuleType
+from typing import Any
+from uuid import uuid4
+
+from app.asgi import application as asgi_application
+from app.wsgi import application as wsgi_application
+from beartype import beartype
+from core.models import Recipe
+from core.models import User
+from django.core.management import BaseCommand
+from django.core.management.base import CommandParser
+from django.db import connection
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+from django.urls import include
+from django.urls import path
+from recipe.urls import build_router
+from rest_framework.authtoken.models import Token
+
+
+@dataclass(frozen=True)
+class Result:
+    mode: str
+    wall: float
+    latencies: list[float]
+    connections: int
+
+    @property
+    def throughput(self) -> float:
+        return len(self.latencies) / self.wall
+
+    @property
+    def p50(self) -> float:
+        return quantiles(self.latencies, n=100)[49]
+
+    @property
+    def p99(self) -> float:
+        return quantiles(self.latencies, n=100)[98]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput and latency of the WSGI entry point with the ASGI "
+        "one, with and without async read views, against a slow database"
+    )
+
+    @beartype
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--requests", type=int, default=400)
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=32,
+            help="clients issuing requests back to back",
+        )
+        parser.add_argument(
+            "--wsgi-workers",
+            type=int,
+            default=4,
+            help="requests the WSGI server handles at once",
+        )
+        parser.add_argument(
+            "--delay",
+            type=float,
+            default=0.01,
+            help="seconds added to every database query",
+        )
+        parser.add_argument("--recipes", type=int, default=20)
+        parser.add_argument("--path", default="/api/recipe/recipes/")
+
+    @beartype
+    def handle(self, *_args: Any, **options: Any) -> None:
+        user, token = _seed(options["recipes"])
+        bench = {
+            "path": options["path"],
+            "token": token.key,
+            "concurrency": options["concurrency"],
+            "per_client": max(options["requests"] // options["concurrency"], 1),
+        }
+        # leave only the benchmarked requests' connections open
+        connection.close()
+        try:
+            with _slow_database(options["delay"]):
+                results = [
+                    _bench_wsgi(workers=options["wsgi_workers"], **bench),
+                    _bench_asgi(async_reads=False, **bench),
+                    _bench_asgi(async_reads=True, **bench),
+                ]
+        finally:
+            _ = user.delete()
+        self.stdout.write(
+            f"{'mode':<20} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} "
+            f"{'db conns':>8}"
+        )
+        for result in results:
+            self.stdout.write(
+                f"{result.mode:<20} {result.throughput:>8.1f} "
+                f"{result.p50 * 1000:>8.1f} {result.p99 * 1000:>8.1f} "
+                f"{result.connections:>8}"
+            )
+
+
+@beartype
+def _seed(recipes: int) -> tuple[User, Token]:
+    user = User.objects.create_user(
+        email=f"{uuid4().hex}@example.com", password=None
+    )
+    _ = Recipe.objects.bulk_create(
+        Recipe(user=user, title=f"recipe {i}", time_minutes=i, price=i % 100)
+        for i in range(recipes)
+    )
+    return user, Token.objects.create(user=user)
+
+
+@contextmanager
+@beartype
+def _slow_database(delay: float) -> Iterator[None]:
+    # stands in for a distant or loaded server; sleeping releases the GIL,
+    # as waiting on a socket would
+    @beartype
+    def wrapper(execute: Callable[..., Any], *args: Any) -> Any:
+        sleep(delay)
+        return execute(*args)
+
+    @beartype
+    def install(*, connection: BaseDatabaseWrapper, **_: Any) -> None:
+        if wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(wrapper)
+
+    # existing connections are closed first, so every one is new
+    connection_created.connect(install)
+    try:
+        yield
+    finally:
+        _ = connection_created.disconnect(install)
+
+
+@contextmanager
+@beartype
+def _peak_connections() -> Iterator[list[int]]:
+    # samples the number of open sessions (other than the sampler's own)
+    samples: list[int] = []
+    stop = Event()
+
+    @beartype
+    def sample() -> None:
+        try:
+            with connection.cursor() as cursor:
+                while not stop.is_set():
+                    cursor.execute(
+                        "SELECT count(*) - 1 FROM pg_stat_activity "
+                        "WHERE datname = current_database()"
+                    )
+                    samples.append(cursor.fetchone()[0])
+                    _ = stop.wait(0.01)
+        finally:
+            connection.close()
+
+    thread = Thread(target=sample)
+    thread.start()
+    try:
+        yield samples
+    finally:
+        stop.set()
+        thread.join()
+
+
+@beartype
+def _urlconf(*, async_reads: bool) -> ModuleType:
+    urlconf = ModuleType("urlconf")
+    urlconf.urlpatterns = [  # type: ignore
+        path(
+            "api/recipe/",
+            include((build_router(async_reads=async_reads).urls, "recipe")),
+        )
+    ]
+    return urlconf
+
+
+@beartype
+def _bench_wsgi(
+    *, path: str, token: str, concurrency: int, per_client: int, workers: int
+) -> Result:
+    # a sync server handles at most `workers` requests at once; the rest
+    # queue, and their wait counts towards latency
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_AUTHORIZATION": f"Token {token}",
+        "wsgi.url_scheme": "http",
+        "wsgi.input": BytesIO(),
+    }
+
+    @beartype
+    def start_response(status: str, *_: Any) -> None:
+        assert status.startswith("200"), status  # noqa: S101
+
+    @beartype
+    def handle() -> None:
+        response = wsgi_application(dict(environ), start_response)
+        _ = b"".join(response)
+        response.close()
+
+    @beartype
+    def client(server: ThreadPoolExecutor) -> list[float]:
+        latencies = []
+        for _ in range(per_client):
+            start = perf_counter()
+            server.submit(handle).result()
+            latencies.append(perf_counter() - start)
+        return latencies
+
+    with override_settings(
+        ROOT_URLCONF=_urlconf(async_reads=False)
+    ), _peak_connections() as samples, ThreadPoolExecutor(
+        max_workers=workers
+    ) as server:
+        start = perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as clients:
+            futures = [
+                clients.submit(client, server) for _ in range(concurrency)
+            ]
+        wall = perf_counter() - start
+    latencies = [t for future in futures for t in future.result()]
+    return Result("wsgi", wall, latencies, max(samples, default=0))
+
+
+@beartype
+def _bench_asgi(
+    *,
+    path: str,
+    token: str,
+    concurrency: int,
+    per_client: int,
+    async_reads: bool,
+) -> Result:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "query_string": b"",
+        "headers": [
+            (b"host", b"localhost"),
+            (b"authorization", f"Token {token}".encode()),
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+
+    async def receive() -> dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message  # noqa: S101
+
+    async def client() -> list[float]:
+        latencies = []
+        for _ in range(per_client):
+            start = perf_counter()
+            await asgi_application(dict(scope), receive, send)
+            latencies.append(perf_counter() - start)
+        return latencies
+
+    async def clients() -> list[list[float]]:
+        return await gather(*(client() for _ in range(concurrency)))
+
+    with override_settings(
+        ROOT_URLCONF=_urlconf(async_reads=async_reads)
+    ), _peak_connections() as samples:
+        start = perf_counter()
+        latencies = [t for ts in run(clients()) for t in ts]
+        wall = perf_counter() - start
+    mode = "asgi (async views)" if async_reads else "asgi"
+    return Result(mode, wall, latencies, max(samples, default=0))
@@ -0,0 +1,126 @@
+from collections.abc import Callable
+from time import perf_counter
+from typing import Any
+
+from beartype import beartype
+from core.models import Recipe
+from django.core.management import BaseCommand
+from django.core.management import CommandError
+from django.core.management.base import CommandParser
+from django.db import transaction
+from django.db.models import Exists
+from django.db.models import OuterRef
+from django.db.models.query import QuerySet
+from recipe.filters import filter_related
+from recipe.synthetic import seed
+from rest_framework.settings import api_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway dataset whose recipes have many tags each and time "
+        "a page of recipes filtered by tags, matching any or all of them, "
+        "with joins, grouped subqueries and EXISTS"
+    )
+
+    @beartype
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--recipes", type=int, default=2000)
+        parser.add_argument("--tags", type=int, default=2000)
+        parser.add_argument("--tags-per-recipe", type=int, default=200)
+        parser.add_argument(
+            "--filter-tags", type=int, default=3, help="tags filtered on"
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="runs per strategy, best kept"
+        )
+
+    @beartype
+    def handle(self, *_args: Any, **options: Any) -> None:
+        with transaction.atomic():
+            dataset = seed(
+                users=1,
+                recipes=options["recipes"],
+                tags=options["tags"],
+                ingredients=1,
+                tags_per_recipe=options["tags_per_recipe"],
+                ingredients_per_recipe=1,
+            )
+            recipes = Recipe.objects.filter(user=dataset.user).order_by("-id")
+            # spread over the tags of a recipe, so that fewer recipes have
+            # all of them
+            step = max(options["tags_per_recipe"] // options["filter_tags"], 1)
+            ids = [
+                tag.pk for tag in dataset.tags[::step][: options["filter_tags"]]
+            ]
+            self.stdout.write(
+                f"{'match':<6} {'strategy':<16} {'ms':>8} {'rows':>6}"
+            )
+            for match, strategies in _strategies(ids).items():
+                pages = []
+                for name, strategy in strategies.items():
+                    seconds, page = _best_of(
+                        strategy(recipes), options["repeat"]
+                    )
+                    pages.append(page)
+                    self.stdout.write(
+                        f"{match:<6} {name:<16} {seconds * 1000:>8.2f} "
+                        f"{len(page):>6}"
+                    )
+                if any(page != pages[0] for page in pages):
+                    raise CommandError(f"Strategies disagree on {match}")
+            # the dataset is throwaway
+            transaction.set_rollback(True)
+
+
+Strategy = Callable[[QuerySet], QuerySet]
+
+
+@beartype
+def _strategies(ids: list[int]) -> dict[str, dict[str, Strategy]]:
+    links = Recipe.tags.through.objects.filter(tag_id__in=ids)
+    return {
+        "any": {
+            # fans out to a row per matching link, deduplicated afterwards
+            "join": lambda qs: qs.filter(tags__id__in=ids).distinct(),
+            "in subquery": lambda qs: qs.filter(
+                id__in=links.values("recipe_id")
+            ),
+            "exists": lambda qs: filter_related(
+                qs, "tags", ids, match_all=False
+            ),
+        },
+        "all": {
+            # a join per id
+            "joins": lambda qs: _join_each(qs, ids),
+            # an EXISTS per id
+            "exists": lambda qs: qs.filter(
+                *(
+                    Exists(links.filter(recipe_id=OuterRef("pk"), tag_id=id_))
+                    for id_ in ids
+                )
+            ),
+            "grouped": lambda qs: filter_related(
+                qs, "tags", ids, match_all=True
+            ),
+        },
+    }
+
+
+@beartype
+def _join_each(queryset: QuerySet, ids: list[int]) -> QuerySet:
+    for id_ in ids:
+        queryset = queryset.filter(tags__id=id_)
+    return queryset
+
+
+@beartype
+def _best_of(queryset: QuerySet, repeat: int) -> tuple[float, list[int]]:
+    # a page, as the list endpoint reads
+    page = queryset.values_list("id", flat=True)[: api_settings.PAGE_SIZE + 1]
+    timings, ids = [], []
+    for _ in range(max(repeat, 1)):
+        start = perf_counter()
+        ids = list(page.all())
+        timings.append(perf_counter() - start)
+    return min(timings), ids
@@ -0,0 +1,90 @@
+from collections.abc import Callable
+from functools import partial
+from io import BytesIO
+from time import perf_counter
+from typing import Any
+
+from beartype import beartype
+from core.models import Recipe
+from core.parsers import ORJSONParser
+from core.renderers import ORJSONRenderer
+from django.core.management import BaseCommand
+from django.core.management.base import CommandParser
+from django.db import transaction
+from recipe.serializers import RecipeDetailSerializer
+from recipe.synthetic import seed
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway dataset and compare rendering and parsing recipe "
+        "detail payloads with DRF's JSON classes and the orjson ones"
+    )
+
+    @beartype
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--recipes", type=int, default=100, help="recipes per payload"
+        )
+        parser.add_argument("--tags", type=int, default=20)
+        parser.add_argument("--ingredients", type=int, default=20)
+        parser.add_argument(
+            "--repeat", type=int, default=200, help="runs per pair, best kept"
+        )
+
+    @beartype
+    def handle(self, *_args: Any, **options: Any) -> None:
+        with transaction.atomic():
+            dataset = seed(
+                users=1,
+                recipes=options["recipes"],
+                tags=options["tags"],
+                ingredients=options["ingredients"],
+            )
+            recipes = Recipe.objects.filter(user=dataset.user).prefetch_related(
+                "tags", "ingredients"
+            )
+            payloads = {
+                "detail": RecipeDetailSerializer(recipes[0]).data,
+                f"{options['recipes']} details": RecipeDetailSerializer(
+                    recipes, many=True
+                ).data,
+            }
+            # the dataset is throwaway
+            transaction.set_rollback(True)
+        self.stdout.write(
+            f"{'payload':<16} {'library':<8} {'render/s':>10} {'parse/s':>10}"
+        )
+        for name, data in payloads.items():
+            body = JSONRenderer().render(data)
+            for library, renderer, parser in [
+                ("json", JSONRenderer(), JSONParser()),
+                ("orjson", ORJSONRenderer(), ORJSONParser()),
+            ]:
+                render = _best_of(
+                    partial(renderer.render, data), options["repeat"]
+                )
+                parse = _best_of(
+                    partial(_parse, parser, body), options["repeat"]
+                )
+                self.stdout.write(
+                    f"{name:<16} {library:<8} "
+                    f"{1 / render:>10.0f} {1 / parse:>10.0f}"
+                )
+
+
+@beartype
+def _parse(parser: JSONParser, body: bytes) -> Any:
+    return parser.parse(BytesIO(body))
+
+
+@beartype
+def _best_of(run: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(max(repeat, 1)):
+        start = perf_counter()
+        _ = run()
+        timings.append(perf_counter() - start)
+    return min(timings)
@@ -0,0 +1,66 @@
+from collections.abc import Callable
+from time import perf_counter
+from typing import Any
+
+from beartype import beartype
+from core.models import Recipe
+from django.core.management import BaseCommand
+from django.core.management.base import CommandParser
+from django.db import transaction
+from recipe.serializers import RecipeRowSerializer
+from recipe.serializers import RecipeSerializer
+from recipe.serializers import recipe_rows
+from recipe.synthetic import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway dataset and compare how many recipes per second "
+        "the serializer and the row-based list paths render, queries included"
+    )
+
+    @beartype
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--recipes", type=int, default=10_000)
+        parser.add_argument("--tags", type=int, default=20)
+        parser.add_argument("--ingredients", type=int, default=20)
+        parser.add_argument(
+            "--repeat", type=int, default=5, help="runs per path, best kept"
+        )
+
+    @beartype
+    def handle(self, *_args: Any, **options: Any) -> None:
+        with transaction.atomic():
+            dataset = seed(
+                users=1,
+                recipes=options["recipes"],
+                tags=options["tags"],
+                ingredients=options["ingredients"],
+            )
+            recipes = Recipe.objects.filter(user=dataset.user).order_by("-id")
+            paths = {
+                "serializer": lambda: RecipeSerializer(
+                    recipes.prefetch_related("tags", "ingredients"), many=True
+                ).data,
+                "rows": lambda: RecipeRowSerializer(
+                    recipe_rows(recipes), many=True
+                ).data,
+            }
+            for name, render in paths.items():
+                seconds = _best_of(render, options["repeat"])
+                self.stdout.write(
+                    f"{name:<12} {options['recipes'] / seconds:>10.0f} rows/s "
+                    f"({seconds * 1000:.0f} ms)"
+                )
+            # the dataset is throwaway
+            transaction.set_rollback(True)
+
+
+@beartype
+def _best_of(render: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(max(repeat, 1)):
+        start = perf_counter()
+        _ = render()
+        timings.append(perf_counter() - start)
+    return min(timings)
@@ -0,0 +1,153 @@
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from beartype import beartype
+from core.models import Ingredient
+from core.models import Tag
+from core.models import User
+from django.core.management import BaseCommand
+from django.core.management import CommandError
+from django.core.management.base import CommandParser
+from django.db import connection
+from django.db import transaction
+from django.db.models.query import QuerySet
+from recipe.synthetic import Dataset
+from recipe.synthetic import seed
+from recipe.views import IngredientViewSet
+from recipe.views import RecipeViewSet
+from recipe.views import TagViewSet
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.test import APIRequestFactory
+from rest_framework.viewsets import GenericViewSet
+
+
+_SEQ_SCAN = re.compile(r"Seq Scan on (\w+)")
+_INDEX_SCAN = re.compile(
+    r"(?:Index Scan|Index Only Scan)(?: Backward)? using (\w+)"
+)
+_BITMAP_SCAN = re.compile(r"Bitmap Index Scan on (\w+)")
+
+
+@dataclass(frozen=True)
+class Plan:
+    indexes: list[str]
+    seq_scans: list[str]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway dataset, run EXPLAIN ANALYZE on each query shape "
+        "the API issues and report whether it is served by an index"
+    )
+
+    @beartype
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--recipes", type=int, default=100)
+        parser.add_argument("--tags", type=int, default=20)
+        parser.add_argument("--ingredients", type=int, default=20)
+        parser.add_argument(
+            "--strict",
+            action="store_true",
+            help="fail if any query shape uses no index",
+        )
+
+    @beartype
+    def handle(self, *_args: Any, **options: Any) -> None:
+        if connection.vendor != "postgresql":
+            raise CommandError("EXPLAIN ANALYZE requires PostgreSQL")
+        with transaction.atomic():
+            dataset = seed(
+                users=options["users"],
+                recipes=options["recipes"],
+                tags=options["tags"],
+                ingredients=options["ingredients"],
+            )
+            failed = []
+            for name, shape in query_shapes(dataset).items():
+                output = shape().explain(analyze=True)
+                plan = parse_plan(output)
+                report = f"{name}: index {', '.join(plan.indexes) or '-'}"
+                if plan.seq_scans:
+                    # small inner tables may be hashed whole, which is fine
+                    # as long as the driving side uses an index
+                    report += f"; seq scan on {', '.join(plan.seq_scans)}"
+                if plan.indexes:
+                    self.stdout.write(self.style.SUCCESS(report))
+                else:
+                    failed.append(name)
+                    self.stdout.write(self.style.WARNING(report))
+                if options["verbosity"] > 1:
+                    self.stdout.write(output)
+            # the dataset is throwaway
+            transaction.set_rollback(True)
+        if failed and options["strict"]:
+            raise CommandError(f"No index used by: {', '.join(failed)}")
+
+
+@beartype
+def query_shapes(dataset: Dataset) -> dict[str, Callable[[], QuerySet]]:
+    page_size = api_settings.PAGE_SIZE
+    user, recipe = dataset.user, dataset.recipes[0]
+    tag_ids = ",".join(str(tag.pk) for tag in dataset.tags[:2])
+    ingredient_ids = ",".join(str(i.pk) for i in dataset.ingredients[:2])
+    page = [recipe.pk for recipe in dataset.recipes[:page_size]]
+
+    @beartype
+    def list_page(
+        viewset: type[GenericViewSet], **params: str
+    ) -> Callable[[], QuerySet]:
+        return lambda: _view_queryset(viewset, user, "list", params)[
+            : page_size + 1
+        ]
+
+    return {
+        "tag list": list_page(TagViewSet),
+        "tag list (assigned_only)": list_page(TagViewSet, assigned_only="1"),
+        "tag list (with_counts)": list_page(TagViewSet, with_counts="1"),
+        "ingredient list": list_page(IngredientViewSet),
+        "ingredient list (assigned_only)": list_page(
+            IngredientViewSet, assigned_only="1"
+        ),
+        "recipe list": list_page(RecipeViewSet),
+        "recipe list (tags)": list_page(RecipeViewSet, tags=tag_ids),
+        "recipe list (all tags)": list_page(
+            RecipeViewSet, tags=tag_ids, match="all"
+        ),
+        "recipe list (ingredients)": list_page(
+            RecipeViewSet, ingredients=ingredient_ids
+        ),
+        "recipe list (search)": list_page(RecipeViewSet, search="recipe"),
+        "recipe retrieve": lambda: _view_queryset(
+            RecipeViewSet, user, "retrieve", {}
+        ).filter(pk=recipe.pk),
+        "recipe tags (prefetch)": lambda: Tag.objects.filter(recipe__in=page),
+        "recipe ingredients (prefetch)": lambda: Ingredient.objects.filter(
+            recipe__in=page
+        ),
+    }
+
+
+@beartype
+def _view_queryset(
+    viewset: type[GenericViewSet],
+    user: User,
+    action: str,
+    params: dict[str, str],
+) -> QuerySet:
+    request = Request(APIRequestFactory().get("/", params))
+    request.user = user
+    view = viewset(action=action, request=request, format_kwarg=None, kwargs={})
+    return view.get_queryset()
+
+
+@beartype
+def parse_plan(output: str) -> Plan:
+    indexes = [*_INDEX_SCAN.findall(output), *_BITMAP_SCAN.findall(output)]
+    return Plan(
+        indexes=list(dict.fromkeys(indexes)),
+        seq_scans=list(dict.fromkeys(_SEQ_SCAN.findall(output))),
+    )
@@ -0,0 +1,96 @@
+from collections.abc import Iterator
+from itertools import islice
+from typing import Any
+
+from beartype import beartype
+from core.models import Recipe
+from core.models import RecipeStats
+from core.models import User
+from django.core.management import BaseCommand
+from django.core.management import CommandError
+from django.core.management.base import CommandParser
+from django.db.models import F
+from recipe.stats import fresh_link_counts
+from recipe.stats import fresh_stats
+from recipe.stats import rebuild_stats
+
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the recipe statistics of users, and the recipe counts of "
+        "their tags and ingredients, from scratch. With --check, report "
+        "those that differ from the maintained values instead, and fail if "
+        "any do"
+    )
+
+    @beartype
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="user_ids",
+            help="id of a user to rebuild, all if omitted; repeatable",
+        )
+        parser.add_argument(
+            "--check", action="store_true", help="compare rather than rewrite"
+        )
+
+    @beartype
+    def handle(self, *_args: Any, **options: Any) -> None:
+        users = User.objects.order_by("pk")
+        if options["user_ids"] is not None:
+            users = users.filter(pk__in=options["user_ids"])
+        pks = users.values_list("pk", flat=True).iterator(chunk_size=BATCH_SIZE)
+        num_users = 0
+        stale: set[int] = set()
+        for batch in _batches(pks):
+            num_users += len(batch)
+            if options["check"]:
+                for user_id, line in _stale(batch):
+                    stale.add(user_id)
+                    self.stdout.write(f"user {user_id}: {line}")
+            else:
+                rebuild_stats(batch)
+        if stale:
+            raise CommandError(f"{len(stale)} stale of {num_users} users")
+        self.stdout.write(
+            f"{'Checked' if options['check'] else 'Rebuilt'} "
+            f"{num_users} users"
+        )
+
+
+@beartype
+def _batches(pks: Iterator[int]) -> Iterator[list[int]]:
+    while batch := list(islice(pks, BATCH_SIZE)):
+        yield batch
+
+
+@beartype
+def _stale(user_ids: list[int]) -> Iterator[tuple[int, str]]:
+    stored = {
+        stats.pk: stats
+        for stats in RecipeStats.objects.filter(user_id__in=user_ids)
+    }
+    for user_id, fresh in fresh_stats(user_ids).items():
+        if (stats := stored.get(user_id)) is None:
+            # created on first read
+            continue
+        for name, value in fresh.items():
+            if getattr(stats, name) != value:
+                yield user_id, f"{name} is {getattr(stats, name)}, should be {value}"
+    for relation in Recipe._meta.many_to_many:
+        model = relation.related_model
+        for pk, user_id, stored_count, count in (
+            model.objects.filter(user_id__in=user_ids)
+            .annotate(fresh=fresh_link_counts(relation))
+            .exclude(recipe_count=F("fresh"))
+            .values_list("pk", "user_id", "recipe_count", "fresh")
+        ):
+            yield user_id, (
+                f"{model._meta.model_name} {pk} recipe_count is {stored_count}, "
+                f"should be {count}"
+            )
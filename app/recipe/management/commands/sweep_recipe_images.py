@@ -0,0 +1,55 @@
+from datetime import timedelta
+from typing import Any
+
+from beartype import beartype
+from core.models import ImageStatus
+from core.models import Recipe
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.core.management.base import CommandParser
+from django.db.models import Q
+from django.utils.timezone import now
+from recipe.images import fail_image
+from recipe.images import process_image
+
+
+class Command(BaseCommand):
+    help = (
+        "Process the images of recipes pending for longer than --older-than "
+        "seconds, whose jobs were lost with the process that queued them. "
+        "With --fail, mark them failed instead"
+    )
+
+    @beartype
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--older-than",
+            type=float,
+            default=settings.RECIPE_IMAGE_PENDING_SECONDS,
+            help="seconds since the image was queued",
+        )
+        parser.add_argument(
+            "--fail", action="store_true", help="fail rather than process"
+        )
+
+    @beartype
+    def handle(self, *_args: Any, **options: Any) -> None:
+        cutoff = now() - timedelta(seconds=options["older_than"])
+        stale = Recipe.objects.filter(
+            Q(image_queued_at__lt=cutoff) | Q(image_queued_at=None),
+            image_status=ImageStatus.PENDING,
+        )
+        num_images = 0
+        for pk, name in stale.values_list("pk", "image").iterator():
+            # claimed first, so that concurrent sweeps take different recipes
+            if not stale.filter(pk=pk).update(image_queued_at=now()):
+                continue
+            if options["fail"]:
+                fail_image(pk, name)
+            else:
+                process_image(pk, name)
+            num_images += 1
+        self.stdout.write(
+            f"{'Failed' if options['fail'] else 'Processed'} "
+            f"{num_images} pending images"
+        )
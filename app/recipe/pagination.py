@@ -0,0 +1,179 @@
+from base64 import urlsafe_b64decode
+from base64 import urlsafe_b64encode
+from binascii import Error as BinasciiError
+from collections import OrderedDict
+from dataclasses import dataclass
+from json import dumps
+from json import loads
+from typing import Any
+from typing import cast
+
+from beartype import beartype
+from django.conf import settings
+from django.db.models import Model
+from django.db.models import Q
+from django.db.models.query import QuerySet
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+
+
+@dataclass(frozen=True)
+class Cursor:
+    position: list[Any]
+    reverse: bool
+
+
+class KeysetPagination(BasePagination):
+    # pages by filtering on the ordering key of the previous page's boundary
+    # row, so deep pages cost the same as the first; the view's
+    # `keyset_ordering` (or `get_keyset_ordering()`) must end in a unique field
+    default_ordering = ["-pk"]
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = gettext_lazy("Invalid cursor")
+
+    @beartype
+    def paginate_queryset(
+        self, queryset: QuerySet, request: Request, view: APIView | None = None
+    ) -> list[Model | dict[str, Any]] | None:
+        if (page_size := self.get_page_size(request)) is None:
+            return None
+        self.base_url = request.build_absolute_uri()
+        ordering = self.get_ordering(view)
+        cursor = self.decode_cursor(request, ordering)
+        if cursor is None:
+            reverse, position = False, None
+        else:
+            reverse, position = cursor.reverse, cursor.position
+        if reverse:
+            queryset = queryset.order_by(*map(_invert, ordering))
+        else:
+            queryset = queryset.order_by(*ordering)
+        if position is not None:
+            try:
+                queryset = queryset.filter(_after(ordering, position, reverse))
+            except (TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+        results = list(queryset[: page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        if results:
+            self.first = _position(results[0], ordering)
+            self.last = _position(results[-1], ordering)
+        else:
+            self.has_next = self.has_previous = False
+        return results
+
+    @beartype
+    def get_ordering(self, view: APIView | None) -> list[str]:
+        if (get_ordering := getattr(view, "get_keyset_ordering", None)) is None:
+            return list(getattr(view, "keyset_ordering", self.default_ordering))
+        return list(get_ordering())
+
+    @beartype
+    def get_paginated_response(self, data: Any) -> Response:
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    @beartype
+    def get_page_size(self, request: Request) -> int | None:
+        default = cast(int | None, api_settings.PAGE_SIZE)
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return default
+        return (
+            min(page_size, settings.MAX_PAGE_SIZE) if page_size > 0 else default
+        )
+
+    @beartype
+    def get_next_link(self) -> str | None:
+        if not self.has_next:
+            return None
+        return self.encode_cursor(Cursor(position=self.last, reverse=False))
+
+    @beartype
+    def get_previous_link(self) -> str | None:
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(Cursor(position=self.first, reverse=True))
+
+    @beartype
+    def decode_cursor(
+        self, request: Request, ordering: list[str]
+    ) -> Cursor | None:
+        if (
+            encoded := request.query_params.get(self.cursor_query_param)
+        ) is None:
+            return None
+        try:
+            data = loads(urlsafe_b64decode(encoded.encode("ascii")))
+            position, reverse = data["p"], data["r"]
+        except (BinasciiError, KeyError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if (
+            not isinstance(position, list)
+            or len(position) != len(ordering)
+            or not isinstance(reverse, bool)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(position=position, reverse=reverse)
+
+    @beartype
+    def encode_cursor(self, cursor: Cursor) -> str:
+        data = dumps({"p": cursor.position, "r": cursor.reverse})
+        encoded = urlsafe_b64encode(data.encode("ascii")).decode("ascii")
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+
+@beartype
+def _invert(field: str) -> str:
+    return field[1:] if field.startswith("-") else f"-{field}"
+
+
+@beartype
+def _after(ordering: list[str], position: list[Any], reverse: bool) -> Q:
+    # (a, b) after (x, y) is `a > x OR (a = x AND b > y)`, with each
+    # comparison flipped for descending fields and for backwards paging
+    condition = Q()
+    for i, field in enumerate(ordering):
+        descending = field.startswith("-") != reverse
+        lookup = "lt" if descending else "gt"
+        strict = Q(**{f"{field.lstrip('-')}__{lookup}": position[i]})
+        equal = Q(
+            **{
+                prev.lstrip("-"): value
+                for prev, value in zip(ordering[:i], position[:i])
+            }
+        )
+        condition |= equal & strict
+    return condition
+
+
+@beartype
+def _position(obj: Model | dict[str, Any], ordering: list[str]) -> list[Any]:
+    # pages are of instances, or of rows from `QuerySet.values()`
+    if isinstance(obj, dict):
+        return [obj[field.lstrip("-")] for field in ordering]
+    return [getattr(obj, field.lstrip("-")) for field in ordering]
@@ -0,0 +1,90 @@
+from collections.abc import Iterable
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from beartype import beartype
+from core.models import Ingredient
+from core.models import Recipe
+from core.models import Tag
+from django.conf import settings
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import CombinedSearchVector
+from django.contrib.postgres.search import SearchQuery
+from django.contrib.postgres.search import SearchRank
+from django.contrib.postgres.search import SearchVector
+from django.db.models import F
+from django.db.models import FloatField
+from django.db.models import Model
+from django.db.models import OuterRef
+from django.db.models import Subquery
+from django.db.models import Value
+from django.db.models.functions import Cast
+from django.db.models.functions import Coalesce
+from django.db.models.query import QuerySet
+
+
+_PENDING: ContextVar[set[int] | None] = ContextVar("_PENDING", default=None)
+
+
+@beartype
+def _names(model: type[Model]) -> Coalesce:
+    names = (
+        model.objects.filter(recipe=OuterRef("pk"))
+        .values("recipe")
+        .annotate(names=StringAgg("name", " "))
+        .values("names")
+    )
+    return Coalesce(Subquery(names), Value(""))
+
+
+@beartype
+def search_vector() -> CombinedSearchVector:
+    config = settings.SEARCH_CONFIG
+    return (
+        SearchVector("title", weight="A", config=config)
+        + SearchVector(_names(Tag), weight="B", config=config)
+        + SearchVector(_names(Ingredient), weight="B", config=config)
+    )
+
+
+@beartype
+def update_search_vectors(pks: Iterable[int] | QuerySet) -> None:
+    # a single UPDATE, whatever the number of recipes
+    _ = Recipe.objects.filter(pk__in=pks).update(search_vector=search_vector())
+
+
+@beartype
+def mark_stale(pks: Iterable[int]) -> None:
+    if (pending := _PENDING.get()) is None:
+        update_search_vectors(pks)
+    else:
+        pending.update(pks)
+
+
+@contextmanager
+@beartype
+def batched_search_updates() -> Iterator[None]:
+    # a write touching a recipe and its relations fires several signals;
+    # collect them and refresh each recipe's vector once at the end
+    if _PENDING.get() is not None:
+        yield
+        return
+    pending: set[int] = set()
+    token = _PENDING.set(pending)
+    try:
+        yield
+    finally:
+        _PENDING.reset(token)
+    if pending:
+        update_search_vectors(pending)
+
+
+@beartype
+def search_recipes(queryset: QuerySet, text: str) -> QuerySet:
+    query = SearchQuery(
+        text, config=settings.SEARCH_CONFIG, search_type="websearch"
+    )
+    # ts_rank is a `real`; widen it so cursors round-trip through JSON exactly
+    rank = Cast(SearchRank(F("search_vector"), query), FloatField())
+    return queryset.filter(search_vector=query).annotate(rank=rank)
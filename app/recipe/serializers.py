@@ -1,10 +1,163 @@
+from collections.abc import Callable
+from collections.abc import Collection
+from collections.abc import Mapping
+from contextlib import suppress
+from functools import cache
+from typing import Any
+from typing import cast
+
+from beartype import beartype
 from core.models import Ingredient
 from core.models import Recipe
 from core.models import Tag
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db import transaction
+from django.db.models import ManyToManyField
+from django.db.models import Model
+from django.db.models import OuterRef
+from django.db.models.functions import JSONObject
+from django.db.models.query import QuerySet
+from recipe.images import get_storage
+from recipe.search import update_search_vectors
+from recipe.stats import count_created_recipes
+from recipe.stats import count_links
+from recipe.stats import update_totals
+from recipe.versions import bump_versions
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import CharField
+from rest_framework.fields import Field
+from rest_framework.fields import IntegerField
+from rest_framework.fields import ListField
+from rest_framework.relations import MANY_RELATION_KWARGS
+from rest_framework.relations import ManyRelatedField
+from rest_framework.serializers import BaseSerializer
+from rest_framework.serializers import ListSerializer
 from rest_framework.serializers import ModelSerializer
 from rest_framework.serializers import PrimaryKeyRelatedField
 
 
+BULK_BATCH_SIZE = 1000
+
+
+class BatchedPrimaryKeyRelatedField(PrimaryKeyRelatedField):
+    @beartype
+    def get_queryset(self) -> QuerySet:
+        # only the requesting user's own are linked
+        queryset = super().get_queryset()
+        if (request := self.context.get("request")) is not None:
+            queryset = queryset.filter(user=request.user)
+        return queryset
+
+    @classmethod
+    @beartype
+    def many_init(cls, *args: Any, **kwargs: Any) -> ManyRelatedField:
+        list_kwargs = {
+            key: value
+            for key, value in kwargs.items()
+            if key in MANY_RELATION_KWARGS
+        }
+        return BatchedManyRelatedField(
+            child_relation=cls(*args, **kwargs), **list_kwargs
+        )
+
+    @beartype
+    def to_internal_pk(self, data: Any) -> Any:
+        if self.pk_field is not None:
+            data = self.pk_field.to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return self.get_queryset().model._meta.pk.get_prep_value(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+
+class BatchedManyRelatedField(ManyRelatedField):
+    # resolves every primary key in a single query, rather than one per item
+
+    @beartype
+    def to_internal_value(self, data: Any) -> list[Model]:
+        if isinstance(data, str) or not hasattr(data, "__iter__"):
+            self.fail("not_a_list", input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail("empty")
+        child = cast(BatchedPrimaryKeyRelatedField, self.child_relation)
+        pks = [child.to_internal_pk(item) for item in data]
+        if (resolved := self.context.get("resolved_related")) is None:
+            found = child.get_queryset().in_bulk(set(pks))
+        else:
+            found = resolved[self.field_name]
+        for pk in pks:
+            if pk not in found:
+                child.fail("does_not_exist", pk_value=pk)
+        return [found[pk] for pk in pks]
+
+    @beartype
+    def resolve_items(self, items: list[Any]) -> dict[Any, Model]:
+        # resolves the keys of a whole list of payloads at once; malformed
+        # values are skipped here and reported by `to_internal_value`
+        child = cast(BatchedPrimaryKeyRelatedField, self.child_relation)
+        pks: set[Any] = set()
+        for item in items:
+            if isinstance(item, Mapping) and isinstance(
+                values := item.get(self.field_name), list
+            ):
+                for value in values:
+                    with suppress(ValidationError):
+                        pks.add(child.to_internal_pk(value))
+        return child.get_queryset().in_bulk(pks)
+
+
+class RecipeListSerializer(ListSerializer):
+    @beartype
+    def to_internal_value(self, data: Any) -> list[dict[str, Any]]:
+        if isinstance(data, list) and (
+            self.max_length is None or len(data) <= self.max_length
+        ):
+            self._context = {
+                **self._context,
+                "resolved_related": {
+                    name: field.resolve_items(data)
+                    for name, field in self.child.fields.items()
+                    if isinstance(field, BatchedManyRelatedField)
+                },
+            }
+        return super().to_internal_value(data)
+
+    @beartype
+    def create(self, validated_data: list[dict[str, Any]]) -> list[Recipe]:
+        related = {
+            field: [attrs.pop(field.name, []) for attrs in validated_data]
+            for field in Recipe._meta.many_to_many
+        }
+        with transaction.atomic():
+            recipes = Recipe.objects.bulk_create(
+                [Recipe(**attrs) for attrs in validated_data],
+                batch_size=BULK_BATCH_SIZE,
+            )
+            for field, objs_per_recipe in related.items():
+                through = field.remote_field.through
+                source = f"{field.m2m_field_name()}_id"
+                target = f"{field.m2m_reverse_field_name()}_id"
+                _ = through.objects.bulk_create(
+                    [
+                        through(**{source: recipe.pk, target: pk})
+                        for recipe, objs in zip(recipes, objs_per_recipe)
+                        for pk in dict.fromkeys(obj.pk for obj in objs)
+                    ],
+                    batch_size=BULK_BATCH_SIZE,
+                )
+            update_search_vectors([recipe.pk for recipe in recipes])
+            # the bulk path bypasses the signals that maintain these
+            count_created_recipes(recipes)
+            bump_versions({recipe.user_id for recipe in recipes})
+        return list(
+            Recipe.objects.filter(pk__in=[recipe.pk for recipe in recipes])
+            .order_by("pk")
+            .prefetch_related("tags", "ingredients")
+        )
+
+
 class TagSerializer(ModelSerializer):
     class Meta:  # type: ignore
         model = Tag
@@ -19,14 +172,25 @@ class IngredientSerializer(ModelSerializer):
         read_only_fields = ["id"]
 
 
+class TagCountSerializer(TagSerializer):
+    class Meta(TagSerializer.Meta):  # type: ignore
+        fields = TagSerializer.Meta.fields + ["recipe_count"]
+
+
+class IngredientCountSerializer(IngredientSerializer):
+    class Meta(IngredientSerializer.Meta):  # type: ignore
+        fields = IngredientSerializer.Meta.fields + ["recipe_count"]
+
+
 class RecipeSerializer(ModelSerializer):
-    ingredients = PrimaryKeyRelatedField(
+    ingredients = BatchedPrimaryKeyRelatedField(
         many=True, queryset=Ingredient.objects.all()
     )
-    tags = PrimaryKeyRelatedField(many=True, queryset=Tag.objects.all())
+    tags = BatchedPrimaryKeyRelatedField(many=True, queryset=Tag.objects.all())
 
     class Meta:  # type: ignore
         model = Recipe
+        list_serializer_class = RecipeListSerializer
         fields = [
             "id",
             "title",
@@ -39,13 +203,311 @@ class RecipeSerializer(ModelSerializer):
         read_only_fields = ["id"]
 
 
-class RecipeDetailSerializer(RecipeSerializer):
+class LibraryRecipeSerializer(RecipeSerializer):
+    # as imported from a library, whose recipes refer to the library's own
+    # ids of their tags and ingredients
+    ingredients = ListField(child=IntegerField())
+    tags = ListField(child=IntegerField())
+
+
+class RecipeBulkUpdateListSerializer(RecipeListSerializer):
+    # updates the recipes of `instance`, a queryset, that the items name by
+    # `id`; they are locked while read, so that the totals replaced are those
+    # stored, and must be read within a transaction
+
+    @beartype
+    def to_internal_value(self, data: Any) -> list[dict[str, Any]]:
+        if isinstance(data, list) and (
+            self.max_length is None or len(data) <= self.max_length
+        ):
+            # malformed ids are skipped here and reported by the items
+            ids = set()
+            for item in data:
+                if isinstance(item, Mapping) and "id" in item:
+                    with suppress(ValidationError):
+                        ids.add(
+                            self.child.fields["id"].to_internal_value(
+                                item["id"]
+                            )
+                        )
+            self._context = {
+                **self._context,
+                "recipes": self.instance.select_for_update().in_bulk(ids),
+            }
+        return super().to_internal_value(data)
+
+    @beartype
+    def validate(self, attrs: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        ids = [item["id"] for item in attrs]
+        if len(set(ids)) < len(ids):
+            raise ValidationError("Each recipe can only be updated once.")
+        return attrs
+
+    @beartype
+    def update(
+        self,
+        instance: QuerySet,  # noqa: U100
+        validated_data: list[dict[str, Any]],
+    ) -> list[Recipe]:
+        # one UPDATE for the columns, and per relation given one DELETE and
+        # one INSERT replacing the links, whatever the number of recipes
+        stored = self.context["recipes"]
+        recipes = []
+        columns: set[str] = set()
+        related: dict[ManyToManyField, dict[int, list[Model]]] = {
+            field: {} for field in Recipe._meta.many_to_many
+        }
+        totals = []
+        for attrs in validated_data:
+            recipe = stored[attrs.pop("id")]
+            totals.append(
+                (recipe.user_id, recipe.price, recipe.time_minutes, -1)
+            )
+            for field, objs_per_recipe in related.items():
+                if field.name in attrs:
+                    objs_per_recipe[recipe.pk] = attrs.pop(field.name)
+            for name, value in attrs.items():
+                setattr(recipe, name, value)
+            columns.update(attrs)
+            totals.append(
+                (recipe.user_id, recipe.price, recipe.time_minutes, 1)
+            )
+            recipes.append(recipe)
+        # within the transaction that locked the recipes
+        if columns:
+            _ = Recipe.objects.bulk_update(
+                recipes, sorted(columns), batch_size=BULK_BATCH_SIZE
+            )
+        for field, objs_per_recipe in related.items():
+            if objs_per_recipe:
+                _relink(field, objs_per_recipe)
+        update_search_vectors([recipe.pk for recipe in recipes])
+        # the bulk path bypasses the signals that maintain these
+        update_totals(totals)
+        bump_versions({recipe.user_id for recipe in recipes})
+        updated = (
+            Recipe.objects.prefetch_related("tags", "ingredients")
+            .filter(pk__in=[recipe.pk for recipe in recipes])
+            .in_bulk()
+        )
+        return [updated[recipe.pk] for recipe in recipes]
+
+
+@beartype
+def _relink(
+    field: ManyToManyField, objs_per_recipe: dict[int, list[Model]]
+) -> None:
+    # replaces the links of the recipes given with those to the objects
+    through = field.remote_field.through
+    source = f"{field.m2m_field_name()}_id"
+    target = f"{field.m2m_reverse_field_name()}_id"
+    links = through.objects.filter(**{f"{source}__in": list(objs_per_recipe)})
+    count_links(field, links, sign=-1)
+    _ = links.delete()
+    _ = through.objects.bulk_create(
+        [
+            through(**{source: pk, target: target_pk})
+            for pk, objs in objs_per_recipe.items()
+            for target_pk in dict.fromkeys(obj.pk for obj in objs)
+        ],
+        batch_size=BULK_BATCH_SIZE,
+    )
+    count_links(field, links, sign=1)
+
+
+class RecipeBulkUpdateSerializer(RecipeSerializer):
+    # an item of a bulk update: the `id` of the recipe, and the fields
+    # changed
+    id = IntegerField()
+
+    class Meta(RecipeSerializer.Meta):  # type: ignore
+        list_serializer_class = RecipeBulkUpdateListSerializer
+        read_only_fields: list[str] = []
+
+    @beartype
+    def validate_id(self, value: int) -> int:
+        # other users' recipes are reported as missing too
+        if value not in self.context["recipes"]:
+            raise ValidationError(
+                f'Invalid pk "{value}" - object does not exist.'
+            )
+        return value
+
+    @beartype
+    def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
+        # required even though the update is partial
+        if "id" not in attrs:
+            raise ValidationError(
+                {"id": [self.fields["id"].error_messages["required"]]}
+            )
+        return attrs
+
+
+class SparseFieldsMixin:
+    # renders only the `fields` given, if any, out of those declared
+
+    @beartype
+    def __init__(
+        self, *args: Any, fields: Collection[str] | None = None, **kwargs: Any
+    ) -> None:
+        super().__init__(*args, **kwargs)  # type: ignore
+        if fields is not None:
+            for name in set(self.fields) - set(fields):  # type: ignore
+                _ = self.fields.pop(name)  # type: ignore
+
+
+@beartype
+def recipe_rows(
+    queryset: QuerySet,
+    *extra: str,
+    fields: Collection[str] | None = None,
+    expand: Collection[str] = (),
+) -> QuerySet:
+    # the input of `RecipeRowSerializer`: the recipes' columns (and `extra`
+    # ones, such as annotations ordered by) as dicts, with the ids of their
+    # tags and ingredients aggregated into arrays by the database, or for
+    # the relations in `expand` the objects themselves. Each array is a
+    # correlated subquery, so only the rows returned pay for it, and only
+    # the `fields` given, if any, are selected at all
+    if fields is None:
+        fields = RecipeSerializer.Meta.fields
+    related = {}
+    for field in Recipe._meta.many_to_many:
+        if field.name not in fields:
+            continue
+        target = field.m2m_reverse_field_name()
+        links = field.remote_field.through.objects.filter(
+            **{f"{field.m2m_field_name()}_id": OuterRef("pk")}
+        ).order_by(f"{target}_id")
+        if field.name in expand:
+            related[_objects_key(field.name)] = ArraySubquery(
+                links.values(
+                    object=JSONObject(
+                        **{
+                            name: f"{target}__{name}"
+                            for name in _nested_fields(field.name)
+                        }
+                    )
+                )
+            )
+        else:
+            related[_ids_key(field.name)] = ArraySubquery(
+                links.values(f"{target}_id")
+            )
+    relations = {field.name for field in Recipe._meta.many_to_many}
+    columns = [
+        name
+        for name in RecipeSerializer.Meta.fields
+        if name in fields and name not in relations
+    ]
+    return queryset.values(*dict.fromkeys([*columns, *extra]), **related)
+
+
+@beartype
+def _ids_key(name: str) -> str:
+    # annotations may not shadow the many-to-many fields themselves
+    return f"{name}_ids"
+
+
+@beartype
+def _objects_key(name: str) -> str:
+    return f"{name}_objects"
+
+
+@beartype
+def _nested_fields(name: str) -> list[str]:
+    # those `RecipeDetailSerializer` nests the relation's objects with, all
+    # of which the database renders already
+    nested = cast(ListSerializer, RecipeDetailSerializer._declared_fields[name])
+    return nested.child.Meta.fields  # type: ignore
+
+
+class RecipeRowSerializer(BaseSerializer):
+    # renders `recipe_rows` exactly as `RecipeSerializer` renders recipes,
+    # without building instances or resolving each field's attribute; read
+    # only, for lists. Renders only the `fields` given, if any, as
+    # `SparseFieldsMixin` does, and the relations in `expand` as
+    # `RecipeDetailSerializer` does, from rows selected likewise
+
+    @beartype
+    def __init__(
+        self,
+        *args: Any,
+        fields: Collection[str] | None = None,
+        expand: Collection[str] = (),
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.row_fields = {
+            name: (_objects_key(name), None) if name in expand else spec
+            for name, spec in _row_fields().items()
+            if fields is None or name in fields
+        }
+
+    @beartype
+    def to_representation(self, row: dict[str, Any]) -> dict[str, Any]:
+        data = {}
+        for name, (key, convert) in self.row_fields.items():
+            value = row[key]
+            if convert is not None and value is not None:
+                value = convert(value)
+            data[name] = value
+        return data
+
+
+@cache
+@beartype
+def _row_fields() -> dict[str, tuple[str, Callable[[Any], Any] | None]]:
+    # each output field's row key, and how to convert its value if at all
+    fields: dict[str, tuple[str, Callable[[Any], Any] | None]] = {}
+    for name, field in RecipeSerializer().fields.items():
+        if isinstance(field, ManyRelatedField):
+            fields[name] = (_ids_key(name), None)
+        elif isinstance(field, (IntegerField, CharField)):
+            # database values are their representation already
+            fields[name] = (name, None)
+        else:
+            fields[name] = (name, field.to_representation)
+    return fields
+
+
+class ImageVariantsField(Field):
+    @beartype
+    def __init__(self, **kwargs: Any) -> None:
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    @beartype
+    def to_representation(self, value: dict[str, str]) -> dict[str, str]:
+        storage = get_storage()
+        request = self.context.get("request")
+        urls = {variant: storage.url(path) for variant, path in value.items()}
+        if request is None:
+            return urls
+        return {
+            variant: request.build_absolute_uri(url)
+            for variant, url in urls.items()
+        }
+
+
+class RecipeDetailSerializer(SparseFieldsMixin, RecipeSerializer):
     ingredients = IngredientSerializer(many=True, read_only=True)
     tags = TagSerializer(many=True, read_only=True)
+    image_variants = ImageVariantsField()
+
+    class Meta(RecipeSerializer.Meta):  # type: ignore
+        fields = RecipeSerializer.Meta.fields + [
+            "image",
+            "image_status",
+            "image_variants",
+        ]
+        read_only_fields = ["id", "image", "image_status"]
 
 
 class RecipeImageSerializer(ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:  # type: ignore
         model = Recipe
-        fields = ["id", "image"]
-        read_only_fields = ["id"]
+        fields = ["id", "image", "image_status", "image_variants"]
+        read_only_fields = ["id", "image_status"]
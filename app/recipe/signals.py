@@ -0,0 +1,213 @@
+from typing import Any
+
+from beartype import beartype
+from core.models import CollectionVersion
+from core.models import Ingredient
+from core.models import Recipe
+from core.models import RecipeStats
+from core.models import Tag
+from core.models import User
+from core.replicas import mark_written
+from django.db.models import Model
+from django.db.models.signals import m2m_changed
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.db.models.signals import pre_delete
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+from recipe.caching import schedule_invalidation
+from recipe.search import mark_stale
+from recipe.search import update_search_vectors
+from recipe.stats import count_links
+from recipe.stats import update_totals
+from recipe.versions import collections_changed
+from recipe.versions import mark_changed
+
+
+@receiver(post_save, sender=Recipe)
+@beartype
+def update_saved_recipe(*, instance: Recipe, **_: Any) -> None:
+    mark_stale([instance.pk])
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+@beartype
+def update_relinked_recipes(
+    *,
+    instance: Model,
+    action: str,
+    reverse: bool,
+    pk_set: set[int] | None,
+    **_: Any,
+) -> None:
+    if not reverse:
+        if action in {"post_add", "post_remove", "post_clear"}:
+            mark_stale([instance.pk])
+    elif action == "pre_clear":
+        # the links are gone by "post_clear", so note the recipes first
+        instance._cleared_recipe_pks = list(  # type: ignore
+            instance.recipe_set.values_list("pk", flat=True)  # type: ignore
+        )
+    elif action == "post_clear":
+        mark_stale(instance._cleared_recipe_pks)  # type: ignore
+    elif action in {"post_add", "post_remove"} and pk_set:
+        mark_stale(pk_set)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@beartype
+def update_renamed_attr_recipes(
+    *, instance: Tag | Ingredient, created: bool, **_: Any
+) -> None:
+    if not created:
+        update_search_vectors(instance.recipe_set.values("pk"))  # type: ignore
+
+
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Ingredient)
+@beartype
+def note_deleted_attr_recipes(*, instance: Tag | Ingredient, **_: Any) -> None:
+    instance._deleted_recipe_pks = list(  # type: ignore
+        instance.recipe_set.values_list("pk", flat=True)  # type: ignore
+    )
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+@beartype
+def update_deleted_attr_recipes(
+    *, instance: Tag | Ingredient, **_: Any
+) -> None:
+    mark_stale(instance._deleted_recipe_pks)  # type: ignore
+
+
+@receiver(post_save, sender=User)
+@beartype
+def create_collection_version(
+    *, instance: User, created: bool, **_: Any
+) -> None:
+    if created:
+        _ = CollectionVersion.objects.create(user=instance)
+
+
+@receiver(post_save, sender=User)
+@beartype
+def create_recipe_stats(*, instance: User, created: bool, **_: Any) -> None:
+    if created:
+        _ = RecipeStats.objects.create(user=instance)
+
+
+@receiver(pre_save, sender=Recipe)
+@beartype
+def note_saved_recipe_totals(*, instance: Recipe, **_: Any) -> None:
+    # what the save replaces, as stored rather than as loaded
+    if not instance._state.adding:
+        instance._replaced_totals = (  # type: ignore
+            Recipe.objects.filter(pk=instance.pk)
+            .values_list("user_id", "price", "time_minutes")
+            .first()
+        )
+
+
+@receiver(post_save, sender=Recipe)
+@beartype
+def count_saved_recipe(*, instance: Recipe, **_: Any) -> None:
+    changes = [(instance.user_id, instance.price, instance.time_minutes, 1)]
+    if (
+        replaced := instance.__dict__.pop("_replaced_totals", None)
+    ) is not None:
+        changes.append((*replaced, -1))
+    update_totals(changes)
+
+
+@receiver(pre_delete, sender=Recipe)
+@beartype
+def discount_deleted_recipe_links(*, instance: Recipe, **_: Any) -> None:
+    # the links are deleted along with the recipe, without `m2m_changed`
+    for relation in Recipe._meta.many_to_many:
+        count_links(
+            relation,
+            relation.remote_field.through.objects.filter(
+                **{relation.m2m_column_name(): instance.pk}
+            ),
+            sign=-1,
+        )
+
+
+@receiver(post_delete, sender=Recipe)
+@beartype
+def discount_deleted_recipe(*, instance: Recipe, **_: Any) -> None:
+    update_totals(
+        [(instance.user_id, instance.price, instance.time_minutes, -1)]
+    )
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+@beartype
+def count_relinked(
+    *,
+    sender: type[Model],
+    instance: Model,
+    action: str,
+    reverse: bool,
+    pk_set: set[int] | None,
+    **_: Any,
+) -> None:
+    # before removals, as only links that exist are counted
+    relation = next(
+        field
+        for field in Recipe._meta.many_to_many
+        if field.remote_field.through is sender
+    )
+    own, other = relation.m2m_column_name(), relation.m2m_reverse_name()
+    if reverse:
+        own, other = other, own
+    links = sender.objects.filter(**{own: instance.pk})
+    if action == "post_add" and pk_set:
+        count_links(relation, links.filter(**{f"{other}__in": pk_set}), sign=1)
+    elif action == "pre_remove" and pk_set:
+        count_links(relation, links.filter(**{f"{other}__in": pk_set}), sign=-1)
+    elif action == "pre_clear":
+        count_links(relation, links, sign=-1)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+@beartype
+def bump_written_version(
+    *, instance: Recipe | Tag | Ingredient, **_: Any
+) -> None:
+    mark_changed([instance.user_id])  # type: ignore
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+@beartype
+def bump_relinked_version(
+    *, instance: Recipe | Tag | Ingredient, action: str, **_: Any
+) -> None:
+    # the API only links recipes to their owner's tags and ingredients, so
+    # either side identifies the user
+    if action in {"post_add", "post_remove", "post_clear"}:
+        mark_changed([instance.user_id])  # type: ignore
+
+
+@receiver(collections_changed)
+@beartype
+def invalidate_cached_responses(*, user_ids: set[int], **_: Any) -> None:
+    schedule_invalidation(user_ids)
+
+
+@receiver(collections_changed)
+@beartype
+def stick_to_primary(*, user_ids: set[int], **_: Any) -> None:
+    # also covers writes made outside of `ReplicaReadMixin` views, such as
+    # imports and image processing
+    mark_written(user_ids)
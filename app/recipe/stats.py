@@ -0,0 +1,269 @@
+from collections import Counter
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass
+from dataclasses import field
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from beartype import beartype
+from core.models import Ingredient
+from core.models import Recipe
+from core.models import RecipeStats
+from core.models import Tag
+from core.models import User
+from django.db import transaction
+from django.db.models import Count
+from django.db.models import F
+from django.db.models import ManyToManyField
+from django.db.models import OuterRef
+from django.db.models import Subquery
+from django.db.models import Sum
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+from django.db.models.query import QuerySet
+
+
+# `time_counts` with a jsonb object of deltas added to it, dropping counts
+# that reach 0; a single expression, whatever the number of keys
+_MERGE_TIME_COUNTS = """
+COALESCE(
+    (
+        SELECT jsonb_object_agg(key, total)
+        FROM (
+            SELECT key, sum(value::bigint) AS total
+            FROM (
+                SELECT * FROM jsonb_each_text(time_counts)
+                UNION ALL
+                SELECT * FROM jsonb_each_text(%s::jsonb)
+            ) AS counts
+            GROUP BY key
+        ) AS totals
+        WHERE total <> 0
+    ),
+    '{}'
+)
+"""
+
+
+@dataclass
+class _Delta:
+    recipes: int = 0
+    price: Decimal = Decimal(0)
+    time: int = 0
+    times: Counter[int] = field(default_factory=Counter)
+
+    @beartype
+    def add(self, price: Any, time_minutes: int, sign: int) -> None:
+        self.recipes += sign
+        self.price += sign * Recipe._meta.get_field("price").to_python(price)
+        self.time += sign * time_minutes
+        self.times[time_minutes] += sign
+
+    @beartype
+    def __bool__(self) -> bool:
+        return bool(
+            self.recipes or self.price or self.time or any(self.times.values())
+        )
+
+
+@beartype
+def update_totals(changes: Iterable[tuple[int, Any, int, int]]) -> None:
+    # applies `(user id, price, time_minutes, 1 or -1)` for each recipe
+    # counted or discounted, with a single UPDATE per user. Users without a
+    # row are left to `rebuild_stats`
+    deltas: defaultdict[int, _Delta] = defaultdict(_Delta)
+    for user_id, price, time_minutes, sign in changes:
+        deltas[user_id].add(price, time_minutes, sign)
+    for user_id, delta in deltas.items():
+        if not delta:
+            continue
+        times = {str(minutes): n for minutes, n in delta.times.items() if n}
+        _ = RecipeStats.objects.filter(user_id=user_id).update(
+            recipe_count=F("recipe_count") + delta.recipes,
+            price_total=F("price_total") + delta.price,
+            time_total=F("time_total") + delta.time,
+            # a constant statement, the deltas passed as a parameter
+            time_counts=RawSQL(  # noqa: S611
+                _MERGE_TIME_COUNTS, (orjson.dumps(times).decode(),)
+            ),
+        )
+
+
+@beartype
+def count_links(
+    relation: ManyToManyField, links: QuerySet, *, sign: int
+) -> None:
+    # moves the `recipe_count` of the tags (or ingredients) that `links`, rows
+    # of the relation's through table, point at by how many point at each;
+    # a single UPDATE
+    target = relation.m2m_reverse_name()
+    counts = Subquery(
+        links.filter(**{target: OuterRef("pk")})
+        .order_by()
+        .values(target)
+        .annotate(n=Count("*"))
+        .values("n")
+    )
+    _ = relation.related_model.objects.filter(
+        pk__in=links.values(target)
+    ).update(
+        recipe_count=(
+            F("recipe_count") + counts
+            if sign > 0
+            else F("recipe_count") - counts
+        )
+    )
+
+
+@beartype
+def count_created_recipes(recipes: list[Recipe]) -> None:
+    # for recipes created, and linked, in bulk, which bypasses the signals
+    # maintaining the counts
+    update_totals(
+        (recipe.user_id, recipe.price, recipe.time_minutes, 1)
+        for recipe in recipes
+    )
+    for relation in Recipe._meta.many_to_many:
+        count_links(
+            relation,
+            relation.remote_field.through.objects.filter(
+                **{
+                    f"{relation.m2m_column_name()}__in": [
+                        recipe.pk for recipe in recipes
+                    ]
+                }
+            ),
+            sign=1,
+        )
+
+
+@beartype
+def recipe_stats(user: User) -> dict[str, Any]:
+    # read from the maintained rows, rather than the recipes
+    try:
+        stats = RecipeStats.objects.get(user=user)
+    except RecipeStats.DoesNotExist:
+        # users created without signals firing have none yet; concurrent
+        # first reads insert and recompute it under the same lock
+        rebuild_stats([user.pk])
+        stats = RecipeStats.objects.get(user=user)
+    count = stats.recipe_count
+    return {
+        "recipe_count": count,
+        "average_price": (
+            str((stats.price_total / count).quantize(Decimal("0.01")))
+            if count
+            else None
+        ),
+        "total_time_minutes": stats.time_total,
+        "median_time_minutes": _median(stats.time_counts, count),
+        "tags": _used(Tag.objects.filter(user=user)),
+        "ingredients": _used(Ingredient.objects.filter(user=user)),
+    }
+
+
+@beartype
+def _used(queryset: QuerySet) -> list[dict[str, Any]]:
+    return list(
+        queryset.filter(recipe_count__gt=0)
+        .order_by("-recipe_count", "name", "id")
+        .values("id", "name", "recipe_count")
+    )
+
+
+@beartype
+def _median(time_counts: dict[str, int], total: int) -> int | float | None:
+    # walks the distinct times in order, so it costs as many steps as there
+    # are of those rather than recipes
+    if not total:
+        return None
+    # the positions of the middle recipe, or two
+    middle = [(total - 1) // 2, total // 2]
+    found: list[int] = []
+    seen = 0
+    for minutes, n in sorted((int(key), n) for key, n in time_counts.items()):
+        seen += n
+        while len(found) < 2 and middle[len(found)] < seen:
+            found.append(minutes)
+        if len(found) == 2:
+            break
+    half, odd = divmod(sum(found), 2)
+    return sum(found) / 2 if odd else half
+
+
+@beartype
+def fresh_stats(user_ids: list[int]) -> dict[int, dict[str, Any]]:
+    # each user's totals, aggregated from their recipes
+    stats: dict[int, dict[str, Any]] = {
+        user_id: {
+            "recipe_count": 0,
+            "price_total": Decimal("0.00"),
+            "time_total": 0,
+            "time_counts": {},
+        }
+        for user_id in user_ids
+    }
+    recipes = Recipe.objects.filter(user_id__in=user_ids).order_by()
+    for row in recipes.values("user_id").annotate(
+        recipe_count=Count("pk"),
+        price_total=Sum("price"),
+        time_total=Sum("time_minutes"),
+    ):
+        stats[row.pop("user_id")].update(row)
+    for user_id, minutes, n in (
+        recipes.values("user_id", "time_minutes")
+        .annotate(n=Count("pk"))
+        .values_list("user_id", "time_minutes", "n")
+    ):
+        stats[user_id]["time_counts"][str(minutes)] = n
+    return stats
+
+
+@beartype
+def fresh_link_counts(relation: ManyToManyField) -> Coalesce:
+    # the recipes linked to each tag (or ingredient), for annotating them
+    through = relation.remote_field.through
+    target = relation.m2m_reverse_name()
+    return Coalesce(
+        Subquery(
+            through.objects.filter(**{target: OuterRef("pk")})
+            .order_by()
+            .values(target)
+            .annotate(n=Count("*"))
+            .values("n")
+        ),
+        0,
+    )
+
+
+@beartype
+def rebuild_stats(user_ids: Iterable[int]) -> None:
+    # recomputes the users' rows and the counts of their tags and
+    # ingredients from scratch. Missing rows are first inserted empty, and
+    # committed, so that concurrent changes update them rather than skip
+    # them; the rows, and the tags and ingredients, are then locked, so that
+    # those changes are applied on top of the recomputed values rather than
+    # lost. Links committed while waiting for the locks are counted, as each
+    # statement sees what was committed before it
+    user_ids = list(user_ids)
+    _ = RecipeStats.objects.bulk_create(
+        [RecipeStats(user_id=user_id) for user_id in user_ids],
+        ignore_conflicts=True,
+    )
+    with transaction.atomic():
+        rows = list(
+            RecipeStats.objects.select_for_update().filter(user_id__in=user_ids)
+        )
+        fresh = fresh_stats(user_ids)
+        for stats in rows:
+            for name, value in fresh[stats.pk].items():
+                setattr(stats, name, value)
+        _ = RecipeStats.objects.bulk_update(
+            rows, ["recipe_count", "price_total", "time_total", "time_counts"]
+        )
+        for relation in Recipe._meta.many_to_many:
+            items = relation.related_model.objects.filter(user_id__in=user_ids)
+            _ = list(items.select_for_update().order_by("pk").values("pk"))
+            _ = items.update(recipe_count=fresh_link_counts(relation))
@@ -0,0 +1,143 @@
+from dataclasses import dataclass
+from itertools import islice
+from typing import Any
+from uuid import uuid4
+
+from beartype import beartype
+from core.models import Ingredient
+from core.models import Recipe
+from core.models import RecipeStats
+from core.models import Tag
+from core.models import User
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.db import connection
+from recipe.search import update_search_vectors
+from recipe.stats import rebuild_stats
+
+
+BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class Dataset:
+    # one user in the middle of the key space, and what they own
+    user: User
+    tags: list[Tag]
+    ingredients: list[Ingredient]
+    recipes: list[Recipe]
+
+
+@beartype
+def seed(
+    *,
+    users: int,
+    recipes: int,
+    tags: int,
+    ingredients: int,
+    tags_per_recipe: int = 3,
+    ingredients_per_recipe: int = 5,
+) -> Dataset:
+    # per user counts; recipes link their owner's tags and ingredients
+    # round-robin. Writes in bulk, bypassing signals, so callers are expected
+    # to roll the dataset back
+    prefix = uuid4().hex
+    all_users = User.objects.bulk_create(
+        (
+            User(
+                email=f"{prefix}-{i}@example.com",
+                password=UNUSABLE_PASSWORD_PREFIX,
+            )
+            for i in range(users)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    # the rows signals would have created, recomputed once all is written
+    _ = RecipeStats.objects.bulk_create(
+        (RecipeStats(user=user) for user in all_users), batch_size=BATCH_SIZE
+    )
+    all_tags = Tag.objects.bulk_create(
+        (
+            Tag(user=user, name=f"tag {i}")
+            for user in all_users
+            for i in range(tags)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    all_ingredients = Ingredient.objects.bulk_create(
+        (
+            Ingredient(user=user, name=f"ingredient {i}")
+            for user in all_users
+            for i in range(ingredients)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    all_recipes = Recipe.objects.bulk_create(
+        (
+            Recipe(
+                user=user, title=f"recipe {i}", time_minutes=i, price=i % 100
+            )
+            for user in all_users
+            for i in range(recipes)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    _ = Recipe.tags.through.objects.bulk_create(
+        (
+            Recipe.tags.through(recipe_id=recipe.pk, tag_id=tag.pk)
+            for j, recipe in enumerate(all_recipes)
+            for tag in _pick(all_tags, tags, j // recipes, j, tags_per_recipe)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    _ = Recipe.ingredients.through.objects.bulk_create(
+        (
+            Recipe.ingredients.through(
+                recipe_id=recipe.pk, ingredient_id=ingredient.pk
+            )
+            for j, recipe in enumerate(all_recipes)
+            for ingredient in _pick(
+                all_ingredients,
+                ingredients,
+                j // recipes,
+                j,
+                ingredients_per_recipe,
+            )
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    # refresh the planner's statistics, both for the search vector update
+    # and for the queries run against the dataset
+    analyze()
+    update_search_vectors([recipe.pk for recipe in all_recipes])
+    rebuild_stats([user.pk for user in all_users])
+    analyze()
+    owner = users // 2
+    return Dataset(
+        user=all_users[owner],
+        tags=_owned(all_tags, tags, owner),
+        ingredients=_owned(all_ingredients, ingredients, owner),
+        recipes=_owned(all_recipes, recipes, owner),
+    )
+
+
+@beartype
+def analyze() -> None:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "ANALYZE core_user, core_tag, core_ingredient, core_recipe, "
+            "core_recipe_tags, core_recipe_ingredients"
+        )
+
+
+@beartype
+def _owned(items: list[Any], per_user: int, user: int) -> list[Any]:
+    start = user * per_user
+    return list(islice(items, start, start + per_user))
+
+
+@beartype
+def _pick(
+    items: list[Any], per_user: int, user: int, offset: int, n: int
+) -> list[Any]:
+    owned = _owned(items, per_user, user)
+    return [owned[(offset + k) % per_user] for k in range(min(n, per_user))]
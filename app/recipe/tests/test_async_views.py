@@ -0,0 +1,121 @@
+from asyncio import iscoroutinefunction
+from typing import Any
+from typing import cast
+
+from asgiref.sync import async_to_sync
+from beartype import beartype
+from core.async_views import close_worker_connections
+from core.models import Recipe
+from core.models import UserManager
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient
+from django.test import TransactionTestCase
+from django.test.utils import override_settings
+from django.urls import include
+from django.urls import path
+from django.urls import resolve
+from django.urls import reverse
+from recipe.urls import build_router
+from rest_framework.authtoken.models import Token
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_201_CREATED
+from rest_framework.status import HTTP_401_UNAUTHORIZED
+from rest_framework.status import HTTP_404_NOT_FOUND
+from user.authentication import get_token_cache
+
+
+urlpatterns = [
+    path(
+        "api/recipe/", include((build_router(async_reads=True).urls, "recipe"))
+    )
+]
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class TestAsyncReadViews(TransactionTestCase):
+    # the pool threads use their own connections, so the data must be
+    # committed for them to see it
+
+    @beartype
+    def setUp(self) -> None:
+        get_token_cache().clear()
+        manager = cast(UserManager, get_user_model().objects)
+        self.user = manager.create_user(
+            email="test@example.com", password="password"
+        )
+        self.other = manager.create_user(
+            email="other@example.com", password="password"
+        )
+        token = Token.objects.create(user=self.user)
+        # AsyncClient takes raw header names
+        self.auth = {"AUTHORIZATION": f"Token {token.key}"}
+        self.recipe = Recipe.objects.create(
+            user=self.user, title="Toast", time_minutes=2, price=1.00
+        )
+
+    @beartype
+    def tearDown(self) -> None:
+        # so that the test database can be dropped
+        close_worker_connections()
+
+    @beartype
+    def _request(self, method: str, *args: Any, **extra: Any) -> Any:
+        # a coroutine function, as `async_to_sync` expects
+        @beartype
+        async def request() -> Any:
+            return await getattr(AsyncClient(), method)(*args, **extra)
+
+        return async_to_sync(request)()
+
+    @beartype
+    def _get(self, url: str, **extra: Any) -> Any:
+        return self._request("get", url, **extra)
+
+    @beartype
+    def test_reads_routed_to_async_views(self) -> None:
+        for url in [
+            reverse("recipe:recipe-list"),
+            reverse("recipe:recipe-detail", args=[self.recipe.pk]),
+            reverse("recipe:tag-list"),
+            reverse("recipe:ingredient-list"),
+        ]:
+            self.assertTrue(iscoroutinefunction(resolve(url).func))
+        url = reverse("recipe:recipe-upload-image", args=[self.recipe.pk])
+        self.assertFalse(iscoroutinefunction(resolve(url).func))
+
+    @beartype
+    def test_list_and_retrieve(self) -> None:
+        res = self._get(reverse("recipe:recipe-list"), **self.auth)
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        ids = [item["id"] for item in res.json()["results"]]
+        self.assertEqual(ids, [self.recipe.pk])
+        res = self._get(
+            reverse("recipe:recipe-detail", args=[self.recipe.pk]), **self.auth
+        )
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual(res.json()["title"], self.recipe.title)
+
+    @beartype
+    def test_authentication_and_ownership(self) -> None:
+        res = self._get(reverse("recipe:tag-list"))
+        self.assertEqual(res.status_code, HTTP_401_UNAUTHORIZED)
+        recipe = Recipe.objects.create(
+            user=self.other, title="Soup", time_minutes=20, price=3.00
+        )
+        res = self._get(
+            reverse("recipe:recipe-detail", args=[recipe.pk]), **self.auth
+        )
+        self.assertEqual(res.status_code, HTTP_404_NOT_FOUND)
+
+    @beartype
+    def test_writes_on_read_routes(self) -> None:
+        res = self._request(
+            "post",
+            reverse("recipe:tag-list"),
+            {"name": "Vegan"},
+            content_type="application/json",
+            **self.auth,
+        )
+        self.assertEqual(res.status_code, HTTP_201_CREATED)
+        res = self._get(reverse("recipe:tag-list"), **self.auth)
+        self.assertEqual(res.json()["results"][0]["name"], "Vegan")
@@ -0,0 +1,202 @@
+from typing import cast
+
+from beartype import beartype
+from core.models import ImageStatus
+from core.models import Recipe
+from core.models import Tag
+from core.models import UserManager
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.test.utils import override_settings
+from django.urls import reverse
+from recipe.caching import RESPONSE_CACHE_STATS
+from recipe.caching import get_response_cache
+from recipe.checks import check_response_cache
+from recipe.images import process_image
+from rest_framework.response import Response
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_304_NOT_MODIFIED
+from rest_framework.status import HTTP_403_FORBIDDEN
+from rest_framework.test import APIClient
+
+
+RECIPES_URL = reverse("recipe:recipe-list")
+TAGS_URL = reverse("recipe:tag-list")
+BULK_URL = reverse("recipe:recipe-bulk-create")
+STATS_URL = reverse("recipe:cache-stats")
+
+
+@beartype
+def detail_url(recipe_id: int) -> str:
+    return reverse("recipe:recipe-detail", args=[recipe_id])
+
+
+class TestResponseCache(TestCase):
+    @beartype
+    def setUp(self) -> None:
+        get_response_cache().clear()
+        RESPONSE_CACHE_STATS.reset()
+        self.client = APIClient()
+        self.manager = cast(UserManager, get_user_model().objects)
+        self.user = self.manager.create_user(
+            email="test@example.com", password="password"
+        )
+        self.client.force_authenticate(self.user)
+        self.recipe = Recipe.objects.create(
+            user=self.user, title="Toast", time_minutes=2, price=1.00
+        )
+
+    @beartype
+    def _get(self, url: str, *, queries: int | None = None) -> Response:
+        with CaptureQueriesContext(connection) as context:
+            res = cast(Response, self.client.get(url))
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        if queries is not None:
+            self.assertEqual(len(context), queries)
+        return res
+
+    @beartype
+    def _titles(self) -> list[str]:
+        res = self._get(RECIPES_URL)
+        return [recipe["title"] for recipe in res.data["results"]]
+
+    @beartype
+    def test_hits_skip_queries(self) -> None:
+        for url in [RECIPES_URL, detail_url(self.recipe.pk), TAGS_URL]:
+            first = self._get(url)
+            again = self._get(url, queries=0)
+            self.assertEqual(again.data, first.data)
+            self.assertEqual(again.get("ETag"), first.get("ETag"))
+        self.assertEqual(RESPONSE_CACHE_STATS.hits, 3)
+        self.assertEqual(RESPONSE_CACHE_STATS.misses, 3)
+
+    @beartype
+    def test_hits_answer_conditional_requests(self) -> None:
+        etag = self._get(RECIPES_URL)["ETag"]
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(context), 0)
+
+    @beartype
+    def test_params_normalized(self) -> None:
+        _ = self._get(f"{RECIPES_URL}?tags=2,1&ingredients=3")
+        _ = self._get(f"{RECIPES_URL}?ingredients=3&tags=1, 2", queries=0)
+        _ = self._get(f"{RECIPES_URL}?tags=1")
+        self.assertEqual(RESPONSE_CACHE_STATS.misses, 2)
+
+    @beartype
+    def test_writes_invalidate(self) -> None:
+        self.assertEqual(self._titles(), ["Toast"])
+        self.recipe.title = "Cheese on toast"
+        self.recipe.save()
+        self.assertEqual(self._titles(), ["Cheese on toast"])
+        tag = Tag.objects.create(user=self.user, name="Breakfast")
+        _ = self._get(detail_url(self.recipe.pk))
+        self.recipe.tags.add(tag)
+        res = self._get(detail_url(self.recipe.pk))
+        self.assertEqual(res.data["tags"][0]["name"], "Breakfast")
+        _ = self.client.post(
+            BULK_URL,
+            [
+                {
+                    "title": "Porridge",
+                    "tags": [],
+                    "ingredients": [],
+                    "time_minutes": 5,
+                    "price": 2.00,
+                }
+            ],
+            format="json",
+        )
+        self.assertEqual(self._titles(), ["Porridge", "Cheese on toast"])
+        _ = self.recipe.delete()
+        self.assertEqual(self._titles(), ["Porridge"])
+
+    @beartype
+    def test_image_processing_invalidates(self) -> None:
+        _ = self._get(detail_url(self.recipe.pk))
+        # no image to render, so processing fails
+        _ = Recipe.objects.filter(pk=self.recipe.pk).update(image="missing.jpg")
+        with self.assertLogs("recipe.images", "ERROR"):
+            process_image(self.recipe.pk, "missing.jpg")
+        res = self._get(detail_url(self.recipe.pk))
+        self.assertEqual(res.data["image_status"], ImageStatus.FAILED)
+
+    @beartype
+    def test_other_users_writes_keep_entries(self) -> None:
+        _ = self._get(RECIPES_URL)
+        other = self.manager.create_user(
+            email="other@example.com", password="password"
+        )
+        _ = Recipe.objects.create(
+            user=other, title="Soup", time_minutes=20, price=3.00
+        )
+        _ = self._get(RECIPES_URL, queries=0)
+        self.client.force_authenticate(other)
+        res = self._get(RECIPES_URL)
+        self.assertEqual(res.data["results"][0]["title"], "Soup")
+
+    @beartype
+    @override_settings(RESPONSE_CACHE_ALIAS="default")
+    def test_shared_backend(self) -> None:
+        get_response_cache().clear()
+        _ = self._get(RECIPES_URL)
+        _ = self._get(RECIPES_URL, queries=0)
+        self.recipe.title = "Cheese on toast"
+        self.recipe.save()
+        self.assertEqual(self._titles(), ["Cheese on toast"])
+
+    @beartype
+    @override_settings(RESPONSE_CACHE_MAX_SIZE=2)
+    def test_size_bounded(self) -> None:
+        for page_size in range(1, 5):
+            _ = self._get(f"{RECIPES_URL}?page_size={page_size}")
+        # the least recently used entries are evicted
+        self.assertEqual(len(get_response_cache()), 2)  # type: ignore
+
+    @beartype
+    def test_stats_admin_only(self) -> None:
+        _ = self._get(RECIPES_URL)
+        _ = self._get(RECIPES_URL)
+        res = self.client.get(STATS_URL)
+        self.assertEqual(res.status_code, HTTP_403_FORBIDDEN)
+        admin = self.manager.create_superuser(
+            email="admin@example.com", password="password"
+        )
+        self.client.force_authenticate(admin)
+        res = cast(Response, self.client.get(STATS_URL))
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual(res.data["hits"], 1)
+        self.assertEqual(res.data["misses"], 1)
+        self.assertEqual(res.data["hit_rate"], 0.5)
+        self.assertEqual(res.data["max_size"], 10_000)
+
+
+class TestResponseCacheCheck(SimpleTestCase):
+    @beartype
+    def test_shared_required_with_several_processes(self) -> None:
+        for processes, alias, errors in [
+            (1, None, []),
+            (4, None, ["recipe.E001"]),
+            (4, "default", ["recipe.E001"]),
+            (4, "shared", []),
+        ]:
+            with override_settings(
+                WORKER_PROCESSES=processes,
+                RESPONSE_CACHE_ALIAS=alias,
+                CACHES={
+                    "default": {
+                        "BACKEND": "django.core.cache.backends.locmem.LocMemCache"
+                    },
+                    "shared": {
+                        "BACKEND": "django.core.cache.backends.db.DatabaseCache"
+                    },
+                },
+            ):
+                self.assertEqual(
+                    [error.id for error in check_response_cache()], errors
+                )
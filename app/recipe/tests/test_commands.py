@@ -0,0 +1,161 @@
+from io import StringIO
+from json import loads
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import cast
+
+from beartype import beartype
+from core.models import Recipe
+from core.models import RecipeStats
+from core.models import Tag
+from core.models import UserManager
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError
+from django.core.management import call_command
+from django.test import TestCase
+from recipe.management.commands.bench_api import compare
+from recipe.management.commands.explain_queries import parse_plan
+
+
+PLAN = """
+Limit  (cost=0.29..8.31 rows=1 width=22)
+  ->  Nested Loop Semi Join  (cost=0.29..8.31 rows=1 width=22)
+        ->  Index Scan Backward using core_tag_user_name_idx on core_tag
+        ->  Index Only Scan using core_recipe_tags_reverse_idx on core_recipe_tags
+        ->  Seq Scan on core_ingredient  (cost=0.00..1.01 rows=1 width=4)
+"""
+
+
+class TestExplainQueries(TestCase):
+    @beartype
+    def test_parse_plan(self) -> None:
+        plan = parse_plan(PLAN)
+        self.assertEqual(
+            plan.indexes,
+            ["core_tag_user_name_idx", "core_recipe_tags_reverse_idx"],
+        )
+        self.assertEqual(plan.seq_scans, ["core_ingredient"])
+
+    @beartype
+    def test_reports_every_shape_and_rolls_back(self) -> None:
+        out = StringIO()
+        call_command(
+            "explain_queries",
+            users=3,
+            recipes=5,
+            tags=2,
+            ingredients=2,
+            stdout=out,
+        )
+        lines = out.getvalue().splitlines()
+        self.assertIn("tag list (assigned_only)", out.getvalue())
+        self.assertIn("recipe list (search)", out.getvalue())
+        self.assertTrue(all(": index " in line for line in lines))
+        self.assertFalse(Recipe.objects.exists())
+
+
+class TestBenchSerialization(TestCase):
+    @beartype
+    def test_reports_both_paths_and_rolls_back(self) -> None:
+        out = StringIO()
+        call_command("bench_serialization", recipes=20, repeat=1, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(
+            [line.split()[0] for line in lines], ["serializer", "rows"]
+        )
+        self.assertTrue(all("rows/s" in line for line in lines))
+        self.assertFalse(Recipe.objects.exists())
+
+
+class TestBenchJSON(TestCase):
+    @beartype
+    def test_reports_both_libraries_and_rolls_back(self) -> None:
+        out = StringIO()
+        call_command("bench_json", recipes=5, repeat=1, stdout=out)
+        rows = [line.split() for line in out.getvalue().splitlines()[1:]]
+        self.assertEqual(
+            [row[-3] for row in rows], ["json", "orjson", "json", "orjson"]
+        )
+        self.assertFalse(Recipe.objects.exists())
+
+
+class TestBenchAPI(TestCase):
+    @beartype
+    def _summary(self, queries: int, latency: float) -> dict:
+        return {
+            "scale": 10,
+            "endpoint": "recipe list",
+            "queries": {"max": queries},
+            "latency_ms": {"p50": latency},
+            "memory_kb": {"p50": 50.0},
+        }
+
+    @beartype
+    def test_compare(self) -> None:
+        baseline = [self._summary(2, 10.0)]
+        self.assertEqual(
+            compare([self._summary(2, 12.0)], baseline, tolerance=0.25), []
+        )
+        self.assertEqual(
+            compare([self._summary(3, 13.0)], baseline, tolerance=0.25),
+            [
+                "recipe list at 10 recipes: queries max 3.00, was 2.00",
+                "recipe list at 10 recipes: latency_ms p50 13.00, was 10.00",
+            ],
+        )
+
+    @beartype
+    def test_reports_and_rolls_back(self) -> None:
+        endpoints = ["recipe list", "recipe create", "recipe destroy"]
+        with TemporaryDirectory() as directory:
+            output = Path(directory) / "report.json"
+            call_command(
+                "bench_api",
+                scales=[3],
+                users=2,
+                requests=2,
+                warmup=1,
+                memory_samples=1,
+                endpoints=endpoints,
+                output=output,
+                stdout=StringIO(),
+            )
+            report = loads(output.read_text())
+        self.assertEqual(
+            [result["endpoint"] for result in report["results"]], endpoints
+        )
+        self.assertEqual(report["results"][0]["queries"]["max"], 2)
+        self.assertFalse(Recipe.objects.exists())
+
+
+class TestRebuildRecipeStats(TestCase):
+    @beartype
+    def test_check_then_rebuild(self) -> None:
+        user = cast(UserManager, get_user_model().objects).create_user(
+            email="test@example.com", password="password"
+        )
+        tag = Tag.objects.create(user=user, name="Vegan")
+        recipe = Recipe.objects.create(
+            user=user, title="Soup", time_minutes=5, price=1
+        )
+        recipe.tags.add(tag)
+        call_command("rebuild_recipe_stats", check=True, stdout=StringIO())
+        # drift, as from writes that bypassed the signals
+        _ = RecipeStats.objects.filter(user=user).update(recipe_count=7)
+        _ = Tag.objects.filter(pk=tag.pk).update(recipe_count=0)
+        out = StringIO()
+        with self.assertRaisesMessage(CommandError, "1 stale of 1 users"):
+            call_command(
+                "rebuild_recipe_stats",
+                user_ids=[user.pk],
+                check=True,
+                stdout=out,
+            )
+        self.assertIn("recipe_count is 7, should be 1", out.getvalue())
+        self.assertIn(f"tag {tag.pk} recipe_count is 0", out.getvalue())
+        out = StringIO()
+        call_command("rebuild_recipe_stats", stdout=out)
+        self.assertIn("Rebuilt 1 users", out.getvalue())
+        self.assertEqual(RecipeStats.objects.get(user=user).recipe_count, 1)
+        self.assertEqual(Tag.objects.get(pk=tag.pk).recipe_count, 1)
+        call_command("rebuild_recipe_stats", check=True, stdout=StringIO())
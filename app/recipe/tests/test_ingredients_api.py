@@ -47,7 +47,7 @@ class TestPrivateIngredientsAPI(TestCase):
         ingredients = Ingredient.objects.all().order_by("-name")
         self.assertEqual(res.status_code, HTTP_200_OK)
         serializer = IngredientSerializer(ingredients, many=True)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     @beartype
     def test_ingredients_limited_to_user(self) -> None:
@@ -58,10 +58,10 @@ class TestPrivateIngredientsAPI(TestCase):
         _ = Ingredient.objects.create(user=user2, name="Vinegar")
         res = cast(Response, self.client.get(INGREDIENTS_URL))
         self.assertEqual(res.status_code, HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data["results"]), 1)
         ingredients = Ingredient.objects.filter(user=self.user)
         serializer = IngredientSerializer(ingredients, many=True)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     @beartype
     def test_create_ingredient_successful(self) -> None:
@@ -92,8 +92,8 @@ class TestPrivateIngredientsAPI(TestCase):
         )
         serializer1 = IngredientSerializer(ingredient1)
         serializer2 = IngredientSerializer(ingredient2)
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertNotIn(serializer2.data, res.data["results"])
 
     @beartype
     def test_retrieve_ingredients_assigned_unique(self) -> None:
@@ -113,4 +113,19 @@ class TestPrivateIngredientsAPI(TestCase):
         res = cast(
             Response, self.client.get(INGREDIENTS_URL, {"assigned_only": 1})
         )
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data["results"]), 1)
+
+    @beartype
+    def test_retrieve_ingredients_with_counts(self) -> None:
+        ingredient1 = Ingredient.objects.create(user=self.user, name="Eggs")
+        ingredient2 = Ingredient.objects.create(user=self.user, name="Flour")
+        recipe = Recipe.objects.create(
+            user=self.user, title="Pancakes", time_minutes=5, price=3.00
+        )
+        recipe.ingredients.add(ingredient1, ingredient2)
+        res = cast(
+            Response, self.client.get(INGREDIENTS_URL, {"with_counts": 1})
+        )
+        self.assertEqual(
+            [item["recipe_count"] for item in res.data["results"]], [1, 1]
+        )
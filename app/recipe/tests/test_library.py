@@ -0,0 +1,287 @@
+from decimal import Decimal
+from gc import collect
+from typing import Any
+from typing import cast
+from warnings import catch_warnings
+from warnings import simplefilter
+
+import orjson
+from app.asgi import application as asgi_application
+from asgiref.sync import async_to_sync
+from beartype import beartype
+from core.models import Ingredient
+from core.models import Recipe
+from core.models import Tag
+from core.models import User
+from core.models import UserManager
+from django.contrib.auth import get_user_model
+from django.http.response import StreamingHttpResponse
+from django.test import TestCase
+from django.test import TransactionTestCase
+from django.test.utils import override_settings
+from django.urls import reverse
+from recipe.library import LIBRARY_MEDIA_TYPE
+from rest_framework.authtoken.models import Token
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_201_CREATED
+from rest_framework.status import HTTP_400_BAD_REQUEST
+from rest_framework.status import HTTP_415_UNSUPPORTED_MEDIA_TYPE
+from rest_framework.test import APIClient
+from user.authentication import get_token_cache
+
+
+EXPORT_URL = reverse("recipe:library-export")
+IMPORT_URL = reverse("recipe:library-import")
+RECIPES_URL = reverse("recipe:recipe-list")
+
+
+@beartype
+def _create_user(email: str) -> User:
+    return cast(UserManager, get_user_model().objects).create_user(
+        email=email, password="password"
+    )
+
+
+@beartype
+def _lines(*items: dict[str, Any]) -> bytes:
+    return b"".join(orjson.dumps(item) + b"\n" for item in items)
+
+
+class TestLibrary(TestCase):
+    @beartype
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = _create_user("test@example.com")
+        self.client.force_authenticate(self.user)
+
+    @beartype
+    def _export(self) -> list[dict[str, Any]]:
+        res = cast(StreamingHttpResponse, self.client.get(EXPORT_URL))
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual(res["Content-Type"], LIBRARY_MEDIA_TYPE)
+        content = b"".join(res.streaming_content)
+        return [orjson.loads(line) for line in content.splitlines()]
+
+    @beartype
+    def _import(self, content: bytes) -> Any:
+        return self.client.post(
+            IMPORT_URL, content, content_type=LIBRARY_MEDIA_TYPE
+        )
+
+    @beartype
+    def test_export(self) -> None:
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        ingredient = Ingredient.objects.create(user=self.user, name="Salt")
+        recipe = Recipe.objects.create(
+            user=self.user, title="Soup", time_minutes=5, price=Decimal("4.50")
+        )
+        recipe.tags.add(tag)
+        recipe.ingredients.add(ingredient)
+        other = _create_user("other@example.com")
+        _ = Tag.objects.create(user=other, name="Other")
+        self.assertEqual(
+            self._export(),
+            [
+                {"type": "tag", "id": tag.id, "name": "Vegan"},
+                {"type": "ingredient", "id": ingredient.id, "name": "Salt"},
+                {
+                    "type": "recipe",
+                    "id": recipe.id,
+                    "title": "Soup",
+                    "ingredients": [ingredient.id],
+                    "tags": [tag.id],
+                    "time_minutes": 5,
+                    "price": "4.50",
+                    "link": "",
+                },
+            ],
+        )
+
+    @beartype
+    def test_round_trip(self) -> None:
+        tags = Tag.objects.bulk_create(
+            Tag(user=self.user, name=name) for name in ["Vegan", "Quick"]
+        )
+        ingredient = Ingredient.objects.create(user=self.user, name="Salt")
+        for i in range(3):
+            recipe = Recipe.objects.create(
+                user=self.user, title=f"Soup {i}", time_minutes=i, price=1
+            )
+            recipe.tags.add(*tags[: i + 1])
+            recipe.ingredients.add(ingredient)
+        exported = self._export()
+        self.client.force_authenticate(_create_user("other@example.com"))
+        res = self._import(_lines(*exported))
+        self.assertEqual(res.status_code, HTTP_201_CREATED)
+        self.assertEqual(res.data, {"tag": 2, "ingredient": 1, "recipe": 3})
+        imported = self._export()
+        self.assertEqual(
+            [_without_ids(item) for item in imported],
+            [_without_ids(item) for item in exported],
+        )
+        # the relations point at the new tags, not the exported ones
+        names = {
+            item["id"]: item["name"]
+            for item in imported
+            if item["type"] == "tag"
+        }
+        self.assertEqual(
+            [
+                sorted(names[id_] for id_ in item["tags"])
+                for item in imported
+                if item["type"] == "recipe"
+            ],
+            [["Vegan"], ["Quick", "Vegan"], ["Quick", "Vegan"]],
+        )
+        res = self.client.get(RECIPES_URL, {"search": "soup"})
+        self.assertEqual(len(res.data["results"]), 3)
+
+    @beartype
+    def test_import_rolled_back_on_invalid_line(self) -> None:
+        for content, error in [
+            (
+                _lines(
+                    {"type": "tag", "id": 1, "name": "Vegan"},
+                    {
+                        "type": "recipe",
+                        "title": "Soup",
+                        "time_minutes": 5,
+                        "price": "4.50",
+                        "tags": [2],
+                        "ingredients": [],
+                    },
+                ),
+                {"line 2": {"tags": ["Unknown tag 2."]}},
+            ),
+            (
+                _lines(
+                    {"type": "tag", "id": 1, "name": "Vegan"},
+                    {"type": "tag", "id": 1, "name": "Quick"},
+                ),
+                {"line 2": {"id": ["Duplicate tag 1."]}},
+            ),
+            (
+                _lines({"type": "menu"}),
+                {
+                    "line 1": {
+                        "type": ["Must be one of: tag, ingredient, recipe."]
+                    }
+                },
+            ),
+        ]:
+            with self.assertLogs("django.request", "WARNING"):
+                res = self._import(content)
+            self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+            self.assertEqual(res.data, error)
+        self.assertFalse(Tag.objects.exists())
+
+    @beartype
+    def test_import_invalid_fields(self) -> None:
+        with self.assertLogs("django.request", "WARNING"):
+            res = self._import(
+                _lines({"type": "recipe", "tags": [], "ingredients": []})
+            )
+        self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+        self.assertIn("title", res.data["line 1"])
+
+    @override_settings(LIBRARY_MAX_LINE_BYTES=32)
+    @beartype
+    def test_import_line_too_long(self) -> None:
+        with self.assertLogs("django.request", "WARNING"):
+            res = self._import(
+                _lines({"type": "tag", "id": 1, "name": "x" * 32})
+            )
+        self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            res.data, {"line 1": {"line": ["Longer than 32 bytes."]}}
+        )
+
+    @beartype
+    def test_import_requires_ndjson(self) -> None:
+        with self.assertLogs("django.request", "WARNING"):
+            res = self.client.post(IMPORT_URL, {}, format="json")
+        self.assertEqual(res.status_code, HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+
+class TestLibraryExportUnderASGI(TransactionTestCase):
+    # through the ASGI handler itself, which iterates streaming responses on
+    # the event loop; `AsyncClient` iterates them on a thread instead. The
+    # request runs on a thread of its own, so the data must be committed
+
+    @beartype
+    def setUp(self) -> None:
+        get_token_cache().clear()
+        self.user = _create_user("test@example.com")
+        self.token = Token.objects.create(user=self.user)
+
+    @beartype
+    def _get(self, path: str) -> tuple[dict[str, Any], bytes]:
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "query_string": b"",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"authorization", f"Token {self.token.key}".encode()),
+            ],
+            "client": ("127.0.0.1", 0),
+            "server": ("testserver", 80),
+        }
+        messages = []
+
+        @beartype
+        async def receive() -> dict[str, Any]:
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        @beartype
+        async def send(message: dict[str, Any]) -> None:
+            messages.append(message)
+
+        @beartype
+        async def request() -> None:
+            await asgi_application(scope, receive, send)
+
+        async_to_sync(request)()
+        # Django 4.0's handler leaves the request body's spool for the
+        # garbage collector to close
+        with catch_warnings():
+            simplefilter("ignore", ResourceWarning)
+            _ = collect()
+        start, *body = messages
+        return start, b"".join(message.get("body", b"") for message in body)
+
+    @beartype
+    def test_export(self) -> None:
+        tag = Tag.objects.create(user=self.user, name="Vegan")
+        recipe = Recipe.objects.create(
+            user=self.user, title="Soup", time_minutes=5, price=Decimal("4.50")
+        )
+        recipe.tags.add(tag)
+        start, content = self._get(EXPORT_URL)
+        self.assertEqual(start["status"], HTTP_200_OK)
+        headers = dict(start["headers"])
+        self.assertEqual(headers[b"Content-Type"], LIBRARY_MEDIA_TYPE.encode())
+        self.assertEqual(
+            headers[b"Content-Disposition"],
+            b'attachment; filename="library.ndjson"',
+        )
+        self.assertEqual(
+            [
+                (item["type"], item["id"], item.get("tags"))
+                for item in map(orjson.loads, content.splitlines())
+            ],
+            [("tag", tag.id, None), ("recipe", recipe.id, [tag.id])],
+        )
+
+
+@beartype
+def _without_ids(item: dict[str, Any]) -> dict[str, Any]:
+    return {
+        key: value
+        for key, value in item.items()
+        if key not in {"id", "tags", "ingredients"}
+    }
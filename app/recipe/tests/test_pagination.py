@@ -0,0 +1,119 @@
+from typing import Any
+from typing import cast
+
+from beartype import beartype
+from core.models import Recipe
+from core.models import Tag
+from core.models import UserManager
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.response import Response
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_404_NOT_FOUND
+from rest_framework.test import APIClient
+
+
+RECIPES_URL = reverse("recipe:recipe-list")
+TAGS_URL = reverse("recipe:tag-list")
+
+
+class TestKeysetPagination(TestCase):
+    @beartype
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = cast(UserManager, get_user_model().objects).create_user(
+            email="test@example.com", password="password"
+        )
+        self.client.force_authenticate(self.user)
+
+    @beartype
+    def _collect(
+        self, url: str, params: dict[str, Any]
+    ) -> tuple[list[int], list[Response]]:
+        ids: list[int] = []
+        pages: list[Response] = []
+        next_url: str | None = url
+        while next_url is not None:
+            res = cast(Response, self.client.get(next_url, params))
+            self.assertEqual(res.status_code, HTTP_200_OK)
+            ids.extend(item["id"] for item in res.data["results"])
+            pages.append(res)
+            next_url, params = res.data["next"], {}
+        return ids, pages
+
+    @beartype
+    def test_tags_paged_with_duplicate_names(self) -> None:
+        for name in ["Vegan", "Dessert", "Vegan", "Lunch", "Vegan", "Dessert"]:
+            _ = Tag.objects.create(user=self.user, name=name)
+        ids, pages = self._collect(TAGS_URL, {"page_size": 2})
+        expected = Tag.objects.order_by("-name", "-id").values_list(
+            "id", flat=True
+        )
+        self.assertEqual(ids, list(expected))
+        self.assertEqual(len(pages), 3)
+        self.assertIsNone(pages[0].data["previous"])
+
+    @beartype
+    def test_recipes_paged_newest_first(self) -> None:
+        recipes = Recipe.objects.bulk_create(
+            Recipe(user=self.user, title=f"Recipe {i}", time_minutes=i, price=1)
+            for i in range(5)
+        )
+        ids, _ = self._collect(RECIPES_URL, {"page_size": 2})
+        self.assertEqual(ids, [recipe.pk for recipe in reversed(recipes)])
+
+    @beartype
+    def test_recipes_filtered_by_tags_without_duplicates(self) -> None:
+        tag1 = Tag.objects.create(user=self.user, name="Vegan")
+        tag2 = Tag.objects.create(user=self.user, name="Dessert")
+        for i in range(5):
+            recipe = Recipe.objects.create(
+                user=self.user, title=f"Recipe {i}", time_minutes=i, price=1.00
+            )
+            recipe.tags.add(tag1, tag2)
+        ids, _ = self._collect(
+            RECIPES_URL, {"page_size": 2, "tags": f"{tag1.pk},{tag2.pk}"}
+        )
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(len(set(ids)), 5)
+
+    @beartype
+    def test_previous_link(self) -> None:
+        for i in range(5):
+            _ = Tag.objects.create(user=self.user, name=f"Tag {i}")
+        _, pages = self._collect(TAGS_URL, {"page_size": 2})
+        res = cast(Response, self.client.get(pages[2].data["previous"]))
+        self.assertEqual(res.data["results"], pages[1].data["results"])
+        self.assertEqual(res.data["next"], pages[1].data["next"])
+
+    @beartype
+    def test_no_offset_in_queries(self) -> None:
+        for i in range(5):
+            _ = Tag.objects.create(user=self.user, name=f"Tag {i}")
+        _, pages = self._collect(TAGS_URL, {"page_size": 2})
+        with CaptureQueriesContext(connection) as context:
+            _ = self.client.get(pages[1].data["next"])
+        for query in context.captured_queries:
+            self.assertNotIn("OFFSET", query["sql"])
+
+    @beartype
+    @override_settings(MAX_PAGE_SIZE=3)
+    def test_page_size_capped(self) -> None:
+        for i in range(5):
+            _ = Tag.objects.create(user=self.user, name=f"Tag {i}")
+        res = cast(Response, self.client.get(TAGS_URL, {"page_size": 100}))
+        self.assertEqual(len(res.data["results"]), 3)
+
+    @beartype
+    def test_invalid_cursor(self) -> None:
+        for cursor in [
+            "garbage",
+            "eyJwIjogWyJ4Il0sICJyIjogZmFsc2V9",
+            "eyJwIjogWyJ4IiwgInkiXSwgInIiOiBmYWxzZX0=",
+        ]:
+            res = self.client.get(TAGS_URL, {"cursor": cursor})
+            self.assertEqual(res.status_code, HTTP_404_NOT_FOUND)
@@ -0,0 +1,302 @@
+from typing import cast
+
+from beartype import beartype
+from core.models import Ingredient
+from core.models import Recipe
+from core.models import Tag
+from core.models import User
+from core.models import UserManager
+from core.query_budget import assert_query_budget
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from hypothesis import given
+from hypothesis.extra.django import TestCase
+from hypothesis.strategies import integers
+from recipe.views import IngredientViewSet
+from recipe.views import RecipeViewSet
+from recipe.views import TagViewSet
+from rest_framework.response import Response
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_201_CREATED
+from rest_framework.status import HTTP_204_NO_CONTENT
+from rest_framework.test import APIClient
+
+
+RECIPES_URL = reverse("recipe:recipe-list")
+TAGS_URL = reverse("recipe:tag-list")
+INGREDIENTS_URL = reverse("recipe:ingredient-list")
+BULK_URL = reverse("recipe:recipe-bulk-create")
+BATCH_URL = reverse("recipe:recipe-batch")
+
+
+@beartype
+def detail_url(pk: int) -> str:
+    return reverse("recipe:recipe-detail", args=[pk])
+
+
+@beartype
+def populate(
+    user: User, *, num_recipes: int, num_tags: int, num_ingredients: int
+) -> tuple[list[Recipe], list[Tag], list[Ingredient]]:
+    tags = Tag.objects.bulk_create(
+        Tag(user=user, name=f"Tag {i}") for i in range(num_tags)
+    )
+    ingredients = Ingredient.objects.bulk_create(
+        Ingredient(user=user, name=f"Ingredient {i}")
+        for i in range(num_ingredients)
+    )
+    recipes = Recipe.objects.bulk_create(
+        Recipe(user=user, title=f"Recipe {i}", time_minutes=i, price=1.00)
+        for i in range(num_recipes)
+    )
+    for recipe in recipes:
+        recipe.tags.add(*tags)
+        recipe.ingredients.add(*ingredients)
+    return recipes, tags, ingredients
+
+
+class TestQueryBudgets(TestCase):
+    @beartype
+    def setup_example(self) -> None:
+        super().setup_example()
+        self.client = APIClient()
+        self.user = cast(UserManager, get_user_model().objects).create_user(
+            email="test@example.com", password="password"
+        )
+        self.client.force_authenticate(self.user)
+
+    @given(
+        num_recipes=integers(0, 10),
+        num_tags=integers(0, 5),
+        num_ingredients=integers(0, 5),
+    )
+    def test_recipe_list(
+        self, num_recipes: int, num_tags: int, num_ingredients: int
+    ) -> None:
+        _ = populate(
+            self.user,
+            num_recipes=num_recipes,
+            num_tags=num_tags,
+            num_ingredients=num_ingredients,
+        )
+        for params in [{}, {"expand": "tags,ingredients"}]:
+            with assert_query_budget(RecipeViewSet, "list"):
+                res = cast(Response, self.client.get(RECIPES_URL, params))
+            self.assertEqual(res.status_code, HTTP_200_OK)
+
+    @given(
+        num_recipes=integers(0, 5),
+        num_tags=integers(0, 5),
+        num_ingredients=integers(0, 5),
+    )
+    def test_recipe_batch(
+        self, num_recipes: int, num_tags: int, num_ingredients: int
+    ) -> None:
+        recipes, _, _ = populate(
+            self.user,
+            num_recipes=num_recipes,
+            num_tags=num_tags,
+            num_ingredients=num_ingredients,
+        )
+        ids = ",".join(str(recipe.pk) for recipe in recipes) or "0"
+        with assert_query_budget(RecipeViewSet, "batch"):
+            res = cast(Response, self.client.get(BATCH_URL, {"ids": ids}))
+        self.assertEqual(res.status_code, HTTP_200_OK)
+
+    @given(num_tags=integers(0, 5), num_ingredients=integers(0, 5))
+    def test_recipe_retrieve(self, num_tags: int, num_ingredients: int) -> None:
+        (recipe,), _, _ = populate(
+            self.user,
+            num_recipes=1,
+            num_tags=num_tags,
+            num_ingredients=num_ingredients,
+        )
+        with assert_query_budget(RecipeViewSet, "retrieve"):
+            res = cast(Response, self.client.get(detail_url(recipe.pk)))
+        self.assertEqual(res.status_code, HTTP_200_OK)
+
+    @given(num_tags=integers(0, 5), num_ingredients=integers(0, 5))
+    def test_recipe_create(self, num_tags: int, num_ingredients: int) -> None:
+        _, tags, ingredients = populate(
+            self.user,
+            num_recipes=0,
+            num_tags=num_tags,
+            num_ingredients=num_ingredients,
+        )
+        payload = {
+            "title": "Sample recipe",
+            "time_minutes": 10,
+            "price": 5.00,
+            "tags": [tag.pk for tag in tags],
+            "ingredients": [ingredient.pk for ingredient in ingredients],
+        }
+        with assert_query_budget(RecipeViewSet, "create"):
+            res = self.client.post(RECIPES_URL, payload, format="json")
+        self.assertEqual(res.status_code, HTTP_201_CREATED)
+
+    @given(
+        num_tags=integers(0, 5),
+        num_ingredients=integers(0, 5),
+        num_kept=integers(0, 5),
+    )
+    def test_recipe_update(
+        self, num_tags: int, num_ingredients: int, num_kept: int
+    ) -> None:
+        (recipe,), tags, ingredients = populate(
+            self.user,
+            num_recipes=1,
+            num_tags=num_tags,
+            num_ingredients=num_ingredients,
+        )
+        new_tags = Tag.objects.bulk_create(
+            Tag(user=self.user, name=f"New tag {i}") for i in range(num_tags)
+        )
+        new_ingredients = Ingredient.objects.bulk_create(
+            Ingredient(user=self.user, name=f"New ingredient {i}")
+            for i in range(num_ingredients)
+        )
+        payload = {
+            "title": "Updated recipe",
+            "time_minutes": 20,
+            "price": 7.00,
+            "tags": [tag.pk for tag in tags[:num_kept] + new_tags],
+            "ingredients": [
+                ingredient.pk
+                for ingredient in ingredients[:num_kept] + new_ingredients
+            ],
+        }
+        with assert_query_budget(RecipeViewSet, "update"):
+            res = self.client.put(detail_url(recipe.pk), payload, format="json")
+        self.assertEqual(res.status_code, HTTP_200_OK)
+
+    @given(num_tags=integers(0, 5), num_kept=integers(0, 5))
+    def test_recipe_partial_update(self, num_tags: int, num_kept: int) -> None:
+        (recipe,), tags, _ = populate(
+            self.user, num_recipes=1, num_tags=num_tags, num_ingredients=0
+        )
+        payload = {
+            "title": "Updated recipe",
+            "tags": [tag.pk for tag in tags][:num_kept],
+        }
+        with assert_query_budget(RecipeViewSet, "partial_update"):
+            res = self.client.patch(
+                detail_url(recipe.pk), payload, format="json"
+            )
+        self.assertEqual(res.status_code, HTTP_200_OK)
+
+    @given(num_tags=integers(0, 5), num_ingredients=integers(0, 5))
+    def test_recipe_destroy(self, num_tags: int, num_ingredients: int) -> None:
+        (recipe,), _, _ = populate(
+            self.user,
+            num_recipes=1,
+            num_tags=num_tags,
+            num_ingredients=num_ingredients,
+        )
+        with assert_query_budget(RecipeViewSet, "destroy"):
+            res = self.client.delete(detail_url(recipe.pk))
+        self.assertEqual(res.status_code, HTTP_204_NO_CONTENT)
+
+    @given(
+        num_recipes=integers(1, 10),
+        num_tags=integers(0, 5),
+        num_ingredients=integers(0, 5),
+    )
+    def test_recipe_bulk_create(
+        self, num_recipes: int, num_tags: int, num_ingredients: int
+    ) -> None:
+        _, tags, ingredients = populate(
+            self.user,
+            num_recipes=0,
+            num_tags=num_tags,
+            num_ingredients=num_ingredients,
+        )
+        payload = [
+            {
+                "title": f"Recipe {i}",
+                "time_minutes": 10,
+                "price": 5.00,
+                "tags": [tag.pk for tag in tags],
+                "ingredients": [ingredient.pk for ingredient in ingredients],
+            }
+            for i in range(num_recipes)
+        ]
+        with assert_query_budget(RecipeViewSet, "bulk_create"):
+            res = self.client.post(BULK_URL, payload, format="json")
+        self.assertEqual(res.status_code, HTTP_201_CREATED)
+
+    @given(
+        num_recipes=integers(1, 10),
+        num_tags=integers(0, 5),
+        num_ingredients=integers(0, 5),
+    )
+    def test_recipe_bulk_update(
+        self, num_recipes: int, num_tags: int, num_ingredients: int
+    ) -> None:
+        recipes, tags, ingredients = populate(
+            self.user,
+            num_recipes=num_recipes,
+            num_tags=num_tags,
+            num_ingredients=num_ingredients,
+        )
+        payload = [
+            {
+                "id": recipe.pk,
+                "title": f"Updated recipe {i}",
+                "price": 7.00,
+                "tags": [tag.pk for tag in (tags[1:] if i % 2 else tags)],
+                "ingredients": [ingredient.pk for ingredient in ingredients],
+            }
+            for i, recipe in enumerate(recipes)
+        ]
+        with assert_query_budget(RecipeViewSet, "bulk_update"):
+            res = self.client.patch(BULK_URL, payload, format="json")
+        self.assertEqual(res.status_code, HTTP_200_OK)
+
+    @given(num_recipes=integers(0, 10), num_tags=integers(0, 5))
+    def test_tag_list(self, num_recipes: int, num_tags: int) -> None:
+        _ = populate(
+            self.user,
+            num_recipes=num_recipes,
+            num_tags=num_tags,
+            num_ingredients=0,
+        )
+        for params in [{}, {"assigned_only": 1}, {"with_counts": 1}]:
+            with assert_query_budget(TagViewSet, "list"):
+                res = cast(Response, self.client.get(TAGS_URL, params))
+            self.assertEqual(res.status_code, HTTP_200_OK)
+
+    @given(num_recipes=integers(0, 10), num_ingredients=integers(0, 5))
+    def test_ingredient_list(
+        self, num_recipes: int, num_ingredients: int
+    ) -> None:
+        _ = populate(
+            self.user,
+            num_recipes=num_recipes,
+            num_tags=0,
+            num_ingredients=num_ingredients,
+        )
+        for params in [{}, {"assigned_only": 1}, {"with_counts": 1}]:
+            with assert_query_budget(IngredientViewSet, "list"):
+                res = cast(Response, self.client.get(INGREDIENTS_URL, params))
+            self.assertEqual(res.status_code, HTTP_200_OK)
+
+    @given(num_tags=integers(0, 5))
+    def test_tag_create(self, num_tags: int) -> None:
+        _ = populate(
+            self.user, num_recipes=0, num_tags=num_tags, num_ingredients=0
+        )
+        with assert_query_budget(TagViewSet, "create"):
+            res = self.client.post(TAGS_URL, {"name": "Vegan"})
+        self.assertEqual(res.status_code, HTTP_201_CREATED)
+
+    @given(num_ingredients=integers(0, 5))
+    def test_ingredient_create(self, num_ingredients: int) -> None:
+        _ = populate(
+            self.user,
+            num_recipes=0,
+            num_tags=0,
+            num_ingredients=num_ingredients,
+        )
+        with assert_query_budget(IngredientViewSet, "create"):
+            res = self.client.post(INGREDIENTS_URL, {"name": "Salt"})
+        self.assertEqual(res.status_code, HTTP_201_CREATED)
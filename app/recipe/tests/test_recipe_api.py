@@ -1,22 +1,35 @@
+from decimal import Decimal
+from io import StringIO
 from pathlib import Path
 from tempfile import NamedTemporaryFile
+from typing import Any
 from typing import cast
+from unittest.mock import patch
 
 from PIL import Image
 from beartype import beartype
+from core.models import ImageStatus
 from core.models import Ingredient
 from core.models import Recipe
 from core.models import Tag
 from core.models import User
 from core.models import UserManager
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.test.utils import override_settings
 from django.urls import reverse
+from recipe.images import get_storage
+from recipe.images import process_image
 from recipe.serializers import RecipeDetailSerializer
 from recipe.serializers import RecipeSerializer
 from rest_framework.response import Response
 from rest_framework.status import HTTP_200_OK
 from rest_framework.status import HTTP_201_CREATED
+from rest_framework.status import HTTP_202_ACCEPTED
 from rest_framework.status import HTTP_400_BAD_REQUEST
 from rest_framework.status import HTTP_401_UNAUTHORIZED
 from rest_framework.test import APIClient
@@ -24,6 +37,9 @@ from rest_framework.test import APIClient
 
 RECIPES_URL = reverse("recipe:recipe-list")
 # /api/recipe/recipes/
+BULK_URL = reverse("recipe:recipe-bulk-create")
+BATCH_URL = reverse("recipe:recipe-batch")
+# /api/recipe/recipes/bulk/
 
 
 @beartype
@@ -92,7 +108,7 @@ class TestPrivateRecipesAPI(TestCase):
         recipes = Recipe.objects.all().order_by("-id")
         self.assertEqual(res.status_code, HTTP_200_OK)
         serializer = RecipeSerializer(recipes, many=True)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     @beartype
     def test_recipes_limited_to_user(self) -> None:
@@ -103,10 +119,10 @@ class TestPrivateRecipesAPI(TestCase):
         _ = sample_recipe(user=user2, title="Sample recipe 2")
         res = cast(Response, self.client.get(RECIPES_URL))
         self.assertEqual(res.status_code, HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data["results"]), 1)
         recipes = Recipe.objects.filter(user=self.user)
         serializer = RecipeSerializer(recipes, many=True)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     @beartype
     def test_view_recipe_detail(self) -> None:
@@ -167,6 +183,58 @@ class TestPrivateRecipesAPI(TestCase):
         self.assertIn(ingredient1, ingredients)
         self.assertIn(ingredient2, ingredients)
 
+    @beartype
+    def test_create_recipe_with_missing_tag(self) -> None:
+        tag = sample_tag(user=self.user, name="Vegan")
+        payload = {
+            "title": "Avocado lime cheesecake",
+            "tags": [tag.pk, tag.pk + 1],
+            "time_minutes": 60,
+            "price": 20.00,
+        }
+        res = cast(Response, self.client.post(RECIPES_URL, payload))
+        self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+        self.assertIn("tags", res.data)
+        self.assertFalse(Recipe.objects.exists())
+
+    @beartype
+    def test_link_other_users_tags_and_ingredients(self) -> None:
+        user2 = cast(UserManager, get_user_model().objects).create_user(
+            email="other@example.com", password="password"
+        )
+        recipe = sample_recipe(user=self.user)
+        payload = {"title": "Cheesecake", "time_minutes": 60, "price": "20.00"}
+        for field, other in [
+            ("tags", sample_tag(user=user2)),
+            ("ingredients", sample_ingredient(user=user2)),
+        ]:
+            for method, url, data in [
+                ("post", RECIPES_URL, {**payload, field: [other.pk]}),
+                ("post", BULK_URL, [{**payload, field: [other.pk]}]),
+                ("patch", detail_url(recipe.pk), {field: [other.pk]}),
+            ]:
+                res = cast(
+                    Response,
+                    getattr(self.client, method)(url, data, format="json"),
+                )
+                self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+                self.assertIn(field, str(res.data))
+        self.assertEqual(Recipe.objects.get().pk, recipe.pk)
+        self.assertFalse(recipe.tags.exists())
+        self.assertFalse(recipe.ingredients.exists())
+
+    @beartype
+    def test_create_recipe_with_invalid_tag_type(self) -> None:
+        payload = {
+            "title": "Avocado lime cheesecake",
+            "tags": ["vegan"],
+            "time_minutes": 60,
+            "price": 20.00,
+        }
+        res = cast(Response, self.client.post(RECIPES_URL, payload))
+        self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+        self.assertIn("tags", res.data)
+
     @beartype
     def test_partial_update_recipe(self) -> None:
         recipe = sample_recipe(user=self.user)
@@ -211,9 +279,9 @@ class TestPrivateRecipesAPI(TestCase):
         serializer1 = RecipeSerializer(recipe1)
         serializer2 = RecipeSerializer(recipe2)
         serializer3 = RecipeSerializer(recipe3)
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertIn(serializer2.data, res.data["results"])
+        self.assertNotIn(serializer3.data, res.data["results"])
 
     @beartype
     def test_filter_recipes_by_ingredients(self) -> None:
@@ -231,9 +299,420 @@ class TestPrivateRecipesAPI(TestCase):
         serializer1 = RecipeSerializer(recipe1)
         serializer2 = RecipeSerializer(recipe2)
         serializer3 = RecipeSerializer(recipe3)
-        self.assertIn(serializer1.data, res.data)
-        self.assertIn(serializer2.data, res.data)
-        self.assertNotIn(serializer3.data, res.data)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertIn(serializer2.data, res.data["results"])
+        self.assertNotIn(serializer3.data, res.data["results"])
+
+    @beartype
+    def _filter(self, **params: str) -> list[int]:
+        res = cast(Response, self.client.get(RECIPES_URL, params))
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        return [item["id"] for item in res.data["results"]]
+
+    @beartype
+    def test_filter_recipes_matching_any_or_all(self) -> None:
+        vegan = sample_tag(user=self.user, name="Vegan")
+        quick = sample_tag(user=self.user, name="Quick")
+        tofu = sample_ingredient(user=self.user, name="Tofu")
+        both = sample_recipe(user=self.user, title="Tofu stir fry")
+        both.tags.add(vegan, quick)
+        both.ingredients.add(tofu)
+        one = sample_recipe(user=self.user, title="Lentil stew")
+        one.tags.add(vegan)
+        _ = sample_recipe(user=self.user, title="Steak")
+        tags = f"{vegan.pk},{quick.pk}"
+        # recipes matching several ids are listed once
+        self.assertEqual(self._filter(tags=tags), [one.pk, both.pk])
+        self.assertEqual(
+            self._filter(tags=tags, match="any"), [one.pk, both.pk]
+        )
+        self.assertEqual(self._filter(tags=tags, match="all"), [both.pk])
+        self.assertEqual(
+            self._filter(tags=f"{tags},{vegan.pk}", match="all"), [both.pk]
+        )
+        # both lists apply, in the same mode
+        self.assertEqual(
+            self._filter(tags=str(vegan.pk), ingredients=str(tofu.pk)),
+            [both.pk],
+        )
+
+    @beartype
+    def test_filter_recipes_invalid_match(self) -> None:
+        with self.assertLogs("django.request", "WARNING"):
+            res = cast(
+                Response, self.client.get(RECIPES_URL, {"match": "some"})
+            )
+        self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+        self.assertIn("match", res.data)
+
+    @beartype
+    def test_filter_recipes_invalid_ids(self) -> None:
+        for field in ["tags", "ingredients"]:
+            for ids in ["x", "", "1,,2"]:
+                with self.assertLogs("django.request", "WARNING"):
+                    res = cast(
+                        Response, self.client.get(RECIPES_URL, {field: ids})
+                    )
+                self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+                self.assertEqual(
+                    res.data,
+                    {field: ["Must be a comma-separated list of ids."]},
+                )
+
+    @beartype
+    def test_sparse_fields_list(self) -> None:
+        recipe = sample_recipe(user=self.user, title="Soup")
+        recipe.tags.add(sample_tag(user=self.user))
+        for params, expected in [
+            ({"fields": "title,id"}, {"id": recipe.pk, "title": "Soup"}),
+            (
+                {"omit": "tags,ingredients,link,time_minutes"},
+                {"id": recipe.pk, "title": "Soup", "price": "5.00"},
+            ),
+            ({"fields": "id,title", "omit": "id"}, {"title": "Soup"}),
+        ]:
+            with CaptureQueriesContext(connection) as queries:
+                res = cast(Response, self.client.get(RECIPES_URL, params))
+            self.assertEqual(res.status_code, HTTP_200_OK)
+            self.assertEqual(res.data["results"], [expected])
+            # the relations not requested are not aggregated either
+            self.assertNotIn("core_recipe_tags", queries[-1]["sql"])
+
+    @beartype
+    def test_sparse_fields_detail(self) -> None:
+        recipe = sample_recipe(user=self.user, title="Soup")
+        recipe.tags.add(sample_tag(user=self.user, name="Vegan"))
+        url = detail_url(recipe.pk)
+        with CaptureQueriesContext(connection) as queries:
+            res = cast(Response, self.client.get(url, {"fields": "title"}))
+        self.assertEqual(res.data, {"title": "Soup"})
+        # the recipe alone, without the columns not requested
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("image_variants", queries[0]["sql"])
+        res = cast(Response, self.client.get(url, {"fields": "tags"}))
+        self.assertEqual(
+            res.data, {"tags": [{"id": recipe.tags.get().pk, "name": "Vegan"}]}
+        )
+
+    @beartype
+    def test_sparse_fields_unknown(self) -> None:
+        recipe = sample_recipe(user=self.user)
+        for url, params in [
+            (RECIPES_URL, {"fields": "id,secret"}),
+            (RECIPES_URL, {"omit": "image"}),
+            (detail_url(recipe.pk), {"fields": "user"}),
+        ]:
+            with self.assertLogs("django.request", "WARNING"):
+                res = cast(Response, self.client.get(url, params))
+            self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+            self.assertEqual(list(res.data), list(params))
+
+    @beartype
+    def test_expand_list(self) -> None:
+        tags = [
+            sample_tag(user=self.user, name=name) for name in ["Vegan", "Quick"]
+        ]
+        ingredient = sample_ingredient(user=self.user)
+        for title in ["Soup", "Stew"]:
+            recipe = sample_recipe(user=self.user, title=title)
+            recipe.tags.add(*tags)
+            recipe.ingredients.add(ingredient)
+        _ = sample_recipe(user=self.user, title="Plain")
+        with CaptureQueriesContext(connection) as queries:
+            res = cast(
+                Response,
+                self.client.get(RECIPES_URL, {"expand": "tags, ingredients"}),
+            )
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        # nested in the rows, rather than looked up per recipe
+        self.assertEqual(len(queries), 2)
+        for item in res.data["results"]:
+            detail = RecipeDetailSerializer(Recipe.objects.get(pk=item["id"]))
+            for name in ["tags", "ingredients"]:
+                self.assertCountEqual(item[name], detail.data[name])
+        res = cast(
+            Response,
+            self.client.get(
+                RECIPES_URL, {"expand": "tags", "fields": "title,tags"}
+            ),
+        )
+        self.assertEqual(
+            res.data["results"][-1],
+            {
+                "title": "Soup",
+                "tags": [
+                    {"id": tag.pk, "name": tag.name}
+                    for tag in sorted(tags, key=lambda tag: tag.pk)
+                ],
+            },
+        )
+
+    @beartype
+    def test_expand_unknown(self) -> None:
+        with self.assertLogs("django.request", "WARNING"):
+            res = cast(
+                Response, self.client.get(RECIPES_URL, {"expand": "user"})
+            )
+        self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+        self.assertIn("expand", res.data)
+
+    @beartype
+    def test_sparse_fields_ignored_by_writes(self) -> None:
+        res = cast(
+            Response,
+            self.client.post(
+                f"{RECIPES_URL}?fields=title",
+                {
+                    "title": "Soup",
+                    "time_minutes": 5,
+                    "price": "1.00",
+                    "tags": [],
+                    "ingredients": [],
+                },
+                format="json",
+            ),
+        )
+        self.assertEqual(res.status_code, HTTP_201_CREATED)
+        self.assertIn("price", res.data)
+
+
+class TestRecipeSearch(TestCase):
+    @beartype
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = cast(UserManager, get_user_model().objects).create_user(
+            email="test@example.com", password="password"
+        )
+        self.client.force_authenticate(self.user)
+
+    @beartype
+    def _search(self, search: str, **params: Any) -> list[int]:
+        res = cast(
+            Response, self.client.get(RECIPES_URL, {"search": search, **params})
+        )
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        return [item["id"] for item in res.data["results"]]
+
+    @beartype
+    def test_search_by_title(self) -> None:
+        recipe = sample_recipe(user=self.user, title="Thai vegetable curry")
+        _ = sample_recipe(user=self.user, title="Fish and chips")
+        self.assertEqual(self._search("curries"), [recipe.pk])
+
+    @beartype
+    def test_search_by_tag_and_ingredient_names(self) -> None:
+        recipe1 = sample_recipe(user=self.user, title="Aubergine with tahini")
+        recipe2 = sample_recipe(user=self.user, title="Posh beans on toast")
+        recipe1.tags.add(sample_tag(user=self.user, name="Vegetarian"))
+        recipe2.ingredients.add(sample_ingredient(user=self.user, name="Feta"))
+        self.assertEqual(self._search("vegetarian"), [recipe1.pk])
+        self.assertEqual(self._search("feta"), [recipe2.pk])
+
+    @beartype
+    def test_search_ranks_titles_first(self) -> None:
+        recipe1 = sample_recipe(user=self.user, title="Chicken tikka")
+        recipe2 = sample_recipe(user=self.user, title="Chicken curry")
+        recipe1.tags.add(sample_tag(user=self.user, name="Curry"))
+        self.assertEqual(self._search("curry"), [recipe2.pk, recipe1.pk])
+
+    @beartype
+    def test_search_updated_on_writes(self) -> None:
+        recipe = sample_recipe(user=self.user, title="Steak and mushrooms")
+        tag = sample_tag(user=self.user, name="Dinner")
+        recipe.tags.add(tag)
+        tag.name = "Supper"
+        tag.save()
+        self.assertEqual(self._search("supper"), [recipe.pk])
+        tag.delete()
+        self.assertEqual(self._search("supper"), [])
+        _ = self.client.patch(detail_url(recipe.pk), {"title": "Steak pie"})
+        self.assertEqual(self._search("pie"), [recipe.pk])
+
+    @beartype
+    def test_search_with_filters_and_pages(self) -> None:
+        tag = sample_tag(user=self.user, name="Vegan")
+        recipes = [
+            sample_recipe(user=self.user, title=f"Curry {i}") for i in range(5)
+        ]
+        for recipe in recipes[:4]:
+            recipe.tags.add(tag)
+        res = cast(
+            Response,
+            self.client.get(
+                RECIPES_URL, {"search": "curry", "tags": tag.pk, "page_size": 3}
+            ),
+        )
+        ids = [item["id"] for item in res.data["results"]]
+        res = cast(Response, self.client.get(res.data["next"]))
+        ids.extend(item["id"] for item in res.data["results"])
+        self.assertEqual(
+            sorted(ids), sorted(recipe.pk for recipe in recipes[:4])
+        )
+
+    @beartype
+    def test_search_bulk_created(self) -> None:
+        payload = [
+            {
+                "title": "Porridge",
+                "tags": [],
+                "ingredients": [],
+                "time_minutes": 5,
+                "price": 2.00,
+            }
+        ]
+        res = cast(Response, self.client.post(BULK_URL, payload, format="json"))
+        self.assertEqual(self._search("porridge"), [res.data[0]["id"]])
+
+
+class TestBulkRecipeCreate(TestCase):
+    @beartype
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = cast(UserManager, get_user_model().objects).create_user(
+            email="test@example.com", password="password"
+        )
+        self.client.force_authenticate(self.user)
+
+    @beartype
+    def test_bulk_create(self) -> None:
+        tag = sample_tag(user=self.user)
+        ingredient = sample_ingredient(user=self.user)
+        payload = [
+            {
+                "title": "Avocado lime cheesecake",
+                "tags": [tag.pk, tag.pk],
+                "ingredients": [ingredient.pk],
+                "time_minutes": 60,
+                "price": 20.00,
+            },
+            {
+                "title": "Thai prawn red curry",
+                "tags": [],
+                "ingredients": [],
+                "time_minutes": 20,
+                "price": 7.00,
+            },
+        ]
+        res = cast(Response, self.client.post(BULK_URL, payload, format="json"))
+        self.assertEqual(res.status_code, HTTP_201_CREATED)
+        recipes = Recipe.objects.filter(user=self.user).order_by("pk")
+        self.assertEqual(res.data, RecipeSerializer(recipes, many=True).data)
+        self.assertEqual(
+            [recipe.title for recipe in recipes],
+            [item["title"] for item in payload],
+        )
+        self.assertEqual(list(recipes[0].tags.all()), [tag])
+        self.assertEqual(list(recipes[0].ingredients.all()), [ingredient])
+
+    @beartype
+    def test_bulk_create_reports_errors_per_item(self) -> None:
+        tag = sample_tag(user=self.user)
+        payload = [
+            {
+                "title": "Fish and chips",
+                "tags": [],
+                "ingredients": [],
+                "time_minutes": 20,
+                "price": 7.00,
+            },
+            {"title": "", "tags": [], "ingredients": [], "price": 7.00},
+            {
+                "title": "Chicken tikka",
+                "tags": [tag.pk + 1],
+                "ingredients": [],
+                "time_minutes": 20,
+                "price": 7.00,
+            },
+        ]
+        res = cast(Response, self.client.post(BULK_URL, payload, format="json"))
+        self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(res.data), 3)
+        self.assertEqual(res.data[0], {})
+        self.assertIn("title", res.data[1])
+        self.assertIn("tags", res.data[2])
+        self.assertFalse(Recipe.objects.exists())
+
+    @beartype
+    def test_bulk_create_requires_list(self) -> None:
+        payload = {"title": "Fish and chips", "time_minutes": 20, "price": 7.0}
+        res = self.client.post(BULK_URL, payload, format="json")
+        self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+
+    @beartype
+    @override_settings(RECIPE_BULK_MAX_ITEMS=2)
+    def test_bulk_create_max_items(self) -> None:
+        payload = 3 * [{"title": "Porridge", "time_minutes": 5, "price": 2.00}]
+        res = self.client.post(BULK_URL, payload, format="json")
+        self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+        self.assertFalse(Recipe.objects.exists())
+
+    @beartype
+    def test_bulk_update(self) -> None:
+        tags = Tag.objects.bulk_create(
+            Tag(user=self.user, name=name) for name in ["Vegan", "Quick"]
+        )
+        ingredient = sample_ingredient(user=self.user)
+        soup, stew = (sample_recipe(user=self.user) for _ in range(2))
+        soup.tags.add(tags[0])
+        stew.tags.add(*tags)
+        stew.ingredients.add(ingredient)
+        payload = [
+            {"id": stew.pk, "title": "Stew", "tags": [tags[1].pk]},
+            {"id": soup.pk, "price": "1.50", "ingredients": [ingredient.pk]},
+        ]
+        res = cast(
+            Response, self.client.patch(BULK_URL, payload, format="json")
+        )
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        soup.refresh_from_db()
+        stew.refresh_from_db()
+        self.assertEqual(
+            res.data, RecipeSerializer([stew, soup], many=True).data
+        )
+        self.assertEqual((stew.title, stew.price), ("Stew", Decimal("5.00")))
+        self.assertEqual(
+            (soup.title, soup.price), ("Sample recipe", Decimal("1.50"))
+        )
+        self.assertEqual(list(stew.tags.all()), [tags[1]])
+        self.assertEqual(list(stew.ingredients.all()), [ingredient])
+        self.assertEqual(list(soup.tags.all()), [tags[0]])
+        self.assertEqual(list(soup.ingredients.all()), [ingredient])
+
+    @beartype
+    def test_bulk_update_reports_errors_per_item(self) -> None:
+        recipe = sample_recipe(user=self.user)
+        other = sample_recipe(
+            user=cast(UserManager, get_user_model().objects).create_user(
+                email="other@example.com", password="password"
+            )
+        )
+        payload = [
+            {"id": recipe.pk, "title": "Soup"},
+            {"id": other.pk, "title": "Stolen"},
+            {"title": "Nameless"},
+            {"id": recipe.pk + other.pk, "title": "Missing"},
+            {"id": recipe.pk, "price": "x"},
+        ]
+        res = cast(
+            Response, self.client.patch(BULK_URL, payload, format="json")
+        )
+        self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        for errors, field in zip(res.data[1:], ["id", "id", "id", "price"]):
+            self.assertIn(field, errors)
+        recipe.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual((recipe.title, other.title), ("Sample recipe",) * 2)
+
+    @beartype
+    def test_bulk_update_once_per_recipe(self) -> None:
+        recipe = sample_recipe(user=self.user)
+        payload = [
+            {"id": recipe.pk, "title": "Soup"},
+            {"id": recipe.pk, "title": "Stew"},
+        ]
+        res = self.client.patch(BULK_URL, payload, format="json")
+        self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
 
 
 class TestRecipeImageUpload(TestCase):
@@ -248,23 +727,124 @@ class TestRecipeImageUpload(TestCase):
 
     @beartype
     def tearDown(self) -> None:
+        self.recipe.refresh_from_db()
+        storage = get_storage()
+        for path in self.recipe.image_variants.values():
+            storage.delete(path)
         self.recipe.image.delete()
 
     @beartype
-    def test_upload_image_to_recipe(self) -> None:
+    def _upload(self, *, size: tuple[int, int] = (10, 10)) -> Response:
         url = image_upload_url(self.recipe.pk)
         with NamedTemporaryFile(suffix=".jpg") as ntf:
-            img = Image.new("RGB", (10, 10))
+            img = Image.new("RGB", size)
             img.save(ntf, format="JPEG")
             _ = ntf.seek(0)
-            res = cast(
+            return cast(
                 Response,
                 self.client.post(url, {"image": ntf}, format="multipart"),
             )
+
+    @beartype
+    def test_upload_image_to_recipe(self) -> None:
+        with self.captureOnCommitCallbacks() as callbacks:
+            res = self._upload()
         self.recipe.refresh_from_db()
-        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual(res.status_code, HTTP_202_ACCEPTED)
         self.assertIn("image", res.data)
+        self.assertEqual(res.data["image_status"], ImageStatus.PENDING)
+        self.assertEqual(res.data["image_variants"], {})
         self.assertTrue(Path(self.recipe.image.path).exists())
+        # processing the image, invalidating cached responses, and keeping
+        # the user's reads on the primary for the view and for the signal
+        self.assertEqual(len(callbacks), 4)
+
+    @beartype
+    def test_process_image_variants(self) -> None:
+        _ = self._upload(size=(2000, 1000))
+        self.recipe.refresh_from_db()
+        process_image(self.recipe.pk, self.recipe.image.name)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, ImageStatus.READY)
+        storage = get_storage()
+        for variant, size in settings.RECIPE_IMAGE_VARIANTS.items():
+            with storage.open(self.recipe.image_variants[variant]) as file:
+                self.assertEqual(Image.open(file).size, (size, size // 2))
+        res = cast(Response, self.client.get(detail_url(self.recipe.pk)))
+        self.assertEqual(res.data["image_status"], ImageStatus.READY)
+        self.assertEqual(
+            set(res.data["image_variants"]), set(settings.RECIPE_IMAGE_VARIANTS)
+        )
+
+    @beartype
+    def test_process_image_replaced(self) -> None:
+        _ = self._upload()
+        self.recipe.refresh_from_db()
+        name = self.recipe.image.name
+        _ = self._upload()
+        process_image(self.recipe.pk, name)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, ImageStatus.PENDING)
+        self.assertEqual(self.recipe.image_variants, {})
+        get_storage().delete(name)
+
+    @beartype
+    def test_process_image_failed(self) -> None:
+        _ = self._upload()
+        self.recipe.refresh_from_db()
+        with patch(
+            "recipe.images.render_variants", side_effect=OSError
+        ), self.assertLogs("recipe.images", level="ERROR"):
+            process_image(self.recipe.pk, self.recipe.image.name)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, ImageStatus.FAILED)
+
+    @beartype
+    def test_process_image_failed_partway(self) -> None:
+        _ = self._upload()
+        self.recipe.refresh_from_db()
+        storage = get_storage()
+        save, saved = storage.save, []
+
+        @beartype
+        def save_once(name: str, content: Any) -> str:
+            if saved:
+                raise OSError
+            saved.append(save(name, content))
+            return saved[-1]
+
+        with patch.object(
+            storage, "save", side_effect=save_once
+        ), self.assertLogs("recipe.images", level="ERROR"):
+            process_image(self.recipe.pk, self.recipe.image.name)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, ImageStatus.FAILED)
+        # the variant saved before the failure is not left behind
+        self.assertEqual(len(saved), 1)
+        self.assertFalse(storage.exists(saved[0]))
+
+    @beartype
+    def test_sweep_pending_images(self) -> None:
+        # the job queued on commit is lost, as with its process
+        _ = self._upload()
+        out = StringIO()
+        call_command("sweep_recipe_images", stdout=out)
+        self.assertIn("Processed 0 pending images", out.getvalue())
+        call_command("sweep_recipe_images", older_than=0, fail=True, stdout=out)
+        self.assertIn("Failed 1 pending images", out.getvalue())
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, ImageStatus.FAILED)
+        # as queued before the time was recorded
+        _ = Recipe.objects.filter(pk=self.recipe.pk).update(
+            image_status=ImageStatus.PENDING, image_queued_at=None
+        )
+        call_command("sweep_recipe_images", stdout=out)
+        self.assertIn("Processed 1 pending images", out.getvalue())
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, ImageStatus.READY)
+        self.assertEqual(
+            set(self.recipe.image_variants), set(settings.RECIPE_IMAGE_VARIANTS)
+        )
 
     @beartype
     def test_upload_image_bad_request(self) -> None:
@@ -274,3 +854,56 @@ class TestRecipeImageUpload(TestCase):
             self.client.post(url, {"image": "notimage"}, format="multipart"),
         )
         self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+
+
+class TestRecipeBatch(TestCase):
+    @beartype
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = cast(UserManager, get_user_model().objects).create_user(
+            email="test@example.com", password="password"
+        )
+        self.client.force_authenticate(self.user)
+
+    @beartype
+    def _batch(self, ids: list[Any], **params: str) -> Response:
+        return cast(
+            Response,
+            self.client.get(
+                BATCH_URL, {"ids": ",".join(map(str, ids)), **params}
+            ),
+        )
+
+    @beartype
+    def test_batch_in_requested_order(self) -> None:
+        tag = sample_tag(user=self.user)
+        recipes = [
+            sample_recipe(user=self.user, title=f"Recipe {i}") for i in range(3)
+        ]
+        recipes[1].tags.add(tag)
+        other = cast(UserManager, get_user_model().objects).create_user(
+            email="other@example.com", password="password"
+        )
+        foreign = sample_recipe(user=other)
+        ids = [recipes[2].pk, foreign.pk, recipes[0].pk, 0, recipes[1].pk]
+        res = self._batch([*ids, recipes[2].pk])
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual(
+            res.data["results"],
+            [RecipeDetailSerializer(recipes[i]).data for i in [2, 0, 1]],
+        )
+        # other users' recipes are indistinguishable from deleted ones
+        self.assertEqual(res.data["missing"], [foreign.pk, 0])
+        res = self._batch([recipes[0].pk], fields="title")
+        self.assertEqual(res.data["results"], [{"title": "Recipe 0"}])
+
+    @override_settings(RECIPE_BATCH_MAX_IDS=2)
+    @beartype
+    def test_batch_invalid_ids(self) -> None:
+        for ids in [[], ["x"], [1, 2, 3]]:
+            with self.assertLogs("django.request", "WARNING"):
+                res = self._batch(ids)
+            self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+            self.assertIn("ids", res.data)
+        # duplicates count once
+        self.assertEqual(self._batch([1, 2, 2, 1]).status_code, HTTP_200_OK)
@@ -0,0 +1,97 @@
+from decimal import Decimal
+from typing import Any
+from typing import cast
+
+from beartype import beartype
+from core.models import Ingredient
+from core.models import Recipe
+from core.models import Tag
+from core.models import UserManager
+from django.contrib.auth import get_user_model
+from django.db.models import Prefetch
+from django.urls import reverse
+from hypothesis import given
+from hypothesis.extra.django import TestCase
+from hypothesis.strategies import decimals
+from hypothesis.strategies import integers
+from hypothesis.strategies import lists
+from hypothesis.strategies import sets
+from hypothesis.strategies import text
+from hypothesis.strategies import tuples
+from recipe.serializers import RecipeRowSerializer
+from recipe.serializers import RecipeSerializer
+from recipe.serializers import recipe_rows
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+
+
+RECIPES_URL = reverse("recipe:recipe-list")
+
+# title, time in minutes, price, link, and indices of the tags and
+# ingredients linked
+recipe_fields = tuples(
+    text(min_size=1, max_size=255).filter(lambda s: "\x00" not in s),
+    integers(-(2**31), 2**31 - 1),
+    decimals(min_value=-999.99, max_value=999.99, places=2),
+    text(max_size=255).filter(lambda s: "\x00" not in s),
+    sets(integers(0, 2)),
+    sets(integers(0, 2)),
+)
+
+
+class TestRecipeRowSerializer(TestCase):
+    @beartype
+    def setup_example(self) -> None:
+        super().setup_example()
+        self.client = APIClient()
+        self.user = cast(UserManager, get_user_model().objects).create_user(
+            email="test@example.com", password="password"
+        )
+        self.client.force_authenticate(self.user)
+        self.tags = Tag.objects.bulk_create(
+            Tag(user=self.user, name=f"Tag {i}") for i in range(3)
+        )
+        self.ingredients = Ingredient.objects.bulk_create(
+            Ingredient(user=self.user, name=f"Ingredient {i}") for i in range(3)
+        )
+
+    @beartype
+    def _populate(
+        self, fields: list[tuple[str, int, Decimal, str, set[int], set[int]]]
+    ) -> None:
+        for title, time_minutes, price, link, tags, ingredients in fields:
+            recipe = Recipe.objects.create(
+                user=self.user,
+                title=title,
+                time_minutes=time_minutes,
+                price=price,
+                link=link,
+            )
+            recipe.tags.set(self.tags[i] for i in tags)
+            recipe.ingredients.set(self.ingredients[i] for i in ingredients)
+
+    @beartype
+    def _expected(self) -> list[dict[str, Any]]:
+        recipes = Recipe.objects.order_by("-id").prefetch_related(
+            Prefetch("tags", Tag.objects.order_by("id")),
+            Prefetch("ingredients", Ingredient.objects.order_by("id")),
+        )
+        return RecipeSerializer(recipes, many=True).data
+
+    @given(fields=lists(recipe_fields, max_size=5))
+    def test_matches_recipe_serializer(
+        self, fields: list[tuple[str, int, Decimal, str, set[int], set[int]]]
+    ) -> None:
+        self._populate(fields)
+        rows = recipe_rows(Recipe.objects.order_by("-id"))
+        self.assertEqual(
+            RecipeRowSerializer(rows, many=True).data, self._expected()
+        )
+
+    @given(fields=lists(recipe_fields, max_size=5))
+    def test_list_responses_match(
+        self, fields: list[tuple[str, int, Decimal, str, set[int], set[int]]]
+    ) -> None:
+        self._populate(fields)
+        res = cast(Response, self.client.get(RECIPES_URL, {"page_size": 10}))
+        self.assertEqual(res.json()["results"], self._expected())
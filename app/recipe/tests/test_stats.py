@@ -0,0 +1,198 @@
+from decimal import Decimal
+from typing import cast
+
+from beartype import beartype
+from core.models import Ingredient
+from core.models import Recipe
+from core.models import RecipeStats
+from core.models import Tag
+from core.models import User
+from core.models import UserManager
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from django.test import TestCase
+from django.urls import reverse
+from recipe.stats import _median
+from recipe.stats import fresh_stats
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_201_CREATED
+from rest_framework.status import HTTP_401_UNAUTHORIZED
+from rest_framework.test import APIClient
+
+
+STATS_URL = reverse("recipe:stats")
+RECIPES_URL = reverse("recipe:recipe-list")
+BULK_URL = reverse("recipe:recipe-bulk-create")
+
+
+@beartype
+def _create_user(email: str) -> User:
+    return cast(UserManager, get_user_model().objects).create_user(
+        email=email, password="password"
+    )
+
+
+class TestMedian(SimpleTestCase):
+    @beartype
+    def test_median(self) -> None:
+        for times, expected in [
+            ([], None),
+            ([5], 5),
+            ([5, 10], 7.5),
+            ([5, 10, 10], 10),
+            ([1, 2, 3, 4], 2.5),
+            ([30, 1, 1, 1], 1),
+        ]:
+            counts: dict[str, int] = {}
+            for minutes in times:
+                counts[str(minutes)] = counts.get(str(minutes), 0) + 1
+            self.assertEqual(_median(counts, len(times)), expected)
+
+
+class TestRecipeStats(TestCase):
+    @beartype
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = _create_user("test@example.com")
+        self.client.force_authenticate(self.user)
+
+    @beartype
+    def _assert_fresh(self) -> None:
+        stats = RecipeStats.objects.get(user=self.user)
+        for name, value in fresh_stats([self.user.pk])[self.user.pk].items():
+            self.assertEqual(getattr(stats, name), value, name)
+        for model in [Tag, Ingredient]:
+            for item in model.objects.filter(user=self.user):
+                self.assertEqual(
+                    item.recipe_count, item.recipe_set.count(), item.name
+                )
+
+    @beartype
+    def test_requires_auth(self) -> None:
+        with self.assertLogs("django.request", "WARNING"):
+            res = APIClient().get(STATS_URL)
+        self.assertEqual(res.status_code, HTTP_401_UNAUTHORIZED)
+
+    @beartype
+    def test_empty(self) -> None:
+        res = self.client.get(STATS_URL)
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            {
+                "recipe_count": 0,
+                "average_price": None,
+                "total_time_minutes": 0,
+                "median_time_minutes": None,
+                "tags": [],
+                "ingredients": [],
+            },
+        )
+
+    @beartype
+    def test_stats(self) -> None:
+        vegan = Tag.objects.create(user=self.user, name="Vegan")
+        quick = Tag.objects.create(user=self.user, name="Quick")
+        _ = Tag.objects.create(user=self.user, name="Unused")
+        salt = Ingredient.objects.create(user=self.user, name="Salt")
+        for title, minutes, price, tags in [
+            ("Soup", 5, "4.50", [vegan, quick]),
+            ("Stew", 60, "10.00", [vegan]),
+            ("Salad", 10, "2.00", []),
+        ]:
+            recipe = Recipe.objects.create(
+                user=self.user,
+                title=title,
+                time_minutes=minutes,
+                price=Decimal(price),
+            )
+            recipe.tags.add(*tags)
+            recipe.ingredients.add(salt)
+        other = _create_user("other@example.com")
+        _ = Recipe.objects.create(
+            user=other, title="Other", time_minutes=1, price=100
+        )
+        res = self.client.get(STATS_URL)
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual(
+            res.data,
+            {
+                "recipe_count": 3,
+                "average_price": "5.50",
+                "total_time_minutes": 75,
+                "median_time_minutes": 10,
+                "tags": [
+                    {"id": vegan.id, "name": "Vegan", "recipe_count": 2},
+                    {"id": quick.id, "name": "Quick", "recipe_count": 1},
+                ],
+                "ingredients": [
+                    {"id": salt.id, "name": "Salt", "recipe_count": 3}
+                ],
+            },
+        )
+
+    @beartype
+    def test_maintained_through_changes(self) -> None:
+        tags = Tag.objects.bulk_create(
+            Tag(user=self.user, name=name)
+            for name in ["Vegan", "Quick", "Cheap"]
+        )
+        ingredient = Ingredient.objects.create(user=self.user, name="Salt")
+        payload = {
+            "title": "Soup",
+            "time_minutes": 5,
+            "price": "4.50",
+            "tags": [tags[0].id, tags[1].id],
+            "ingredients": [ingredient.id],
+        }
+        res = self.client.post(RECIPES_URL, payload, format="json")
+        self.assertEqual(res.status_code, HTTP_201_CREATED)
+        self._assert_fresh()
+        res = self.client.post(
+            BULK_URL, [{**payload, "time_minutes": 7}] * 2, format="json"
+        )
+        self.assertEqual(res.status_code, HTTP_201_CREATED)
+        self._assert_fresh()
+        recipe = Recipe.objects.get(pk=res.data[0]["id"])
+        res = self.client.patch(
+            BULK_URL,
+            [
+                {
+                    "id": res.data[1]["id"],
+                    "time_minutes": 8,
+                    "tags": [tags[2].id],
+                }
+            ],
+            format="json",
+        )
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self._assert_fresh()
+        detail = reverse("recipe:recipe-detail", args=[recipe.id])
+        res = self.client.patch(
+            detail,
+            {"price": "1.00", "time_minutes": 9, "tags": [tags[2].id]},
+            format="json",
+        )
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self._assert_fresh()
+        recipe.tags.clear()
+        recipe.ingredients.remove(ingredient)
+        self._assert_fresh()
+        tags[0].delete()
+        self._assert_fresh()
+        res = self.client.delete(detail)
+        self._assert_fresh()
+        self.assertEqual(
+            RecipeStats.objects.get(user=self.user).time_counts,
+            {"5": 1, "8": 1},
+        )
+
+    @beartype
+    def test_rebuilt_when_missing(self) -> None:
+        _ = Recipe.objects.create(
+            user=self.user, title="Soup", time_minutes=5, price=1
+        )
+        _ = RecipeStats.objects.filter(user=self.user).delete()
+        res = self.client.get(STATS_URL)
+        self.assertEqual(res.data["recipe_count"], 1)
+        self.assertEqual(res.data["median_time_minutes"], 5)
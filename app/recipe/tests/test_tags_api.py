@@ -47,7 +47,7 @@ class TestPrivateTagsAPI(TestCase):
         tags = Tag.objects.all().order_by("-name")
         serializer = TagSerializer(tags, many=True)
         self.assertEqual(res.status_code, HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     @beartype
     def test_tags_limited_to_user(self) -> None:
@@ -58,10 +58,10 @@ class TestPrivateTagsAPI(TestCase):
         _ = Tag.objects.create(user=user2, name="Fruity")
         res = cast(Response, self.client.get(TAGS_URL))
         self.assertEqual(res.status_code, HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data["results"]), 1)
         tags = Tag.objects.filter(user=self.user)
         serializer = TagSerializer(tags, many=True)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data["results"], serializer.data)
 
     @beartype
     def test_create_tag_successful(self) -> None:
@@ -91,8 +91,8 @@ class TestPrivateTagsAPI(TestCase):
         res = cast(Response, self.client.get(TAGS_URL, {"assigned_only": 1}))
         serializer1 = TagSerializer(tag1)
         serializer2 = TagSerializer(tag2)
-        self.assertIn(serializer1.data, res.data)
-        self.assertNotIn(serializer2.data, res.data)
+        self.assertIn(serializer1.data, res.data["results"])
+        self.assertNotIn(serializer2.data, res.data["results"])
 
     @beartype
     def test_retrieve_tags_assigned_unique(self) -> None:
@@ -107,4 +107,43 @@ class TestPrivateTagsAPI(TestCase):
         recipe1.tags.add(tag)
         recipe2.tags.add(tag)
         res = cast(Response, self.client.get(TAGS_URL, {"assigned_only": 1}))
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data["results"]), 1)
+
+    @beartype
+    def test_retrieve_tags_with_counts(self) -> None:
+        tag1 = Tag.objects.create(user=self.user, name="Breakfast")
+        tag2 = Tag.objects.create(user=self.user, name="Lunch")
+        for title in ["Pancakes", "Porridge"]:
+            recipe = Recipe.objects.create(
+                user=self.user, title=title, time_minutes=5, price=3.00
+            )
+            recipe.tags.add(tag1)
+        res = cast(Response, self.client.get(TAGS_URL, {"with_counts": 1}))
+        self.assertEqual(
+            res.data["results"],
+            [
+                {"id": tag2.id, "name": "Lunch", "recipe_count": 0},
+                {"id": tag1.id, "name": "Breakfast", "recipe_count": 2},
+            ],
+        )
+        res = cast(
+            Response,
+            self.client.get(TAGS_URL, {"with_counts": 1, "assigned_only": 1}),
+        )
+        self.assertEqual(
+            res.data["results"],
+            [{"id": tag1.id, "name": "Breakfast", "recipe_count": 2}],
+        )
+
+    @beartype
+    def test_retrieve_tags_invalid_flags(self) -> None:
+        for flag in ["with_counts", "assigned_only"]:
+            for value in ["", "2", "maybe"]:
+                with self.assertLogs("django.request", "WARNING"):
+                    res = cast(
+                        Response, self.client.get(TAGS_URL, {flag: value})
+                    )
+                self.assertEqual(res.status_code, HTTP_400_BAD_REQUEST)
+                self.assertEqual(res.data, {flag: ["Must be a valid boolean."]})
+        res = cast(Response, self.client.get(TAGS_URL, {"with_counts": "true"}))
+        self.assertEqual(res.status_code, HTTP_200_OK)
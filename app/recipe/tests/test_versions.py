@@ -0,0 +1,138 @@
+from collections.abc import Callable
+from time import time
+from typing import Any
+from typing import cast
+
+from beartype import beartype
+from core.models import Ingredient
+from core.models import Recipe
+from core.models import Tag
+from core.models import UserManager
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import http_date
+from recipe.caching import get_response_cache
+from rest_framework.response import Response
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_304_NOT_MODIFIED
+from rest_framework.test import APIClient
+
+
+RECIPES_URL = reverse("recipe:recipe-list")
+TAGS_URL = reverse("recipe:tag-list")
+INGREDIENTS_URL = reverse("recipe:ingredient-list")
+BULK_URL = reverse("recipe:recipe-bulk-create")
+
+
+class TestConditionalLists(TestCase):
+    @beartype
+    def setUp(self) -> None:
+        self.client = APIClient()
+        self.user = cast(UserManager, get_user_model().objects).create_user(
+            email="test@example.com", password="password"
+        )
+        self.client.force_authenticate(self.user)
+        self.recipe = Recipe.objects.create(
+            user=self.user, title="Toast", time_minutes=2, price=1.00
+        )
+
+    @beartype
+    def _etag_after(self, write: Callable[[], Any]) -> str:
+        _ = write()
+        return self._etag()
+
+    @beartype
+    def _etag(self, url: str = RECIPES_URL) -> str:
+        res = cast(Response, self.client.get(url))
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        return res["ETag"]
+
+    @beartype
+    def test_validators_sent(self) -> None:
+        res = cast(Response, self.client.get(RECIPES_URL))
+        self.assertTrue(res["ETag"].startswith('W/"'))
+        self.assertNotIn("Last-Modified", res)
+        self.assertIn("private", res["Cache-Control"])
+        self.assertIn("no-cache", res["Cache-Control"])
+
+    @beartype
+    def test_not_modified_skips_list_query(self) -> None:
+        for url in [RECIPES_URL, TAGS_URL, INGREDIENTS_URL]:
+            etag = self._etag(url)
+            # skip the cached response, which would answer without querying
+            get_response_cache().clear()
+            with CaptureQueriesContext(connection) as context:
+                res = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(res.status_code, HTTP_304_NOT_MODIFIED)
+            self.assertEqual(res["ETag"], etag)
+            self.assertEqual(len(context), 1)
+            self.assertIn("core_collectionversion", context[0]["sql"])
+
+    @beartype
+    def test_if_modified_since_ignored(self) -> None:
+        # only the version tells writes within the same second apart
+        _ = self._etag()
+        _ = Tag.objects.create(user=self.user, name="Vegan")
+        res = self.client.get(
+            RECIPES_URL, HTTP_IF_MODIFIED_SINCE=http_date(time() + 60)
+        )
+        self.assertEqual(res.status_code, HTTP_200_OK)
+
+    @beartype
+    def test_writes_change_etag(self) -> None:
+        tag = Tag.objects.create(user=self.user, name="Breakfast")
+        writes: list[Callable[[], Any]] = [
+            lambda: self.client.post(TAGS_URL, {"name": "Vegan"}),
+            lambda: self.recipe.tags.add(tag),
+            lambda: tag.recipe_set.clear(),  # type: ignore
+            lambda: self.client.patch(
+                reverse("recipe:recipe-detail", args=[self.recipe.pk]),
+                {"title": "Cheese on toast"},
+            ),
+            lambda: Ingredient.objects.create(
+                user=self.user, name="Cheese"
+            ).delete(),
+            lambda: self.client.post(
+                BULK_URL,
+                [
+                    {
+                        "title": "Porridge",
+                        "tags": [],
+                        "ingredients": [],
+                        "time_minutes": 5,
+                        "price": 2.00,
+                    }
+                ],
+                format="json",
+            ),
+            lambda: self.client.patch(
+                BULK_URL,
+                [{"id": self.recipe.pk, "title": "Beans on toast"}],
+                format="json",
+            ),
+        ]
+        etags = [self._etag(), *(self._etag_after(write) for write in writes)]
+        self.assertEqual(len(set(etags)), len(etags))
+        res = self.client.get(RECIPES_URL, HTTP_IF_NONE_MATCH=etags[0])
+        self.assertEqual(res.status_code, HTTP_200_OK)
+
+    @beartype
+    def test_other_users_writes_keep_etag(self) -> None:
+        etag = self._etag()
+        other = cast(UserManager, get_user_model().objects).create_user(
+            email="other@example.com", password="password"
+        )
+        _ = Tag.objects.create(user=other, name="Vegan")
+        self.assertEqual(self._etag(), etag)
+
+    @beartype
+    def test_user_deleted(self) -> None:
+        _ = self._etag()
+        self.recipe.tags.add(Tag.objects.create(user=self.user, name="Vegan"))
+        _ = self.user.delete()
+        # foreign keys are only checked at commit, which tests never reach
+        connection.check_constraints()
+        self.assertFalse(Recipe.objects.exists())
@@ -1,7 +1,14 @@
+from beartype import beartype
+from core.async_views import AsyncReadRouter
+from django.conf import settings
 from django.urls import include
 from django.urls import path
 from recipe.views import IngredientViewSet
+from recipe.views import LibraryExportView
+from recipe.views import LibraryImportView
+from recipe.views import RecipeStatsView
 from recipe.views import RecipeViewSet
+from recipe.views import ResponseCacheStatsView
 from recipe.views import TagViewSet
 from rest_framework.routers import DefaultRouter
 
@@ -9,8 +16,20 @@ from rest_framework.routers import DefaultRouter
 app_name = "recipe"
 
 
-router = DefaultRouter()
-router.register("tags", TagViewSet)
-router.register("ingredients", IngredientViewSet)
-router.register("recipes", RecipeViewSet)
-urlpatterns = [path("", include(router.urls))]
+@beartype
+def build_router(*, async_reads: bool) -> DefaultRouter:
+    router = AsyncReadRouter() if async_reads else DefaultRouter()
+    router.register("tags", TagViewSet)
+    router.register("ingredients", IngredientViewSet)
+    router.register("recipes", RecipeViewSet)
+    return router
+
+
+router = build_router(async_reads=settings.ASYNC_VIEWS)
+urlpatterns = [
+    path("cache-stats/", ResponseCacheStatsView.as_view(), name="cache-stats"),
+    path("stats/", RecipeStatsView.as_view(), name="stats"),
+    path("library/export/", LibraryExportView.as_view(), name="library-export"),
+    path("library/import/", LibraryImportView.as_view(), name="library-import"),
+    path("", include(router.urls)),
+]
@@ -0,0 +1,88 @@
+from collections.abc import Iterable
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from beartype import beartype
+from core.models import CollectionVersion
+from core.models import User
+from django.db.models import F
+from django.dispatch import Signal
+from django.http.response import HttpResponseBase
+from django.utils.cache import get_conditional_response
+from django.utils.cache import patch_cache_control
+from rest_framework.request import Request
+
+
+_PENDING: ContextVar[set[int] | None] = ContextVar("_PENDING", default=None)
+
+# sent with `user_ids` whenever their collections are written to
+collections_changed = Signal()
+
+
+@beartype
+def get_collection_version(user: User) -> CollectionVersion:
+    # rows are created along with users, but not by `bulk_create`
+    version, _ = CollectionVersion.objects.get_or_create(user=user)
+    return version
+
+
+@beartype
+def bump_versions(user_ids: Iterable[int]) -> None:
+    # a missing row has not been read yet, so no validator can be stale; nor
+    # must one be created for users in the middle of being deleted
+    user_ids = set(user_ids)
+    _ = CollectionVersion.objects.filter(user_id__in=user_ids).update(
+        version=F("version") + 1
+    )
+    _ = collections_changed.send(sender=CollectionVersion, user_ids=user_ids)
+
+
+@beartype
+def mark_changed(user_ids: Iterable[int]) -> None:
+    if (pending := _PENDING.get()) is None:
+        bump_versions(user_ids)
+    else:
+        pending.update(user_ids)
+
+
+@contextmanager
+@beartype
+def batched_version_bumps() -> Iterator[None]:
+    # a write touching a recipe and its relations fires several signals;
+    # collect them and bump each user's version once at the end
+    if _PENDING.get() is not None:
+        yield
+        return
+    pending: set[int] = set()
+    token = _PENDING.set(pending)
+    try:
+        yield
+    finally:
+        _PENDING.reset(token)
+    if pending:
+        bump_versions(pending)
+
+
+class ConditionalListMixin:
+    # list responses carry the user's collection version as a weak ETag, so
+    # that polling clients revalidating with `If-None-Match` get a 304
+    # without the list being queried. There is no Last-Modified: a date has
+    # one second granularity, so `If-Modified-Since` would answer 304 to
+    # clients that last read within the second of a write
+
+    @beartype
+    def list(
+        self, request: Request, *args: Any, **kwargs: Any
+    ) -> HttpResponseBase:
+        # read before the list, so a concurrent write can only make the
+        # validator older than the content, never newer
+        version = get_collection_version(request.user)
+        etag = f'W/"{version.user_id}.{version.version}"'
+        response = get_conditional_response(request._request, etag=etag)
+        if response is None:
+            response = super().list(request, *args, **kwargs)  # type: ignore
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -1,44 +1,115 @@
+from functools import partial
+from io import BytesIO
+from typing import Any
 from typing import cast
 
 from beartype import beartype
+from core.cache import LocalCache
+from core.models import ImageStatus
 from core.models import Ingredient
 from core.models import Recipe
 from core.models import Tag
+from core.models import User
+from core.query_budget import QueryBudgetMixin
+from core.replicas import ReplicaReadMixin
+from core.timing import RequestTimingMixin
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
 from django.db.models.query import QuerySet
+from django.http.response import FileResponse
+from django.http.response import HttpResponseBase
+from django.http.response import StreamingHttpResponse
+from django.utils.timezone import now
+from recipe.caching import RESPONSE_CACHE_STATS
+from recipe.caching import ResponseCacheMixin
+from recipe.caching import get_response_cache
+from recipe.filters import MATCH_MODES
+from recipe.filters import filter_assigned
+from recipe.filters import filter_related
+from recipe.images import schedule_image_processing
+from recipe.library import LIBRARY_MEDIA_TYPE
+from recipe.library import export_library
+from recipe.library import import_library
+from recipe.library import spool_library
+from recipe.search import batched_search_updates
+from recipe.search import search_recipes
+from recipe.serializers import IngredientCountSerializer
 from recipe.serializers import IngredientSerializer
+from recipe.serializers import RecipeBulkUpdateSerializer
 from recipe.serializers import RecipeDetailSerializer
 from recipe.serializers import RecipeImageSerializer
+from recipe.serializers import RecipeRowSerializer
 from recipe.serializers import RecipeSerializer
+from recipe.serializers import TagCountSerializer
 from recipe.serializers import TagSerializer
+from recipe.serializers import recipe_rows
+from recipe.stats import recipe_stats
+from recipe.versions import ConditionalListMixin
+from recipe.versions import batched_version_bumps
 from rest_framework import status
-from rest_framework.authentication import TokenAuthentication
 from rest_framework.decorators import action
+from rest_framework.exceptions import UnsupportedMediaType
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import BooleanField
 from rest_framework.mixins import CreateModelMixin
 from rest_framework.mixins import ListModelMixin
+from rest_framework.permissions import IsAdminUser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework.serializers import BaseSerializer
 from rest_framework.serializers import ModelSerializer
-from rest_framework.serializers import Serializer
+from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet
 from rest_framework.viewsets import ModelViewSet
+from user.authentication import CachedTokenAuthentication
 
 
-class BaseRecipeAttrViewSet(GenericViewSet, ListModelMixin, CreateModelMixin):
-    authentication_classes = [TokenAuthentication]
+# actions rendering whole recipes, as `RecipeDetailSerializer` does
+DETAIL_ACTIONS = {"retrieve", "batch"}
+
+
+class BaseRecipeAttrViewSet(
+    RequestTimingMixin,
+    ReplicaReadMixin,
+    ResponseCacheMixin,
+    ConditionalListMixin,
+    QueryBudgetMixin,
+    GenericViewSet,
+    ListModelMixin,
+    CreateModelMixin,
+):
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    keyset_ordering = ["-name", "-id"]
+    query_budgets = {"list": 2, "create": 2}
+    count_serializer_class: type[BaseSerializer]
+
+    @beartype
+    def _flag(self, name: str) -> bool:
+        # "0" and "1", or any other spelling `BooleanField` accepts
+        try:
+            return BooleanField().to_internal_value(
+                self.request.query_params.get(name, "0")
+            )
+        except ValidationError as error:
+            raise ValidationError({name: error.detail}) from error
 
     @beartype
     def get_queryset(self) -> QuerySet:
-        queryset = cast(QuerySet, self.queryset)
-        assigned_only = bool(
-            int(self.request.query_params.get("assigned_only", "0"))
-        )
-        if assigned_only:
-            queryset = queryset.filter(recipe__isnull=False)
-        return (
-            queryset.filter(user=self.request.user).order_by("-name").distinct()
-        )
+        queryset = cast(QuerySet, self.queryset).filter(user=self.request.user)
+        if self._flag("assigned_only"):
+            queryset = filter_assigned(queryset)
+        return queryset.order_by(*self.keyset_ordering)
+
+    @beartype
+    def get_serializer_class(self) -> type[BaseSerializer]:
+        if self.action == "list" and self._flag("with_counts"):
+            # the `recipe_count` columns maintained by `recipe.stats`, which
+            # replaced counting the links per request
+            return self.count_serializer_class
+        return cast(type[BaseSerializer], self.serializer_class)
 
     @beartype
     def perform_create(self, serializer: ModelSerializer) -> None:  # type: ignore
@@ -48,50 +119,273 @@ class BaseRecipeAttrViewSet(GenericViewSet, ListModelMixin, CreateModelMixin):
 class TagViewSet(BaseRecipeAttrViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
+    count_serializer_class = TagCountSerializer
 
 
 class IngredientViewSet(BaseRecipeAttrViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
+    count_serializer_class = IngredientCountSerializer
 
 
-class RecipeViewSet(ModelViewSet):
-    authentication_classes = [TokenAuthentication]
+class RecipeViewSet(
+    RequestTimingMixin,
+    ReplicaReadMixin,
+    ResponseCacheMixin,
+    ConditionalListMixin,
+    QueryBudgetMixin,
+    ModelViewSet,
+):
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
     queryset = Recipe.objects.all()
     serializer_class = RecipeSerializer
+    keyset_ordering = ["-id"]
+    # writes pay, on top of the rows written, for keeping derived data
+    # current, each a constant number of queries:
+    # - search vectors: an UPDATE, and per relation linked the SELECT of
+    #   existing links that any m2m_changed receiver makes Django run
+    # - collection versions: an UPDATE, which lists read too
+    # - statistics: an UPDATE of the user's totals and, per relation, of the
+    #   link counts, for links added and again for links removed; updates
+    #   also read the totals they replace
+    query_budgets = {
+        "list": 2,
+        "retrieve": 3,
+        "create": 16,
+        "update": 22,
+        "partial_update": 22,
+        "destroy": 8,
+        "bulk_create": 15,
+        "bulk_update": 20,
+        "batch": 3,
+    }
 
     @beartype
     def _params_to_ints(self, qs: str) -> list[int]:
         return list(map(int, qs.split(",")))
 
+    @beartype
+    def _match(self) -> str:
+        # whether recipes need any or all of the tags and ingredients given
+        match = self.request.query_params.get("match", "any")
+        if match not in MATCH_MODES:
+            raise ValidationError(
+                {"match": [f"Must be one of: {', '.join(MATCH_MODES)}."]}
+            )
+        return match
+
+    @beartype
+    def _sparse_fields(self) -> list[str] | None:
+        # those named by `fields` (or all), less those named by `omit`; None
+        # when neither is given. Only reads are trimmed, as writes validate
+        # every field
+        params = self.request.query_params
+        if self.action not in {"list", *DETAIL_ACTIONS} or not (
+            {"fields", "omit"} & set(params)
+        ):
+            return None
+        available = (
+            RecipeDetailSerializer
+            if self.action in DETAIL_ACTIONS
+            else RecipeSerializer
+        ).Meta.fields
+        named = {
+            key: {name.strip() for name in params[key].split(",")} - {""}
+            for key in ["fields", "omit"]
+            if key in params
+        }
+        for key, names in named.items():
+            if unknown := names - set(available):
+                raise ValidationError(
+                    {key: [f"Unknown fields: {', '.join(sorted(unknown))}."]}
+                )
+        return [
+            name
+            for name in available
+            if name in named.get("fields", available)
+            and name not in named.get("omit", ())
+        ]
+
+    @beartype
+    def _expand(self) -> list[str]:
+        # the relations whose objects list rows nest, rather than their ids
+        params = self.request.query_params
+        if self.action != "list" or "expand" not in params:
+            return []
+        names = {name.strip() for name in params["expand"].split(",")} - {""}
+        relations = [field.name for field in Recipe._meta.many_to_many]
+        if unknown := names - set(relations):
+            raise ValidationError(
+                {
+                    "expand": [
+                        f"Unknown relations: {', '.join(sorted(unknown))}."
+                    ]
+                }
+            )
+        return [name for name in relations if name in names]
+
+    @beartype
+    def _id_param(self, name: str) -> list[int]:
+        try:
+            return self._params_to_ints(self.request.query_params.get(name, ""))
+        except ValueError as error:
+            raise ValidationError(
+                {name: ["Must be a comma-separated list of ids."]}
+            ) from error
+
+    @beartype
+    def _batch_ids(self) -> list[int]:
+        # distinct, in the order requested
+        ids = list(dict.fromkeys(self._id_param("ids")))
+        if len(ids) > settings.RECIPE_BATCH_MAX_IDS:
+            raise ValidationError(
+                {"ids": [f"At most {settings.RECIPE_BATCH_MAX_IDS} ids."]}
+            )
+        return ids
+
+    @beartype
+    def _search_text(self) -> str:
+        return self.request.query_params.get("search", "").strip()
+
+    @beartype
+    def get_keyset_ordering(self) -> list[str]:
+        if self._search_text():
+            return ["-rank", *self.keyset_ordering]
+        return self.keyset_ordering
+
     @beartype
     def get_queryset(self) -> QuerySet:
         query_set = cast(QuerySet, self.queryset).filter(user=self.request.user)
-        if (tags := self.request.query_params.get("tags")) is not None:
-            query_set = query_set.filter(
-                tags__id__in=self._params_to_ints(tags)
-            )
-        if (
-            ingredients := self.request.query_params.get("ingredients")
-        ) is not None:
-            query_set = query_set.filter(
-                ingredients__id__in=self._params_to_ints(ingredients)
+        if search := self._search_text():
+            query_set = search_recipes(query_set, search)
+        query_set = query_set.order_by(*self.get_keyset_ordering())
+        # semi-joins on the through tables rather than joins, so that a
+        # recipe matching several ids is still returned exactly once
+        match_all = self._match() == "all"
+        for field in ["tags", "ingredients"]:
+            if field in self.request.query_params:
+                query_set = filter_related(
+                    query_set, field, self._id_param(field), match_all=match_all
+                )
+        if self.action == "list":
+            # rendered from rows by `RecipeRowSerializer`, which also needs
+            # the keys paged on
+            ordering = [
+                field.lstrip("-") for field in self.get_keyset_ordering()
+            ]
+            return recipe_rows(
+                query_set,
+                *ordering,
+                fields=self._sparse_fields(),
+                expand=self._expand(),
             )
+        if self.action in DETAIL_ACTIONS:
+            if (fields := self._sparse_fields()) is None:
+                return query_set.prefetch_related("tags", "ingredients")
+            # the relations not requested are not even prefetched
+            relations = {field.name for field in Recipe._meta.many_to_many}
+            query_set = query_set.prefetch_related(
+                *[name for name in fields if name in relations]
+            ).only("id", *[name for name in fields if name not in relations])
         return query_set
 
     @beartype
-    def get_serializer_class(self) -> type[Serializer]:
-        if self.action == "retrieve":
+    def retrieve(
+        self, request: Request, *args: Any, **kwargs: Any
+    ) -> HttpResponseBase:
+        return self.cached_response(
+            request, partial(super().retrieve, request, *args, **kwargs)
+        )
+
+    @beartype
+    def get_serializer_class(self) -> type[BaseSerializer]:
+        if self.action == "list":
+            return RecipeRowSerializer
+        elif self.action in DETAIL_ACTIONS:
             return RecipeDetailSerializer
         elif self.action == "upload_image":
             return RecipeImageSerializer
+        elif self.action == "bulk_update":
+            return RecipeBulkUpdateSerializer
         else:
-            return cast(type[Serializer], self.serializer_class)
+            return cast(type[BaseSerializer], self.serializer_class)
+
+    @beartype
+    def get_serializer(self, *args: Any, **kwargs: Any) -> BaseSerializer:
+        if (fields := self._sparse_fields()) is not None:
+            kwargs["fields"] = fields
+        if expand := self._expand():
+            kwargs["expand"] = expand
+        return super().get_serializer(*args, **kwargs)
 
     @beartype
     def perform_create(self, serializer: RecipeSerializer) -> None:  # type: ignore
-        _ = serializer.save(user=self.request.user)
+        with batched_search_updates(), batched_version_bumps():
+            _ = serializer.save(user=self.request.user)
+
+    @beartype
+    def perform_update(self, serializer: RecipeSerializer) -> None:  # type: ignore
+        with batched_search_updates(), batched_version_bumps():
+            _ = serializer.save()
+
+    @action(methods=["POST"], detail=False, url_path="bulk")
+    @beartype
+    def bulk_create(self, request: Request) -> Response:
+        serializer = self.get_serializer(
+            data=request.data,
+            many=True,
+            allow_empty=False,
+            max_length=settings.RECIPE_BULK_MAX_ITEMS,
+        )
+        if serializer.is_valid():
+            _ = serializer.save(user=self.request.user)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        else:
+            return Response(
+                serializer.errors, status=status.HTTP_400_BAD_REQUEST
+            )
+
+    @bulk_create.mapping.patch
+    @beartype
+    def bulk_update(self, request: Request) -> Response:
+        # partial updates of the recipes each item names by `id`
+        with transaction.atomic():
+            serializer = self.get_serializer(
+                Recipe.objects.filter(user=self.request.user),
+                data=request.data,
+                many=True,
+                partial=True,
+                allow_empty=False,
+                max_length=settings.RECIPE_BULK_MAX_ITEMS,
+            )
+            if not serializer.is_valid():
+                return Response(
+                    serializer.errors, status=status.HTTP_400_BAD_REQUEST
+                )
+            _ = serializer.save()
+        return Response(serializer.data)
+
+    @action(methods=["GET"], detail=False, url_path="batch")
+    @beartype
+    def batch(self, request: Request) -> HttpResponseBase:
+        return self.cached_response(request, partial(self._batch, request))
+
+    @beartype
+    def _batch(self, request: Request) -> Response:  # noqa: U100
+        # the ids of other users' recipes are reported as missing too, so as
+        # not to reveal which exist
+        ids = self._batch_ids()
+        recipes = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer(
+            [recipes[pk] for pk in ids if pk in recipes], many=True
+        )
+        return Response(
+            {
+                "results": serializer.data,
+                "missing": [pk for pk in ids if pk not in recipes],
+            }
+        )
 
     @action(methods=["POST"], detail=True, url_path="upload-image")
     @beartype
@@ -99,11 +393,89 @@ class RecipeViewSet(ModelViewSet):
         self, request: Request, pk: str | None = None  # noqa: U100
     ) -> Response:
         recipe = self.get_object()
+        stale = list(recipe.image_variants.values())
         serializer = self.get_serializer(recipe, data=request.data)
         if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            recipe = serializer.save(
+                image_status=ImageStatus.PENDING,
+                image_variants={},
+                image_queued_at=now(),
+            )
+            schedule_image_processing(recipe, stale=stale)
+            return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
         else:
             return Response(
                 serializer.errors, status=status.HTTP_400_BAD_REQUEST
             )
+
+
+class LibraryExportView(RequestTimingMixin, APIView):
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @beartype
+    def get(self, request: Request) -> HttpResponseBase:
+        user = cast(User, request.user)
+        if isinstance(request._request, ASGIRequest):
+            # the response is iterated on the event loop, so no queries
+            return FileResponse(
+                spool_library(user),
+                as_attachment=True,
+                filename="library.ndjson",
+                content_type=LIBRARY_MEDIA_TYPE,
+            )
+        response = StreamingHttpResponse(
+            export_library(user), content_type=LIBRARY_MEDIA_TYPE
+        )
+        response[
+            "Content-Disposition"
+        ] = 'attachment; filename="library.ndjson"'
+        return response
+
+
+class LibraryImportView(RequestTimingMixin, APIView):
+    # the body is read a line at a time rather than parsed whole, so any
+    # parser is bypassed
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @beartype
+    def post(self, request: Request) -> Response:
+        media_type = request.content_type.partition(";")[0].strip()
+        if media_type != LIBRARY_MEDIA_TYPE:
+            raise UnsupportedMediaType(media_type)
+        counts = import_library(
+            cast(User, request.user), request.stream or BytesIO()
+        )
+        return Response(counts, status=status.HTTP_201_CREATED)
+
+
+class RecipeStatsView(RequestTimingMixin, APIView):
+    # totals of the user's recipes, maintained as they change by
+    # `recipe.stats`
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    @beartype
+    def get(self, request: Request) -> Response:
+        return Response(recipe_stats(cast(User, request.user)))
+
+
+class ResponseCacheStatsView(RequestTimingMixin, APIView):
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAdminUser]
+
+    @beartype
+    def get(self, request: Request) -> Response:  # noqa: U100
+        cache = get_response_cache()
+        hits, misses = RESPONSE_CACHE_STATS.hits, RESPONSE_CACHE_STATS.misses
+        return Response(
+            {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses) if hits + misses else None,
+                # shared caches do not report their size
+                "size": len(cache) if isinstance(cache, LocalCache) else None,
+                "max_size": settings.RESPONSE_CACHE_MAX_SIZE,
+            }
+        )
@@ -1,6 +1,12 @@
+from beartype import beartype
 from django.apps import AppConfig
 
 
 class UserConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "user"
+
+    @beartype
+    def ready(self) -> None:
+        from user import checks  # noqa: F401
+        from user import signals  # noqa: F401
@@ -0,0 +1,56 @@
+from copy import deepcopy
+from functools import cache
+from hashlib import sha256
+
+from beartype import beartype
+from core.cache import LocalCache
+from core.cache import SharedCache
+from core.cache import build_cache
+from core.models import User
+from django.conf import settings
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    # caches the token and its user, so repeat requests skip the database;
+    # `user.signals` evicts entries when either of them changes
+
+    @beartype
+    def authenticate_credentials(self, key: str) -> tuple[User, Token]:
+        cache = get_token_cache()
+        if (cached := cache.get(token_cache_key(key))) is not None:
+            # entries are shared between requests, so hand out copies
+            return deepcopy(cached)
+        user, token = super().authenticate_credentials(key)
+        cache.set(token_cache_key(key), deepcopy((user, token)))
+        return user, token
+
+
+@beartype
+def get_token_cache() -> LocalCache | SharedCache:
+    return _build_token_cache(
+        settings.TOKEN_CACHE_ALIAS,
+        settings.TOKEN_CACHE_MAX_SIZE,
+        settings.TOKEN_CACHE_TIMEOUT,
+    )
+
+
+@cache
+@beartype
+def _build_token_cache(
+    alias: str | None, max_size: int, timeout: float
+) -> LocalCache | SharedCache:
+    return build_cache(
+        alias, max_size=max_size, timeout=timeout, key_prefix="auth-token"
+    )
+
+
+@beartype
+def token_cache_key(key: str) -> str:
+    return f"token:{sha256(key.encode()).hexdigest()}"
+
+
+@beartype
+def evict_token(key: str) -> None:
+    get_token_cache().delete(token_cache_key(key))
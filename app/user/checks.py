@@ -0,0 +1,26 @@
+from typing import Any
+
+from beartype import beartype
+from core.checks import is_shared_cache
+from django.conf import settings
+from django.core.checks import Error
+from django.core.checks import Tags
+from django.core.checks import register
+
+
+@register(Tags.caches)
+@beartype
+def check_token_cache(**_kwargs: Any) -> list[Error]:
+    if settings.WORKER_PROCESSES <= 1 or is_shared_cache(
+        settings.TOKEN_CACHE_ALIAS
+    ):
+        return []
+    return [
+        Error(
+            "TOKEN_CACHE_ALIAS must name a cache shared between processes "
+            "when there are several, or the others accept revoked tokens "
+            "for up to TOKEN_CACHE_TIMEOUT seconds.",
+            hint="Set SHARED_CACHE_BACKEND and SHARED_CACHE_LOCATION.",
+            id="user.E001",
+        )
+    ]
@@ -0,0 +1,27 @@
+from typing import Any
+
+from beartype import beartype
+from core.models import User
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+from user.authentication import evict_token
+
+
+@receiver(post_delete, sender=Token)
+@beartype
+def evict_deleted_token(*, instance: Token, **_: Any) -> None:
+    evict_token(instance.key)
+
+
+@receiver(post_save, sender=User)
+@beartype
+def evict_changed_user(*, instance: User, created: bool, **_: Any) -> None:
+    # covers deactivation and `UserSerializer.update`; bulk `QuerySet.update`
+    # calls bypass this, and are only picked up once entries time out
+    if not created:
+        for key in Token.objects.filter(user=instance).values_list(
+            "key", flat=True
+        ):
+            evict_token(key)
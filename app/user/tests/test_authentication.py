@@ -0,0 +1,140 @@
+from typing import cast
+from unittest.mock import patch
+
+from beartype import beartype
+from core.cache import build_cache
+from core.models import UserManager
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.test.utils import override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.response import Response
+from rest_framework.status import HTTP_200_OK
+from rest_framework.status import HTTP_401_UNAUTHORIZED
+from rest_framework.test import APIClient
+from user.authentication import get_token_cache
+from user.checks import check_token_cache
+
+
+ME_URL = reverse("user:me")
+_MODULE = "user.authentication"
+LOCAL = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+SHARED = {"BACKEND": "django.core.cache.backends.db.DatabaseCache"}
+
+
+class TestCachedTokenAuthentication(TestCase):
+    @beartype
+    def setUp(self) -> None:
+        get_token_cache().clear()
+        self.user = cast(UserManager, get_user_model().objects).create_user(
+            email="test@example.com", password="password", name="Full Name"
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    @beartype
+    def test_repeat_requests_skip_database(self) -> None:
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual(len(context), 0)
+
+    @beartype
+    def test_invalid_token(self) -> None:
+        self.client.credentials(HTTP_AUTHORIZATION="Token invalid")
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, HTTP_401_UNAUTHORIZED)
+
+    @beartype
+    def test_deleted_token_evicted(self) -> None:
+        _ = self.client.get(ME_URL)
+        _ = self.token.delete()
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, HTTP_401_UNAUTHORIZED)
+
+    @beartype
+    def test_deactivated_user_evicted(self) -> None:
+        _ = self.client.get(ME_URL)
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, HTTP_401_UNAUTHORIZED)
+
+    @beartype
+    def test_updated_user_evicted(self) -> None:
+        _ = self.client.get(ME_URL)
+        name = "New Full Name"
+        _ = self.client.patch(ME_URL, {"name": name})
+        res = cast(Response, self.client.get(ME_URL))
+        self.assertEqual(res.data["name"], name)
+
+    @beartype
+    @override_settings(TOKEN_CACHE_ALIAS="default")
+    def test_shared_cache(self) -> None:
+        get_token_cache().clear()
+        _ = self.client.get(ME_URL)
+        with CaptureQueriesContext(connection) as context:
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, HTTP_200_OK)
+        self.assertEqual(len(context), 0)
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, HTTP_401_UNAUTHORIZED)
+
+    @beartype
+    def test_revoked_through_another_process(self) -> None:
+        # each process builds a cache of its own, which only a shared alias
+        # keeps in agreement
+        for alias, status in [
+            (None, HTTP_200_OK),
+            ("default", HTTP_401_UNAUTHORIZED),
+        ]:
+            caches["default"].clear()
+            first, second = (
+                build_cache(
+                    alias, max_size=10, timeout=300.0, key_prefix="auth-token"
+                )
+                for _ in range(2)
+            )
+            token = Token.objects.create(
+                user=cast(UserManager, get_user_model().objects).create_user(
+                    email=f"{alias}@example.com", password="password"
+                )
+            )
+            self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+            with patch(f"{_MODULE}.get_token_cache", return_value=second):
+                res = self.client.get(ME_URL)
+            self.assertEqual(res.status_code, HTTP_200_OK)
+            with patch(f"{_MODULE}.get_token_cache", return_value=first):
+                _ = token.delete()
+            with patch(f"{_MODULE}.get_token_cache", return_value=second):
+                res = self.client.get(ME_URL)
+            self.assertEqual(res.status_code, status, alias)
+
+
+class TestTokenCacheCheck(SimpleTestCase):
+    @beartype
+    def test_shared_required_with_several_processes(self) -> None:
+        for processes, alias, errors in [
+            (1, None, []),
+            (4, None, ["user.E001"]),
+            (4, "default", ["user.E001"]),
+            (4, "shared", []),
+        ]:
+            with override_settings(
+                WORKER_PROCESSES=processes,
+                TOKEN_CACHE_ALIAS=alias,
+                CACHES={"default": LOCAL, "shared": SHARED},
+            ):
+                self.assertEqual(
+                    [error.id for error in check_token_cache()], errors
+                )
@@ -2,28 +2,32 @@ from typing import cast
 
 from beartype import beartype
 from core.models import User
-from rest_framework.authentication import TokenAuthentication
+from core.replicas import ReplicaReadMixin
+from core.timing import RequestTimingMixin
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.generics import CreateAPIView
 from rest_framework.generics import RetrieveUpdateAPIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.settings import api_settings
+from user.authentication import CachedTokenAuthentication
 from user.serializers import AuthTokenSerializer
 from user.serializers import UserSerializer
 
 
-class CreateUserView(CreateAPIView):
+class CreateUserView(RequestTimingMixin, CreateAPIView):
     serializer_class = UserSerializer
 
 
-class CreateTokenView(ObtainAuthToken):
+class CreateTokenView(RequestTimingMixin, ObtainAuthToken):
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES  # type: ignore
 
 
-class ManageUserView(RetrieveUpdateAPIView):
+class ManageUserView(
+    RequestTimingMixin, ReplicaReadMixin, RetrieveUpdateAPIView
+):
     serializer_class = UserSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     @beartype